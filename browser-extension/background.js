@@ -36,6 +36,7 @@ class BackgroundManager {
     constructor() {
         this.notifications = new Map();
         this.analysisCache = new Map();
+        this.validators = new Map(); // url -> { etag, data } for conditional requests
         this.setupEventListeners();
         this.initializeSettings();
     }
@@ -71,7 +72,7 @@ class BackgroundManager {
 
             // Enhanced content fetching with caching
             if (request.text === "fetchContentFor") {
-                this.fetchContentInfo(sendResponse, request.type, request.url);
+                this.fetchContentInfo(sendResponse, request.type, request.url, sender.tab && sender.tab.id);
                 return true; // Will respond asynchronously
             }
 
@@ -253,7 +254,9 @@ class BackgroundManager {
     }
 
     // Enhanced content fetching with intelligent caching and fallbacks
-    async fetchContentInfo(sendResponse, type, url) {
+    async fetchContentInfo(sendResponse, type, url, tabId) {
+        // Set once the page has been answered with a partial result
+        let responded = false;
         try {
             // Check cache first
             const cachedData = this.getCachedAnalysis(url);
@@ -274,32 +277,54 @@ class BackgroundManager {
                 return;
             }
 
+            // Answer with the page metadata and local sentiment as soon as the analysis job publishes them
+            const onPartial = (partial) => {
+                if (responded) {
+                    return;
+                }
+                responded = true;
+                const partialData = this.transformAPIResponse(partial, type);
+                sendResponse({
+                    content: partialData[type] || types[type],
+                    fullData: partialData,
+                    cached: false,
+                    partial: true
+                });
+            };
+
             // Make API request with timeout and retry logic
-            const analysisData = await this.fetchFromAPI(url, type);
+            const analysisData = await this.fetchFromAPI(url, type, 0, onPartial);
             
             if (analysisData) {
                 // Cache the results
                 this.cacheAnalysis(url, analysisData);
 
-                // Send response
-                sendResponse({
+                const message = {
                     content: analysisData[type] || types[type],
                     fullData: analysisData,
                     cached: false
-                });
-            } else {
+                };
+                if (!responded) {
+                    sendResponse(message);
+                } else if (tabId !== undefined) {
+                    // The page already shows the partial result: update it in place
+                    chrome.tabs.sendMessage(tabId, { action: 'analysisUpdated', type: type, ...message });
+                }
+            } else if (!responded) {
                 // Fallback to mock data if API fails
                 this.serveMockData(sendResponse, type, url);
             }
 
         } catch (error) {
             console.error('Error fetching content:', error);
-            this.serveMockData(sendResponse, type, url);
+            if (!responded) {
+                this.serveMockData(sendResponse, type, url);
+            }
         }
     }
 
     // Fetch from API with retry logic
-    async fetchFromAPI(url, type, retryCount = 0) {
+    async fetchFromAPI(url, type, retryCount = 0, onPartial = null) {
         const maxRetries = 2;
         const timeout = 10000; // 10 seconds
 
@@ -307,26 +332,49 @@ class BackgroundManager {
             const controller = new AbortController();
             const timeoutId = setTimeout(() => controller.abort(), timeout);
 
+            const validator = this.validators.get(url);
+            const headers = { 'Content-Type': 'application/json' };
+            if (validator) {
+                headers['If-None-Match'] = validator.etag;
+            }
+
             const response = await fetch(BACKEND_API_URL, {
                 method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
+                headers: headers,
                 body: JSON.stringify({
                     url: url,
                     type: type,
-                    enhanced: true // Request enhanced analysis
+                    enhanced: true, // Request enhanced analysis
+                    async: true // Uncached articles are analyzed as a job instead of holding the request open
                 }),
                 signal: controller.signal
             });
 
             clearTimeout(timeoutId);
 
+            // Unchanged since the last fetch: reuse the stored analysis
+            if (response.status === 304 && validator) {
+                return this.transformAPIResponse(validator.data, type);
+            }
+
             if (!response.ok) {
                 throw new Error(`API response ${response.status}: ${response.statusText}`);
             }
 
+            if (response.status === 202) {
+                const job = await response.json();
+                return this.transformAPIResponse(await this.pollJob(job.links.status, onPartial), type);
+            }
+
             const data = await response.json();
+            const etag = response.headers.get('ETag');
+            if (etag) {
+                this.validators.delete(url);
+                this.validators.set(url, { etag: etag, data: data });
+                if (this.validators.size > 200) {
+                    this.validators.delete(this.validators.keys().next().value);
+                }
+            }
             
             // Transform API response to expected format
             return this.transformAPIResponse(data, type);
@@ -338,7 +386,7 @@ class BackgroundManager {
             if (retryCount < maxRetries && !error.name === 'AbortError') {
                 console.log(`Retrying API request in ${(retryCount + 1) * 2} seconds...`);
                 await new Promise(resolve => setTimeout(resolve, (retryCount + 1) * 2000));
-                return this.fetchFromAPI(url, type, retryCount + 1);
+                return this.fetchFromAPI(url, type, retryCount + 1, onPartial);
             }
 
             // Log API failure for analytics
@@ -352,6 +400,30 @@ class BackgroundManager {
         }
     }
 
+    // Poll a background analysis job until it finishes, passing its partial results to onPartial
+    async pollJob(statusPath, onPartial = null, interval = 1000, maxWait = 120000) {
+        const statusUrl = new URL(statusPath, BACKEND_API_URL).toString();
+        const deadline = Date.now() + maxWait;
+        while (Date.now() < deadline) {
+            await new Promise(resolve => setTimeout(resolve, interval));
+            const response = await fetch(statusUrl);
+            if (!response.ok) {
+                throw new Error(`Job status ${response.status}: ${response.statusText}`);
+            }
+            const job = await response.json();
+            if (job.status === 'done') {
+                return job.result;
+            }
+            if (job.status === 'failed') {
+                throw new Error(`Analysis job failed: ${job.error}`);
+            }
+            if (job.partial && onPartial) {
+                onPartial(job.partial);
+            }
+        }
+        throw new Error('Analysis job timed out');
+    }
+
     // Transform API response to internal format
     transformAPIResponse(apiData, requestedType) {
         try {
@@ -238,6 +238,16 @@ let mainBody = document.createElement("div");
 mainBody.id = "main-body";
 contentDiv.appendChild(mainBody);
 
+// Replace a partial result when the background script receives the full analysis
+chrome.runtime.onMessage.addListener((request) => {
+  if (request.action === "analysisUpdated" && request.content) {
+    const contentDiv = document.getElementById(`${request.type}-content`);
+    if (contentDiv) {
+      contentDiv.innerHTML = request.content;
+    }
+  }
+});
+
 function createElementWithType(type, percent = null) {
   // Create header and content divs
   let headerWrapper = document.createElement("div");
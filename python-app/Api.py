@@ -6,22 +6,34 @@ without requiring additional dependencies.
 import os
 import sys
 import json
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from urllib.parse import parse_qs, urlparse
 import ssl
 import threading
 import socket
 import random
+import select
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from html.parser import HTMLParser
+from urllib.request import Request, urlopen
 
 # Set up path for imports
 current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.insert(0, current_dir)
 
+# Import request coalescing helpers
+from canonical import canonical_url, canonical_key
+import singleflight
+from jobs import JobManager, FINISHED, job_links, format_event, last_event_version, report_progress
+from serialization import dumps, compress, response_encoding
+
 # Import database functions if available
 try:
-    from database import database_history
+    from database import database_history, get_analysis, write_queue
     HAS_DATABASE = True
 except ImportError:
     HAS_DATABASE = False
@@ -29,21 +41,236 @@ except ImportError:
 
 # Import Gemini functions if available
 try:
-    from gemini import perspec
-    HAS_GEMINI = True
+    # The SDK is loaded on the first analysis, so only check that it is installed
+    from gemini import perspec, gemini_available, analysis_version, MOCK_MODEL_NAME
+    from scheduler import scheduler, Priority
+    from metrics import call_context, gemini_metrics
+    HAS_GEMINI = gemini_available()
+    if not HAS_GEMINI:
+        print("Warning: google-generativeai not installed. Using mock data only.")
 except ImportError:
     HAS_GEMINI = False
+    MOCK_MODEL_NAME = 'mock'
     print("Warning: gemini module not found. Using mock data only.")
 
+# Import local sentiment analysis if available
+try:
+    from sentiment import analyze_sentiment
+    from article_metadata import local_metadata
+    HAS_LOCAL_SENTIMENT = True
+except ImportError:
+    HAS_LOCAL_SENTIMENT = False
+    print("Warning: sentiment module not found. Local analysis mode disabled.")
+
+try:
+    from config import (SENTIMENT_MODE, API_WORKERS, API_REQUEST_TIMEOUT, API_KEEPALIVE_TIMEOUT, API_EVENT_STREAM_TIMEOUT,
+                        API_BATCH_MAX_URLS, API_BATCH_WAIT, JOB_WORKERS, JOB_TTL)
+except ImportError:
+    SENTIMENT_MODE = 'gemini'
+    API_WORKERS = 16
+    API_REQUEST_TIMEOUT = 15
+    API_KEEPALIVE_TIMEOUT = 2
+    API_EVENT_STREAM_TIMEOUT = 30
+    API_BATCH_MAX_URLS = 50
+    API_BATCH_WAIT = 10
+    JOB_WORKERS = 4
+    JOB_TTL = 3600
+
+# Largest accepted request body (the extension may send the page text)
+MAX_REQUEST_BYTES = 2_000_000
+
+# Milliseconds an event stream client waits before reconnecting when the server ends the stream
+EVENT_RETRY_MS = 1000
+
+# How often an idle keep-alive connection checks whether other connections are waiting for a worker (seconds)
+KEEPALIVE_POLL_INTERVAL = 0.1
+
+# Analyses by canonical URL, in memory for the most recent URLs in front of the news store
+analysis_cache = OrderedDict()
+analysis_cache_lock = threading.Lock()
+MAX_CACHED_ANALYSES = 512
+
+# Background analyses (asynchronous requests and uncached batch URLs) run as jobs on a bounded pool
+jobs = JobManager(JOB_WORKERS, JOB_TTL, name='api-job')
+
+class ArticleTextParser(HTMLParser):
+    """Collect the text of paragraph tags from an HTML page"""
+
+    def __init__(self):
+        super().__init__()
+        self.in_paragraph = 0
+        self.paragraphs = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'p':
+            self.in_paragraph += 1
+            self.paragraphs.append('')
+
+    def handle_endtag(self, tag):
+        if tag == 'p' and self.in_paragraph:
+            self.in_paragraph -= 1
+
+    def handle_data(self, data):
+        if self.in_paragraph:
+            self.paragraphs[-1] += data
+
+def fetch_article_text(url, timeout=5):
+    """Fetch the paragraph text of an article, or None if it cannot be retrieved"""
+    try:
+        request = Request(url, headers={'User-Agent': 'Mozilla/5.0 (GodsEye)'})
+        with urlopen(request, timeout=timeout) as response:
+            html = response.read(2_000_000).decode(response.headers.get_content_charset() or 'utf-8', 'ignore')
+        parser = ArticleTextParser()
+        parser.feed(html)
+        text = ' '.join(p.strip() for p in parser.paragraphs if len(p.strip()) > 30)
+        return text or None
+    except Exception as e:
+        print(f"Warning: Could not fetch article text for {url}: {e}")
+        return None
+
 class SimpleHTTPRequestHandler(BaseHTTPRequestHandler):
-    """Simple HTTP request handler with CORS support"""
+    """HTTP request handler with CORS support and persistent (keep-alive) connections"""
+
+    # HTTP/1.1 keeps the connection open between requests, so every response sets Content-Length
+    protocol_version = 'HTTP/1.1'
+    # Connections that stall mid-request are closed after this many seconds
+    timeout = API_REQUEST_TIMEOUT
+
+    def handle(self):
+        """Serve requests until the connection closes, idles past the keep-alive timeout or another connection needs the worker"""
+        self.close_connection = True
+        self.handle_one_request()
+        while not self.close_connection and self._await_request():
+            self.handle_one_request()
+
+    def _await_request(self):
+        """Wait for the next request on a keep-alive connection; False if the connection should be closed instead"""
+        deadline = time.monotonic() + API_KEEPALIVE_TIMEOUT
+        # A pipelined request may already be buffered, so peek without blocking first
+        self.connection.settimeout(0.0)
+        try:
+            if self.rfile.peek(1):
+                return True
+        except OSError:
+            return False
+        finally:
+            self.connection.settimeout(self.timeout)
+
+        while True:
+            # An idle connection gives its worker up as soon as a new connection is waiting for one
+            if getattr(self.server, 'queued', 0):
+                return False
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            try:
+                readable, _, _ = select.select([self.connection], [], [], min(remaining, KEEPALIVE_POLL_INTERVAL))
+            except (OSError, ValueError):
+                return False
+            if readable:
+                return True
+
+    def _send_json(self, payload, status=200, headers=None):
+        """Send a JSON response with CORS headers, compressed if the client accepts it"""
+        body, encoding = compress(dumps(payload), self.headers.get('Accept-Encoding'))
+        headers = dict(headers or {})
+        if encoding is not None and 'ETag' in headers:
+            # A strong ETag names one exact byte sequence, so compressed bodies carry a weak one
+            headers['ETag'] = f"W/{headers['ETag']}"
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Vary', 'Accept-Encoding')
+        if encoding is not None:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Expose-Headers', 'ETag, X-Cache')
+        # Clients may keep the response but must revalidate it with If-None-Match
+        self.send_header('Cache-Control', 'no-cache')
+        for name, value in headers.items():
+            self.send_header(name, value)
+        # While connections wait for a worker, keep-alive connections are released after their response
+        if getattr(self.server, 'queued', 0):
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_not_modified(self, etag, analysis):
+        """Tell the client its copy of the analysis is still current"""
+        # The ETag has the form the 200 response would carry (weak when that response is compressed)
+        if response_encoding(len(dumps(analysis)), self.headers.get('Accept-Encoding')) is not None:
+            etag = f'W/{etag}'
+        self.send_response(304)
+        self.send_header('ETag', etag)
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Expose-Headers', 'ETag, X-Cache')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+
+    def _send_events(self, job_id):
+        """
+        Stream the updates of a job as Server-Sent Events
+
+        A stream holds a worker, so it ends after API_EVENT_STREAM_TIMEOUT seconds;
+        the client reconnects with Last-Event-ID and resumes after the last version it got.
+        """
+        job = jobs.get(job_id)
+        if job is None:
+            self._send_json({'error': f'Job not found: {job_id}'}, 404)
+            return
+        after_version = last_event_version(self.headers.get('Last-Event-ID'))
+        if job['status'] in FINISHED and after_version >= job['version']:
+            # The client has the final event; 204 stops EventSource from reconnecting
+            self.send_response(204)
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        # The stream has no length, so it ends with the connection
+        self.send_header('Connection', 'close')
+        self.close_connection = True
+        self.end_headers()
+        deadline = time.monotonic() + API_EVENT_STREAM_TIMEOUT
+        try:
+            self.wfile.write(f'retry: {EVENT_RETRY_MS}\n\n'.encode())
+            for job in jobs.updates(job_id, min(15, API_EVENT_STREAM_TIMEOUT / 2), after_version):
+                self.wfile.write(format_event(job).encode())
+                self.wfile.flush()
+                if time.monotonic() >= deadline:
+                    break
+        except (BrokenPipeError, ConnectionResetError):
+            print(f"Event stream for job {job_id} closed by the client")
+
+    def _read_json(self):
+        """Read the JSON request body, or None if it is missing, too large or invalid"""
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            # The body cannot be delimited, so the connection is not reused
+            self.close_connection = True
+            return None
+        if not 0 < length <= MAX_REQUEST_BYTES:
+            # An unread body would be taken for the next request
+            if length:
+                self.close_connection = True
+            return None
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return None
     
     def do_OPTIONS(self):
         """Handle OPTIONS request for CORS preflight"""
         self.send_response(200)
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, If-None-Match')
+        self.send_header('Content-Length', '0')
         self.end_headers()
     
     def do_GET(self):
@@ -53,57 +280,185 @@ class SimpleHTTPRequestHandler(BaseHTTPRequestHandler):
         path = parsed_url.path
         query = parse_qs(parsed_url.query)
         
-        # Set CORS headers
-        self.send_response(200)
-        self.send_header('Content-Type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        
         # Root endpoint - health check
         if path == '/':
-            response = {
+            self._send_json({
                 'status': 'ok',
                 'message': 'GodsEye API is running',
                 'timestamp': datetime.now().isoformat()
-            }
-            self.wfile.write(json.dumps(response).encode())
+            })
+            return
+
+        # Metrics endpoint - shared in-flight call counters and Gemini queue state
+        if path == '/api/metrics':
+            self._send_json({
+                'singleflight': singleflight.stats(),
+                'scheduler': scheduler.stats() if HAS_GEMINI else None,
+                'gemini': gemini_metrics.snapshot() if HAS_GEMINI else None,
+                'jobs': jobs.stats(),
+                'storage': write_queue.stats() if HAS_DATABASE else None,
+                'timestamp': datetime.now().isoformat()
+            })
             return
         
         # API analyze endpoint
         if path == '/api/analyze':
-            url = query.get('url', [''])[0]
-            if not url:
-                self.wfile.write(json.dumps({
-                    'error': 'URL parameter is required'
-                }).encode())
+            # Analysis mode: 'gemini', 'local' (instant lexicon sentiment) or 'hybrid' (local now, Gemini in background)
+            self.handle_analyze(
+                query.get('url', [''])[0],
+                query.get('mode', [SENTIMENT_MODE])[0],
+                query.get('content', [None])[0],
+                query.get('async', ['0'])[0].lower() in ('1', 'true')
+            )
+            return
+
+        # Job endpoints - status (polling) and Server-Sent Events
+        if path.startswith('/api/jobs/'):
+            job_id, _, stream = path[len('/api/jobs/'):].partition('/')
+            if stream == 'events':
+                self._send_events(job_id)
                 return
-            
-            try:
-                # Generate analysis data
-                analysis = self.generate_analysis(url)
-                
-                # Store in database if available
-                if HAS_DATABASE:
-                    try:
-                        database_history(url, analysis)
-                        print(f"Analysis stored in database for URL: {url}")
-                    except Exception as e:
-                        print(f"Warning: Failed to store in database: {e}")
-                
-                print(f"Analysis generated for URL: {url}")
-                self.wfile.write(json.dumps(analysis).encode())
-            except Exception as e:
-                error_message = f"Error analyzing URL {url}: {str(e)}"
-                print(error_message)
-                self.wfile.write(json.dumps({
-                    'error': error_message
-                }).encode())
-        else:
-            self.wfile.write(json.dumps({
-                'error': f'Endpoint not found: {path}'
-            }).encode())
-    
-    def generate_analysis(self, url):
+            job = jobs.get(job_id) if not stream else None
+            if job is None:
+                self._send_json({'error': f'Job not found: {job_id}'}, 404)
+            else:
+                self._send_json(job)
+            return
+
+        self._send_json({'error': f'Endpoint not found: {path}'}, 404)
+
+    def do_POST(self):
+        """Handle POST request (the extension sends {url, type, mode, content} as JSON)"""
+        path = urlparse(self.path).path
+        if path not in ('/api/analyze', '/api/analyze/batch'):
+            self._send_json({'error': f'Endpoint not found: {path}'}, 404)
+            return
+
+        body = self._read_json()
+        if not isinstance(body, dict):
+            self._send_json({'error': f'A JSON body of at most {MAX_REQUEST_BYTES} bytes is required'}, 400)
+            return
+        if path == '/api/analyze/batch':
+            self.handle_batch(body.get('urls'), body.get('mode') or SENTIMENT_MODE, body.get('wait'))
+            return
+        self.handle_analyze(body.get('url') or '', body.get('mode') or SENTIMENT_MODE, body.get('content'), bool(body.get('async')))
+
+    def handle_analyze(self, url, mode, content, background=False):
+        """
+        Analyze a URL (or serve its cached analysis), store the result and send it
+
+        With background set, an uncached URL is analyzed as a job and the
+        response is 202 with the job id, to be polled at /api/jobs/<id>.
+        """
+        if not url:
+            self._send_json({'error': 'URL parameter is required'}, 400)
+            return
+
+        # Repeat visits are answered from the cache, or with 304 if the extension already has this version
+        url = canonical_url(url)
+        cached = cached_analysis(url, mode)
+        if cached is not None:
+            if etag_matches(self.headers.get('If-None-Match'), cached['etag']):
+                self._send_not_modified(cached['etag'], cached['analysis'])
+            else:
+                self._send_json(cached['analysis'], headers={'ETag': cached['etag'], 'X-Cache': 'hit'})
+            return
+
+        if background:
+            job_id = jobs.submit('analyze', analysis_job, url, mode, content)
+            self._send_json({'job_id': job_id, 'status': 'queued', 'links': job_links(job_id)}, 202, headers={'Location': f'/api/jobs/{job_id}'})
+            return
+
+        try:
+            analysis, etag = analyze_url(url, mode, content)
+            self._send_json(analysis, headers={'ETag': etag, 'X-Cache': 'miss'})
+        except Exception as e:
+            error_message = f"Error analyzing URL {url}: {str(e)}"
+            print(error_message)
+            self._send_json({'error': error_message}, 500)
+
+    def handle_batch(self, urls, mode, wait=None):
+        """
+        Analyze a list of URLs (e.g. every article link on a news homepage) in one request
+
+        URLs are deduplicated by their canonical form and cached analyses are
+        returned at once. Uncached URLs are analyzed as jobs; those not
+        finished within the wait time are reported as pending with their job
+        id, and their results also reach the cache for later batches.
+        """
+        if not isinstance(urls, list) or not urls:
+            self._send_json({'error': 'A non-empty list of URLs is required'}, 400)
+            return
+        if len(urls) > API_BATCH_MAX_URLS:
+            self._send_json({'error': f'At most {API_BATCH_MAX_URLS} URLs per batch'}, 400)
+            return
+        try:
+            wait = min(float(wait), API_BATCH_WAIT) if wait is not None else API_BATCH_WAIT
+        except (TypeError, ValueError):
+            wait = API_BATCH_WAIT
+
+        # One entry per canonical URL, in the order the URLs were sent
+        results = OrderedDict()
+        for requested in urls:
+            if not isinstance(requested, str) or not requested.startswith(('http://', 'https://')):
+                results.setdefault(repr(requested), {'url': requested, 'requested': [requested], 'status': 'error', 'error': 'Not an http(s) URL'})
+                continue
+            url = canonical_url(requested)
+            if url in results:
+                results[url]['requested'].append(requested)
+            else:
+                results[url] = {'url': url, 'requested': [requested]}
+
+        # Gemini calls of a batch run below interactive single-URL requests
+        priority = Priority.STANDARD if HAS_GEMINI else None
+        submitted = {}
+        for url, entry in results.items():
+            if entry.get('status') == 'error':
+                continue
+            cached = cached_analysis(url, mode)
+            if cached is not None:
+                entry.update(status='cached', analysis=cached['analysis'], etag=cached['etag'])
+            else:
+                submitted[jobs.submit('analyze', analysis_job, url, mode, None, priority)] = entry
+
+        finished = jobs.wait(submitted, timeout=wait) if submitted else set()
+        for job_id, entry in submitted.items():
+            job = jobs.get(job_id)
+            if job_id not in finished or job is None:
+                entry.update(status='pending', job_id=job_id, links=job_links(job_id))
+            elif job['status'] == 'failed':
+                entry.update(status='error', error=job['error'])
+            else:
+                entry.update(status='done', analysis=job['result'], etag=analysis_etag(job['result']))
+
+        counts = {}
+        for entry in results.values():
+            counts[entry['status']] = counts.get(entry['status'], 0) + 1
+        print(f"Batch of {len(urls)} URLs: {counts}")
+        self._send_json({
+            'results': list(results.values()),
+            'counts': counts,
+            'duplicates': len(urls) - len(results),
+            'timestamp': datetime.now().isoformat()
+        })
+
+    @staticmethod
+    def generate_analysis(url, mode='gemini', content=None, priority=None):
+        """Generate analysis data for the URL, sharing work with identical in-flight requests"""
+        url = canonical_url(url)
+
+        # Local and hybrid modes answer instantly from the lexicon (cached Gemini results are served before this)
+        if mode in ('local', 'hybrid') and HAS_LOCAL_SENTIMENT:
+            analysis = local_analysis(url, content)
+            if mode == 'hybrid' and HAS_GEMINI:
+                # analyze_url starts the upgrade once the local result is stored and cached
+                analysis['upgrade'] = 'pending'
+            return analysis
+
+        return singleflight.get_group('api_analyze').do(url, SimpleHTTPRequestHandler._generate_analysis, url, content, priority)
+
+    @staticmethod
+    def _generate_analysis(url, content=None, priority=None):
         """Generate analysis data for the URL"""
         # Parse URL to get domain
         domain = urlparse(url).netloc
@@ -112,20 +467,9 @@ class SimpleHTTPRequestHandler(BaseHTTPRequestHandler):
         if HAS_GEMINI:
             try:
                 print(f"Using Gemini AI to analyze URL: {url}")
-                # Create a basic article data structure
-                article_data = {
-                    'url': url,
-                    'publisher': domain.split('.')[0].capitalize(),
-                    'content': f"Content from {url}",  # Placeholder content
-                    'authenticity': None,
-                    'category': None,
-                    'positive_percentage': None,
-                    'neutral_percentage': None,
-                    'negative_percentage': None
-                }
-                
-                # Use Gemini AI to analyze and enrich the data
-                enriched_data = perspec(article_data)
+                # The extension has no signed-in user, so its calls are attributed to the endpoint only
+                with call_context('extension_analyze', 'extension'):
+                    enriched_data = gemini_analysis(url, content, priority)
                 print(f"Gemini analysis completed for URL: {url}")
                 return enriched_data
             except Exception as e:
@@ -153,6 +497,7 @@ class SimpleHTTPRequestHandler(BaseHTTPRequestHandler):
             'positive_percentage': f"{pos}%",
             'neutral_percentage': f"{neutral}%",
             'negative_percentage': f"{neg}%",
+            'analysis_mode': 'mock',
             'authenticity': {
                 'Misinformation Status': {
                     'Misinformation': 'Yes' if is_misinformation else 'No'
@@ -164,6 +509,210 @@ class SimpleHTTPRequestHandler(BaseHTTPRequestHandler):
             }
         }
 
+def gemini_analysis(url, content=None, priority=None):
+    """Analyze the article with Gemini (raises if the call fails)"""
+    domain = urlparse(url).netloc
+    # Create a basic article data structure
+    article_data = {
+        'url': url,
+        'publisher': domain.split('.')[0].capitalize(),
+        'content': content or fetch_article_text(url) or f"Content from {url}",
+        'authenticity': None,
+        'category': None,
+        'positive_percentage': None,
+        'neutral_percentage': None,
+        'negative_percentage': None
+    }
+
+    # Use Gemini AI to analyze and enrich the data
+    return perspec(article_data, priority if priority is not None else Priority.INTERACTIVE)
+
+def analyze_url(url, mode='gemini', content=None, priority=None):
+    """
+    Generate, store and cache the analysis of a canonical URL
+
+    Returns:
+        Tuple of (analysis, ETag)
+    """
+    analysis = SimpleHTTPRequestHandler.generate_analysis(url, mode, content, priority)
+
+    # Store in database if available
+    if HAS_DATABASE:
+        try:
+            database_history(url, analysis, stored_version(analysis))
+            print(f"Analysis stored in database for URL: {url}")
+        except Exception as e:
+            print(f"Warning: Failed to store in database: {e}")
+
+    print(f"Analysis generated for URL: {url}")
+    # Mock fallbacks are not cached, so the next request tries Gemini again
+    if analysis.get('analysis_mode') == 'mock':
+        return analysis, analysis_etag(analysis)
+    etag = cache_analysis(url, analysis)
+
+    # Started after the local result is queued for storage and cached, so the Gemini result always lands last
+    if analysis.get('upgrade') == 'pending':
+        threading.Thread(target=upgrade_analysis, args=(url, content), daemon=True).start()
+    return analysis, etag
+
+def analysis_job(url, mode='gemini', content=None, priority=None):
+    """Job body for background analyses: the job result is the analysis"""
+    # Page metadata and lexicon sentiment are published while the Gemini analysis is still running
+    if mode == 'gemini' and HAS_GEMINI and HAS_LOCAL_SENTIMENT:
+        content = content or fetch_article_text(url)
+        if content:
+            report_progress('metadata', local_analysis(url, content))
+    return analyze_url(url, mode, content, priority)[0]
+
+def analysis_etag(analysis):
+    """Strong ETag of an analysis (hash of its canonical JSON)"""
+    return f'"{canonical_key(analysis)}"'
+
+def etag_matches(if_none_match, etag):
+    """
+    Whether an If-None-Match header matches an ETag
+
+    The header is a comma-separated list of ETags or '*'; If-None-Match uses the
+    weak comparison, so W/"x" and "x" match (compressed responses carry W/ ETags).
+    """
+    if not if_none_match:
+        return False
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if (candidate[2:] if candidate.startswith('W/') else candidate) == opaque:
+            return True
+    return False
+
+def cache_analysis(url, analysis):
+    """Keep an analysis in the in-memory cache and return its ETag"""
+    etag = analysis_etag(analysis)
+    with analysis_cache_lock:
+        cached = analysis_cache.get(url)
+        # A local analysis never replaces a Gemini one (a hybrid request racing its own upgrade)
+        if not (analysis.get('analysis_mode') == 'local' and cached is not None
+                and cached['analysis'].get('analysis_mode', 'gemini') == 'gemini'):
+            analysis_cache[url] = {'analysis': analysis, 'etag': etag}
+        analysis_cache.move_to_end(url)
+        while len(analysis_cache) > MAX_CACHED_ANALYSES:
+            analysis_cache.popitem(last=False)
+    return etag
+
+def cached_analysis(url, mode):
+    """
+    Look up a previous analysis of a canonical URL in memory, then in the news store
+
+    Gemini analyses answer every mode; local analyses only answer local mode,
+    and mock fallbacks are never served from the cache.
+
+    Returns:
+        Cache entry with 'analysis' and 'etag', or None
+    """
+    with analysis_cache_lock:
+        entry = analysis_cache.get(url)
+        if entry is not None:
+            analysis_cache.move_to_end(url)
+
+    if entry is None and HAS_DATABASE:
+        analysis, version = get_analysis(url, with_version=True)
+        # Analyses stored by a mock-backend run (load tests) are only served by mock-backend servers
+        if version and version.get('model') == MOCK_MODEL_NAME and not (HAS_GEMINI and analysis_version()['model'] == MOCK_MODEL_NAME):
+            analysis = None
+        if isinstance(analysis, dict) and 'error' not in analysis:
+            entry = {'analysis': analysis, 'etag': cache_analysis(url, analysis)}
+    if entry is None:
+        return None
+
+    analysis_mode = entry['analysis'].get('analysis_mode', 'gemini')
+    if analysis_mode == 'mock' or (analysis_mode == 'local' and mode != 'local'):
+        return None
+    return entry
+
+def stored_version(analysis):
+    """Version tag to store with an analysis (None for local and mock analyses, which no prompt produced)"""
+    if not HAS_GEMINI or analysis.get('analysis_mode') in ('local', 'mock'):
+        return None
+    return analysis_version()
+
+def local_analysis(url, content=None):
+    """Build an instant analysis with locally computed sentiment"""
+    domain = urlparse(url).netloc
+    article_text = content or fetch_article_text(url) or ''
+    return {
+        'title': f"Article from {domain}",
+        'url': url,
+        'publisher': domain.split('.')[0].capitalize(),
+        **local_metadata(article_text),
+        **analyze_sentiment(article_text),
+        'authenticity': None,
+        'analysis_mode': 'local'
+    }
+
+def upgrade_analysis(url, content=None):
+    """Replace a local analysis with the Gemini result in the background"""
+    try:
+        # Duplicate upgrades for the same URL share one Gemini call
+        with call_context('extension_upgrade', 'extension'):
+            analysis = singleflight.get_group('api_upgrade').do(url, gemini_analysis, url, content, Priority.STANDARD)
+    except Exception as e:
+        print(f"Warning: Gemini upgrade failed for URL {url}: {e}")
+        return
+
+    analysis['analysis_mode'] = 'gemini'
+    # Later requests for the URL are served the Gemini result from the cache
+    cache_analysis(url, analysis)
+
+    if HAS_DATABASE:
+        try:
+            database_history(url, analysis, analysis_version())
+        except Exception as e:
+            print(f"Warning: Failed to store upgraded analysis: {e}")
+    print(f"Gemini upgrade completed for URL: {url}")
+
+class ExtensionAPIServer(ThreadingHTTPServer):
+    """Threaded HTTP server that handles connections on a fixed-size worker pool"""
+
+    daemon_threads = True
+    # Connections beyond the worker cap wait in the listen backlog and the pool queue
+    request_queue_size = 128
+
+    def __init__(self, server_address, handler_class, workers=API_WORKERS):
+        super().__init__(server_address, handler_class)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='api-worker')
+        # Accepted connections still waiting for a worker
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+
+    @property
+    def queued(self):
+        """Number of accepted connections waiting for a worker"""
+        return len(self._pending)
+
+    def process_request(self, request, client_address):
+        # One worker serves a connection, including its keep-alive requests, until it closes or idles
+        with self._pending_lock:
+            self._pending.add(request)
+        self.executor.submit(self._process_queued, request, client_address)
+
+    def _process_queued(self, request, client_address):
+        with self._pending_lock:
+            if request not in self._pending:
+                # Closed by server_close while waiting
+                return
+            self._pending.discard(request)
+        self.process_request_thread(request, client_address)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        # Cancelled connections never reach a worker, so their sockets are closed here
+        with self._pending_lock:
+            pending, self._pending = self._pending, set()
+        for request in pending:
+            self.shutdown_request(request)
+
 def find_available_port(start_port=8502, max_attempts=10):
     """Find an available port starting from start_port"""
     for port in range(start_port, start_port + max_attempts):
@@ -178,9 +727,9 @@ def run_server(port=None):
         port = find_available_port()
         
     server_address = ('', port)
-    httpd = HTTPServer(server_address, SimpleHTTPRequestHandler)
+    httpd = ExtensionAPIServer(server_address, SimpleHTTPRequestHandler)
     
-    print(f"Starting GodsEye API server on port {port}")
+    print(f"Starting GodsEye API server on port {port} ({API_WORKERS} workers)")
     print(f"API URL: http://localhost:{port}")
     print("Press Ctrl+C to stop the server")
     
@@ -190,6 +739,10 @@ def run_server(port=None):
         print("Server stopped")
     finally:
         httpd.server_close()
+        jobs.shutdown()
+        # Analyses still queued for storage are written before the server exits
+        if HAS_DATABASE:
+            write_queue.flush()
 
 def start_server_thread(port=None):
     """Start the server in a separate thread"""
@@ -0,0 +1,85 @@
+"""
+Archive Aggregation Module
+This module computes the archive-level statistics of a search (average
+sentiment, total, analysed and flagged counts) directly from the per-article analyses,
+instead of asking Gemini to do the arithmetic. No per-article analysis
+detects AI-written text, so the AI-generated count is reported as unavailable.
+"""
+
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+SENTIMENTS = ['positive', 'neutral', 'negative']
+
+# Articles at or above this negative share are flagged alongside misinformation
+FLAGGED_NEGATIVE_THRESHOLD = 50.0
+
+def parse_percentage(value: Any) -> float:
+    """Convert '42%', '42' or 42 to 42.0, and anything unparseable to NaN"""
+    try:
+        return float(str(value).strip().rstrip('%'))
+    except (TypeError, ValueError):
+        return float('nan')
+
+def _is_yes(value: Any) -> bool:
+    return value is True or str(value).strip().lower() in ('yes', 'true', 'partial')
+
+def is_misinformation(record: Dict[str, Any]) -> bool:
+    """Check the Gemini misinformation status and the fact check verdict of an article"""
+    authenticity = record.get('authenticity')
+    if not isinstance(authenticity, dict):
+        return False
+    status = authenticity.get('Misinformation Status')
+    fact_check = authenticity.get('Fact Check')
+    return (
+        (isinstance(status, dict) and _is_yes(status.get('Misinformation')))
+        or (isinstance(fact_check, dict) and fact_check.get('article_status') == 'False')
+    )
+
+def archive_aggregates(records: List[Dict[str, Any]], total_articles: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Compute the archive-level fields from per-article analyses
+
+    Args:
+        records: Article analyses as returned by ndtv_url
+        total_articles: Articles linked from the archive page (defaults to the number of records)
+
+    Returns:
+        Dictionary with the average sentiment percentages, the total, analysed and flagged article counts
+        (ai_generated_articles is None: the per-article analyses do not detect AI-written text)
+    """
+    if total_articles is None:
+        total_articles = len(records)
+    if not records:
+        return {
+            'average_positive_percentage': '0%',
+            'average_neutral_percentage': '0%',
+            'average_negative_percentage': '0%',
+            'total_articles': total_articles,
+            'analysed_articles': 0,
+            'flagged_articles': 0,
+            'ai_generated_articles': None
+        }
+
+    # One row per article, one column per sentiment (NaN where the analysis has no value)
+    sentiment = np.array([
+        [parse_percentage(record.get(f'{name}_percentage')) for name in SENTIMENTS]
+        for record in records
+    ])
+    counts = (~np.isnan(sentiment)).sum(axis=0)
+    averages = np.divide(np.nansum(sentiment, axis=0), counts, out=np.zeros(len(SENTIMENTS)), where=counts > 0)
+
+    misinformation = np.array([is_misinformation(record) for record in records])
+    very_negative = np.nan_to_num(sentiment[:, SENTIMENTS.index('negative')]) >= FLAGGED_NEGATIVE_THRESHOLD
+
+    return {
+        **{
+            f'average_{name}_percentage': f'{round(float(value), 1)}%'
+            for name, value in zip(SENTIMENTS, averages)
+        },
+        'total_articles': total_articles,
+        'analysed_articles': len(records),
+        'flagged_articles': int((misinformation | very_negative).sum()),
+        'ai_generated_articles': None
+    }
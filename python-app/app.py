@@ -1,12 +1,21 @@
 # Core library imports: FastAPI setup
+import asyncio
 import uvicorn
 import subprocess
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
 # Local project-specific imports: custom scraper and database functions
-from scraper import ndtv_archive, ndtv_url
+from scraper import ndtv_archive, ndtv_url, verifier
+import singleflight
+from scheduler import scheduler
+from metrics import call_context, gemini_metrics
+from claim_cache import claim_cache
+from reanalyze import start_reanalysis, reanalysis_status
+from jobs import JobManager, FINISHED, job_links, format_event, last_event_version
+from config import JOB_WORKERS, JOB_TTL
+from serialization import dumps, CompressionMiddleware
 # from database import database_history
 
 app = FastAPI() # Initialize FastAPI application instance
@@ -18,9 +27,34 @@ app.add_middleware(
     allow_headers=['*'],
     allow_credentials=True
 )
+# Compress complete responses (archive results carry full article text) with gzip or brotli
+app.add_middleware(CompressionMiddleware)
+
+class FastJSONResponse(JSONResponse):
+    # Serialized with orjson when it is installed
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+# Archive searches and URL analyses requested with 'async' run as background jobs
+jobs = JobManager(JOB_WORKERS, JOB_TTL)
+
+def job_response(kind: str, job_function, *args, **kwargs) -> FastJSONResponse:
+    # Queue the work and answer at once with the job id and its polling and event stream URLs
+    job_id = jobs.submit(kind, job_function, *args, **kwargs)
+    return FastJSONResponse(
+        {'job_id': job_id, 'status': 'queued', 'links': job_links(job_id)},
+        status_code=202,
+        headers={'Location': f'/api/jobs/{job_id}'}
+    )
+
+@app.on_event('shutdown')
+async def shutdown() -> None:
+    # Close the fact check connection pools (the job event loop has its own)
+    await verifier.aclose()
+    await asyncio.to_thread(jobs.shutdown, verifier.aclose)
 
 @app.post('/api/archive')
-async def archive(request: Request) -> JSONResponse:
+async def archive(request: Request) -> FastJSONResponse:
     # Get source, date, and topic values from the incoming JSON data
     request_body = await request.json()
     source = request_body.get('source')
@@ -37,14 +71,18 @@ async def archive(request: Request) -> JSONResponse:
     # NOTE: Currently, only NDTV archives are supported
     # Construct URL using formatted date and scrape NDTV archives for the specified topic
     url = f'https://archives.ndtv.com/articles/{formatted_date}.html'
-    data = await ndtv_archive(url, topic, limit=3) # Limit set to 3 due to Gemini API and scraping limitations
+    with call_context('archive', request_body.get('user')):
+        # Jobs keep the metrics attribution of the request that queued them
+        if request_body.get('async'):
+            return job_response('archive', ndtv_archive, url, topic, 3)
+        data = await ndtv_archive(url, topic, limit=3) # Limit set to 3 due to Gemini API and scraping limitations
 
     # document_name = f'{source}-{formatted_date}'
     # database_history(document_name, data)
-    return JSONResponse(data)
+    return FastJSONResponse(data)
 
 @app.post('/api/url')
-async def url(request: Request) -> JSONResponse:
+async def url(request: Request) -> FastJSONResponse:
     # Get URL value from the incoming JSON data
     request_body = await request.json()
     url = request_body.get('url')
@@ -52,11 +90,81 @@ async def url(request: Request) -> JSONResponse:
         raise HTTPException(status_code=400, detail='URL is missing')
 
     # Scrape the URL and return as a JSON response
-    data = await ndtv_url(url)
-    return JSONResponse(data)
+    with call_context('url', request_body.get('user')):
+        if request_body.get('async'):
+            return job_response('url', ndtv_url, url, report_stages=True)
+        data = await ndtv_url(url)
+    return FastJSONResponse(data)
+
+@app.get('/api/jobs/{job_id}')
+async def job_status(job_id: str) -> FastJSONResponse:
+    # Poll a background job: status, and the result once it is done
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail='Job not found or expired')
+    return FastJSONResponse(job)
+
+@app.get('/api/jobs/{job_id}/events')
+async def job_events(job_id: str, request: Request) -> Response:
+    # Push every status change of a background job as Server-Sent Events until it finishes
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail='Job not found or expired')
+
+    # A reconnecting client resumes after the last event it received; 204 stops it once it has the final one
+    after_version = last_event_version(request.headers.get('Last-Event-ID'))
+    if job['status'] in FINISHED and after_version >= job['version']:
+        return Response(status_code=204)
+
+    async def stream():
+        async for job in jobs.aupdates(job_id, after_version=after_version):
+            yield format_event(job)
+
+    return StreamingResponse(stream(), media_type='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+@app.get('/api/metrics')
+async def metrics() -> FastJSONResponse:
+    # Report how many requests shared an in-flight analysis, the Gemini queue state, today's Gemini usage, fact check cache hits and background jobs
+    return FastJSONResponse({
+        'singleflight': singleflight.stats(),
+        'scheduler': scheduler.stats(),
+        'gemini': gemini_metrics.snapshot(),
+        'claim_cache': claim_cache.stats(),
+        'jobs': jobs.stats()
+    })
+
+def require_admin(request: Request) -> None:
+    # Reruns spend Gemini quota, so only admin accounts may start them (login token as 'Authorization: Bearer <token>')
+    # Imported lazily: the auth module connects to MongoDB on import
+    from auth import verify_token, is_admin
+    scheme, _, token = request.headers.get('authorization', '').partition(' ')
+    user = verify_token(token.strip()) if scheme.lower() == 'bearer' and token.strip() else None
+    if not user:
+        raise HTTPException(status_code=401, detail='Admin token required', headers={'WWW-Authenticate': 'Bearer'})
+    if not is_admin(user):
+        raise HTTPException(status_code=403, detail='Admin account required')
+
+@app.post('/api/reanalyze')
+async def reanalyze(request: Request) -> FastJSONResponse:
+    # Start re-analysing stored articles whose prompt version is out of date (runs in the background)
+    await asyncio.to_thread(require_admin, request)
+    # The body is optional: without one every out-of-date record is re-analysed
+    try:
+        request_body = await request.json() if (await request.body()).strip() else {}
+    except ValueError:
+        request_body = None
+    if not isinstance(request_body, dict):
+        raise HTTPException(status_code=400, detail='Request body must be a JSON object')
+    started = start_reanalysis(request_body.get('limit'))
+    return FastJSONResponse({'started': started, **reanalysis_status()})
+
+@app.get('/api/reanalyze')
+async def reanalyze_status() -> FastJSONResponse:
+    # Report the progress of the prompt version rollout
+    return FastJSONResponse(reanalysis_status())
 
 @app.post('/api/pdf')
-async def pdf(request: Request) -> JSONResponse:
+async def pdf(request: Request) -> FastJSONResponse:
     pass # Feature under development
 
 if __name__ == '__main__':
@@ -0,0 +1,222 @@
+"""
+Article Metadata Module
+This module fills the language, read time and category of an article
+locally: character trigram language identification, a word-count read
+time estimate and a naive Bayes category classifier trained on the stored
+analyses whose category Gemini filled (category_source 'gemini'), so the
+classifier never learns from its own or the mock backend's labels. The
+classifier is trained in a background thread on a bounded sample of recent
+analyses; until it is ready the category is left for Gemini to fill.
+"""
+
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+# Average adult reading speed for news copy
+WORDS_PER_MINUTE = 200
+
+# Classifier settings: minimum and maximum training set, retraining interval, delay before retrying a
+# training run that failed or found too few articles (seconds) and confidence needed to answer
+MIN_TRAINING_ARTICLES = 20
+MAX_TRAINING_ARTICLES = 2000
+RETRAIN_INTERVAL = 30 * 60
+TRAINING_RETRY_INTERVAL = 60
+MIN_CATEGORY_CONFIDENCE = 0.5
+MAX_VOCABULARY = 20000
+
+metadata_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'metadata')
+
+_word_regex = re.compile(r"[a-z][a-z']+")
+
+def _trigrams(text: str) -> Counter:
+    # Word-padded character trigrams, e.g. " th", "the", "he "
+    text = ' ' + re.sub(r'[^a-z\s]+', '', text.lower()) + ' '
+    text = re.sub(r'\s+', ' ', text)
+    return Counter(text[i:i + 3] for i in range(len(text) - 2))
+
+def _build_language_profiles() -> Dict[str, Counter]:
+    with open(os.path.join(metadata_dir, 'language_profiles.json'), 'r') as file:
+        samples = json.load(file)['samples']
+    return {language: _trigrams(sample) for language, sample in samples.items()}
+
+LANGUAGE_PROFILES = _build_language_profiles()
+
+def detect_language(text: str) -> Optional[str]:
+    """
+    Identify the language of a text by cosine similarity of character trigram profiles
+
+    Args:
+        text: The article text (the first few thousand characters are enough)
+
+    Returns:
+        Language name, or None for empty text
+    """
+    profile = _trigrams((text or '')[:5000])
+    if not profile:
+        return None
+    norm = math.sqrt(sum(count * count for count in profile.values()))
+
+    def similarity(reference: Counter) -> float:
+        dot = sum(count * reference.get(gram, 0) for gram, count in profile.items())
+        reference_norm = math.sqrt(sum(count * count for count in reference.values()))
+        return dot / (norm * reference_norm)
+
+    return max(LANGUAGE_PROFILES, key=lambda language: similarity(LANGUAGE_PROFILES[language]))
+
+def estimate_read_time(text: str) -> Optional[str]:
+    """Estimate the reading time of a text in whole minutes"""
+    words = len((text or '').split())
+    if not words:
+        return None
+    minutes = max(1, math.ceil(words / WORDS_PER_MINUTE))
+    return f'{minutes} minute' if minutes == 1 else f'{minutes} minutes'
+
+class CategoryClassifier:
+    """Multinomial naive Bayes over word counts"""
+
+    def __init__(self, documents: List[str], labels: List[str]):
+        """
+        Train the classifier
+
+        Args:
+            documents: Article texts
+            labels: Category of each article
+        """
+        tokenized = [_word_regex.findall(document.lower()) for document in documents]
+        document_frequency = Counter(word for words in tokenized for word in set(words))
+        # Words seen in a single article carry little signal and bloat the model
+        vocabulary = [word for word, count in document_frequency.most_common(MAX_VOCABULARY) if count > 1]
+        self.vocabulary = {word: index for index, word in enumerate(vocabulary)}
+        self.labels = sorted(set(labels))
+        label_index = {label: index for index, label in enumerate(self.labels)}
+
+        counts = np.zeros((len(self.labels), len(self.vocabulary)))
+        for words, label in zip(tokenized, labels):
+            indices = [self.vocabulary[word] for word in words if word in self.vocabulary]
+            np.add.at(counts[label_index[label]], indices, 1)
+
+        # Laplace smoothing
+        self.log_likelihood = np.log((counts + 1) / (counts.sum(axis=1, keepdims=True) + len(self.vocabulary)))
+        priors = np.bincount([label_index[label] for label in labels], minlength=len(self.labels))
+        self.log_prior = np.log(priors / priors.sum())
+
+    def predict(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Predict the category of a text
+
+        Args:
+            text: The article text
+
+        Returns:
+            Dictionary with 'category' and 'confidence', or None if no known words are found
+        """
+        vector = np.zeros(len(self.vocabulary))
+        indices = [self.vocabulary[word] for word in _word_regex.findall((text or '').lower()) if word in self.vocabulary]
+        if not indices:
+            return None
+        np.add.at(vector, indices, 1)
+
+        scores = self.log_prior + self.log_likelihood @ vector
+        probabilities = np.exp(scores - scores.max())
+        probabilities /= probabilities.sum()
+        best = int(np.argmax(probabilities))
+        return {'category': self.labels[best], 'confidence': float(probabilities[best])}
+
+def _category_label(category: Any, topics: List[str]) -> Optional[str]:
+    # Map free-form Gemini categories (e.g. "politics", "World news") onto the configured topics
+    if not isinstance(category, str):
+        return None
+    lowered = category.strip().lower()
+    for topic in topics:
+        if lowered == topic.lower() or topic.lower() in lowered:
+            return topic
+    return None
+
+_classifier = None
+_classifier_trained_at = 0.0
+_classifier_attempted_at = 0.0
+_classifier_training = False
+_classifier_lock = threading.Lock()
+
+def _train_category_classifier() -> None:
+    # Runs in a background thread; the previous classifier keeps answering meanwhile
+    global _classifier, _classifier_trained_at, _classifier_training
+    try:
+        # Imported lazily: the database module connects to MongoDB on import
+        from database import get_stored_analyses
+        with open(os.path.join(metadata_dir, 'news_config.json'), 'r') as file:
+            topics = json.load(file)['news_topics']
+
+        documents, labels = [], []
+        for analysis in get_stored_analyses(MAX_TRAINING_ARTICLES, category_source='gemini'):
+            label = _category_label(analysis.get('category'), topics)
+            if label and analysis.get('content'):
+                documents.append(analysis['content'])
+                labels.append(label)
+
+        if len(documents) >= MIN_TRAINING_ARTICLES and len(set(labels)) > 1:
+            classifier = CategoryClassifier(documents, labels)
+            with _classifier_lock:
+                _classifier = classifier
+                # Only a successful run postpones the next one by the full interval
+                _classifier_trained_at = time.monotonic()
+            print(f'[Metadata] Category classifier trained on {len(documents)} articles')
+    except Exception as exc:
+        print(f'[Metadata] Could not train category classifier: {exc}')
+    finally:
+        with _classifier_lock:
+            _classifier_training = False
+
+def get_category_classifier() -> Optional[CategoryClassifier]:
+    """
+    Return the category classifier, or None until the first training run succeeds
+
+    Never blocks: a stale or missing classifier is (re)trained in a background thread.
+    """
+    global _classifier_attempted_at, _classifier_training
+    with _classifier_lock:
+        now = time.monotonic()
+        stale = not _classifier_trained_at or now - _classifier_trained_at >= RETRAIN_INTERVAL
+        retry_due = not _classifier_attempted_at or now - _classifier_attempted_at >= TRAINING_RETRY_INTERVAL
+        if stale and retry_due and not _classifier_training:
+            _classifier_attempted_at = now
+            _classifier_training = True
+            threading.Thread(target=_train_category_classifier, name='category-classifier', daemon=True).start()
+        return _classifier
+
+def predict_category(text: str) -> Optional[str]:
+    """Predict the article category, or None when the classifier is unavailable or unsure"""
+    classifier = get_category_classifier()
+    if classifier is None:
+        return None
+    prediction = classifier.predict(text)
+    if prediction and prediction['confidence'] >= MIN_CATEGORY_CONFIDENCE:
+        return prediction['category']
+    return None
+
+def local_metadata(text: str) -> Dict[str, Any]:
+    """
+    Compute the metadata fields of an article locally
+
+    Args:
+        text: The article text
+
+    Returns:
+        Dictionary with 'language', 'read_time', 'category' and 'category_source'
+        ('local' when the classifier filled the category; None where unknown)
+    """
+    category = predict_category(text)
+    return {
+        'language': detect_language(text),
+        'read_time': estimate_read_time(text),
+        'category': category,
+        'category_source': 'local' if category else None
+    }
@@ -0,0 +1,87 @@
+"""
+Claim selection benchmark
+Compares the old claim picker (first sentences longer than 40 characters) with
+the check-worthiness ranking in claims.py over stored articles: selection speed
+and how often the chosen claims carry checkable content (figures, named
+entities, attribution) or are boilerplate.
+
+Usage:
+    python benchmarks/bench_claims.py [--file news_data.json] [--limit 500] [--max-claims 3]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, app_dir)
+
+from claims import select_claims, FEATURES
+from text_utils import is_boilerplate
+
+def first_long_sentences(text, max_claims):
+    """The previous picker in NewsVerifier.verify_article_claims"""
+    sentences = [s.strip() for s in text.split('.') if len(s.strip()) > 40]
+    return sentences[:max_claims]
+
+def load_articles(path, limit):
+    """Article texts from a news data JSON file, or from the database"""
+    if path:
+        with open(path, 'r') as file:
+            analyses = list(json.load(file).values())
+    else:
+        from database import get_stored_analyses
+        analyses = get_stored_analyses()
+    texts = [analysis.get('content') for analysis in analyses if isinstance(analysis, dict)]
+    texts = [text for text in texts if isinstance(text, str) and text]
+    return texts[:limit] if limit else texts
+
+def profile(claims):
+    """Share of claims containing each checkable feature, and of boilerplate claims"""
+    regexes = dict(FEATURES)
+    checks = {
+        'figures': lambda claim: bool(regexes['numbers'].search(claim) or regexes['quantities'].search(claim)),
+        'entities': lambda claim: bool(regexes['organizations'].search(claim) or regexes['acronyms'].search(claim) or len(regexes['entities'].findall(claim)) > 1),
+        'attribution': lambda claim: bool(regexes['attribution'].search(claim)),
+        'comparatives': lambda claim: bool(regexes['comparatives'].search(claim)),
+        'opinion': lambda claim: bool(regexes['opinion'].search(claim)),
+        'boilerplate': is_boilerplate
+    }
+    if not claims:
+        return {name: 0.0 for name in checks}
+    return {name: sum(map(check, claims)) / len(claims) for name, check in checks.items()}
+
+def run(picker, texts, max_claims):
+    timings, claims = [], []
+    for text in texts:
+        start = time.perf_counter()
+        selected = picker(text, max_claims)
+        timings.append(time.perf_counter() - start)
+        claims.extend(selected)
+    return timings, claims
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark claim selection over stored articles')
+    parser.add_argument('--file', help='News data JSON file (default: stored analyses from the database)')
+    parser.add_argument('--limit', type=int, default=0, help='Maximum number of articles')
+    parser.add_argument('--max-claims', type=int, default=3, help='Claims selected per article')
+    args = parser.parse_args()
+
+    texts = load_articles(args.file, args.limit)
+    if not texts:
+        print('No stored articles with content found')
+        return
+    print(f'{len(texts)} articles, {args.max_claims} claims per article')
+
+    for name, picker in (('first long sentences', first_long_sentences), ('check-worthiness', select_claims)):
+        timings, claims = run(picker, texts, args.max_claims)
+        shares = profile(claims)
+        print(f'\n{name}')
+        print(f'  selection:  {statistics.mean(timings) * 1000:.3f} ms/article mean, {max(timings) * 1000:.3f} ms max, {len(texts) / sum(timings):.0f} articles/s')
+        print(f'  claims:     {len(claims)} ({len(claims) / len(texts):.2f} per article)')
+        print('  share with: ' + ', '.join(f'{key} {value:.0%}' for key, value in shares.items()))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Serialization benchmark for the API responses
+Measures serialization time (json vs orjson) and bytes on the wire (raw,
+gzip at several levels, brotli when installed) for a typical extension
+/api/analyze response and /api/archive responses of several sizes. Payloads
+are stored analyses, or synthetic articles filled by the mock Gemini backend.
+
+Usage:
+    python benchmarks/bench_serialization.py [--file news_data.json] [--archive-sizes 3 10 30]
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, app_dir)
+
+from mock_gemini import _fill_article
+from serialization import ORJSON_AVAILABLE, BROTLI_AVAILABLE
+
+if ORJSON_AVAILABLE:
+    import orjson
+if BROTLI_AVAILABLE:
+    import brotli
+
+PARAGRAPHS = [
+    'The government announced a new scheme for farmers on Monday, with Rs 12,000 crore set aside for crop insurance.',
+    'Officials said the Reserve Bank of India would support the plan with lower rates for rural lenders.',
+    'The opposition criticised the move and warned of rising inflation in several states, calling it an election stunt.',
+    'Analysts expect growth of 6.5 per cent this year according to the finance ministry, up from 5.9 per cent last year.',
+    'The Prime Minister said the scheme would reach 80 million households by March, according to a statement.',
+    'Farm unions in Punjab and Haryana welcomed the announcement but demanded a legal guarantee on minimum support prices.'
+]
+
+def synthetic_article(index):
+    """An NDTV-style article as returned by ndtv_url, filled by the mock Gemini backend"""
+    random.seed(index)
+    # Sentences shuffled from the sample vocabulary, so the text compresses like prose rather than repeated copy
+    vocabulary = ' '.join(PARAGRAPHS).replace(',', '').replace('.', '').split()
+    sentences = [
+        ' '.join(random.choice(vocabulary) for _ in range(random.randint(12, 28))).capitalize() + '.'
+        for _ in range(random.randint(25, 45))
+    ]
+    content = ' '.join(sentences)
+    claims = random.sample(PARAGRAPHS, 3)
+    return _fill_article({
+        'publisher': 'NDTV',
+        'author': 'Staff Reporter',
+        'publication_date': 'October 19, 2026 10:00 am IST',
+        'edited_date': 'October 19, 2026 10:00 am IST',
+        'url': f'https://www.ndtv.com/india-news/article-{index}',
+        'content': content,
+        'authenticity': {
+            'Fact Check': {
+                'article_status': 'Mixed',
+                'verified_claims': [{
+                    'claim': claim,
+                    'verification': {
+                        'status': random.choice(['True', 'False', 'Mixed']),
+                        'sources': [{'name': 'PIB Fact Check', 'url': 'https://factcheck.pib.gov.in/', 'rating': 'Misleading'}]
+                    }
+                } for claim in claims]
+            },
+            'Misinformation Status': None
+        },
+        'category': None, 'highlight': None, 'organization': None,
+        'positive_percentage': None, 'positive_text': None,
+        'neutral_percentage': None, 'neutral_text': None,
+        'negative_percentage': None, 'negative_text': None,
+        'language': None, 'read_time': None,
+        'ads': 4, 'links': 212, 'images': 31, 'videos': 1, 'documents': 6
+    })
+
+def load_articles(path, count):
+    if path:
+        with open(path, 'r') as file:
+            analyses = [analysis for analysis in json.load(file).values() if isinstance(analysis, dict)]
+        if analyses:
+            return [analyses[i % len(analyses)] for i in range(count)]
+    return [synthetic_article(i) for i in range(count)]
+
+def best_time(fn, payload, repeat):
+    """Fastest of several runs (seconds), the least noisy estimate of the cost"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(payload)
+        timings.append(time.perf_counter() - start)
+    return min(timings), statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark JSON serialization and compression of API payloads')
+    parser.add_argument('--file', help='News data JSON file with stored analyses (default: synthetic articles)')
+    parser.add_argument('--archive-sizes', type=int, nargs='+', default=[3, 10, 30], help='Articles per archive response')
+    parser.add_argument('--repeat', type=int, default=50, help='Runs per measurement')
+    args = parser.parse_args()
+
+    serializers = [('json', lambda payload: json.dumps(payload).encode())]
+    if ORJSON_AVAILABLE:
+        serializers.append(('orjson', lambda payload: orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)))
+    else:
+        print('orjson is not installed; only the json module is measured')
+
+    compressors = [(f'gzip-{level}', lambda body, level=level: gzip.compress(body, compresslevel=level, mtime=0)) for level in (1, 5, 6, 9)]
+    if BROTLI_AVAILABLE:
+        compressors += [(f'br-{quality}', lambda body, quality=quality: brotli.compress(body, quality=quality)) for quality in (4, 6, 11)]
+    else:
+        print('brotli is not installed; only gzip is measured')
+
+    articles = load_articles(args.file, max(args.archive_sizes))
+    payloads = [('analyze (1 article)', articles[0])]
+    payloads += [(f'archive ({size} articles)', articles[:size]) for size in args.archive_sizes]
+
+    for name, payload in payloads:
+        body = serializers[0][1](payload)
+        print(f'\n{name}: {len(body) / 1024:.1f} KiB raw JSON')
+        for serializer_name, serialize in serializers:
+            best, median = best_time(serialize, payload, args.repeat)
+            print(f'  {serializer_name:<8} {best * 1000:8.3f} ms best, {median * 1000:8.3f} ms median')
+        for compressor_name, compressor in compressors:
+            best, _ = best_time(compressor, body, max(5, args.repeat // 5))
+            size = len(compressor(body))
+            print(f'  {compressor_name:<8} {best * 1000:8.3f} ms, {size / 1024:7.1f} KiB ({size / len(body):.0%} of raw)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+"""
+Offline load test for the extension API (Api.py) and the FastAPI backend (app.py)
+Serves synthetic NDTV-style article pages locally, drives the chosen server with
+concurrent clients and reports throughput and latency percentiles. Run the server
+with GEMINI_BACKEND=mock (or pass --spawn) so no Gemini quota is used.
+
+Usage:
+    python benchmarks/load_test.py --target api --spawn --requests 200 --concurrency 20
+    python benchmarks/load_test.py --target app --spawn --unique 10
+    python benchmarks/load_test.py --target api --spawn --keepalive --post --concurrency 50
+    MOCK_GEMINI_LATENCY=lognormal:2:0.6 MOCK_GEMINI_RATE_LIMIT=0.1 python benchmarks/load_test.py --spawn
+"""
+import argparse
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.error import HTTPError, URLError
+from urllib.parse import quote, urlparse
+from urllib.request import Request, urlopen
+
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ARTICLE_TEMPLATE = """<html><body>
+<span class="pst-by_li"><a href="#"><span itemprop="name">Load Test Reporter</span></a></span>
+<span class="pst-by_lnk">Updated: October 19, 2026 10:00 am IST</span>
+<div id="ins_storybody">
+<p>The government announced a new scheme for farmers on Monday, article {article_id}.</p>
+<p>Officials said the Reserve Bank of India would support the plan with lower rates.</p>
+<p>The opposition criticised the move and warned of rising inflation in several states.</p>
+<p>Analysts expect growth of 6.5 per cent this year according to the finance ministry.</p>
+</div>
+<img src="a.png"><a href="https://ads.example.com/adclick?id=1">ad</a>
+</body></html>"""
+
+class ArticleHandler(BaseHTTPRequestHandler):
+    """Serve a synthetic article for every path"""
+
+    def do_GET(self):
+        body = ARTICLE_TEMPLATE.format(article_id=self.path.rsplit('/', 1)[-1]).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_article_server():
+    """Start the synthetic article server on a free port and return its base URL"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ArticleHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_address[1]}'
+
+def spawn_server(target, port):
+    """Start the target server with the mock model backend and scratch stores"""
+    # Mock analyses go to a throwaway MongoDB database and file directory, never the real news store
+    data_dir = tempfile.mkdtemp(prefix='godseye-load-test-')
+    env = {
+        **os.environ,
+        'GEMINI_BACKEND': 'mock',
+        'MONGODB_DATABASE': os.environ.get('LOAD_TEST_MONGODB_DATABASE', 'news_database_load_test'),
+        'DATA_DIR': data_dir
+    }
+    print(f"Scratch stores: MongoDB database {env['MONGODB_DATABASE']}, files in {data_dir}")
+    if target == 'api':
+        command = [sys.executable, '-c', f'from Api import run_server; run_server({port})']
+    else:
+        command = [sys.executable, '-m', 'uvicorn', 'app:app', '--port', str(port), '--log-level', 'warning']
+    process = subprocess.Popen(command, cwd=app_dir, env=env)
+
+    # Wait until the server accepts connections
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            urlopen(f'http://127.0.0.1:{port}/api/metrics', timeout=1).read()
+            return process
+        except (URLError, ConnectionError, HTTPError):
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f'{target} server did not start on port {port}')
+
+def build_request(target, base_url, article_url, post=False):
+    if target == 'api' and not post:
+        return Request(f'{base_url}/api/analyze?url={quote(article_url, safe="")}')
+    path = '/api/analyze' if target == 'api' else '/api/url'
+    # The extension posts the URL as JSON, like the Streamlit app does to the FastAPI backend
+    return Request(
+        f'{base_url}{path}',
+        data=json.dumps({'url': article_url}).encode(),
+        headers={'Content-Type': 'application/json'}
+    )
+
+def classify(status, payload):
+    if status != 200:
+        return f'http_{status}'
+    return 'error_payload' if b'"error"' in payload[:200] else 'ok'
+
+def send(request, timeout):
+    """Send one request on a new connection and return (latency seconds, outcome)"""
+    start = time.perf_counter()
+    try:
+        with urlopen(request, timeout=timeout) as response:
+            outcome = classify(response.status, response.read())
+    except HTTPError as exc:
+        outcome = f'http_{exc.code}'
+    except (URLError, ConnectionError, TimeoutError) as exc:
+        outcome = type(getattr(exc, 'reason', exc)).__name__
+    return time.perf_counter() - start, outcome
+
+_connections = threading.local()
+
+def send_keepalive(request, timeout):
+    """Send one request on this client thread's persistent connection and return (latency seconds, outcome)"""
+    parsed = urlparse(request.full_url)
+    start = time.perf_counter()
+    for attempt in range(2):
+        connection = getattr(_connections, 'connection', None)
+        if connection is None:
+            connection = _connections.connection = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=timeout)
+        try:
+            connection.request(
+                request.get_method(),
+                parsed.path + (f'?{parsed.query}' if parsed.query else ''),
+                body=request.data,
+                headers=dict(request.header_items())
+            )
+            response = connection.getresponse()
+            outcome = classify(response.status, response.read())
+            if response.will_close:
+                connection.close()
+                _connections.connection = None
+            break
+        except (http.client.HTTPException, ConnectionError, TimeoutError, OSError) as exc:
+            # A connection closed by the server while idle is reopened once
+            connection.close()
+            _connections.connection = None
+            outcome = type(exc).__name__
+    return time.perf_counter() - start, outcome
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def report(latencies, outcomes, elapsed):
+    """Print throughput, latency percentiles and outcome counts"""
+    print(f'requests:    {len(latencies)} in {elapsed:.2f}s')
+    print(f'throughput:  {len(latencies) / elapsed:.2f} req/s')
+    print(f'latency p50: {percentile(latencies, 0.50) * 1000:.0f} ms')
+    print(f'latency p95: {percentile(latencies, 0.95) * 1000:.0f} ms')
+    print(f'latency p99: {percentile(latencies, 0.99) * 1000:.0f} ms')
+    print(f'latency max: {max(latencies) * 1000:.0f} ms (mean {statistics.mean(latencies) * 1000:.0f} ms)')
+    print(f'outcomes:    {dict(Counter(outcomes))}')
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline load test for the GodsEye APIs')
+    parser.add_argument('--target', choices=['api', 'app'], default='api', help='Api.py extension server or app.py FastAPI server')
+    parser.add_argument('--base-url', help='Server URL (default http://127.0.0.1:8503 for api, :8000 for app)')
+    parser.add_argument('--spawn', action='store_true', help='Start the server with GEMINI_BACKEND=mock')
+    parser.add_argument('--requests', type=int, default=100, help='Total requests to send')
+    parser.add_argument('--concurrency', type=int, default=10, help='Concurrent clients')
+    parser.add_argument('--unique', type=int, default=0, help='Distinct article URLs (0 = one per request)')
+    parser.add_argument('--timeout', type=float, default=60, help='Client timeout in seconds')
+    parser.add_argument('--keepalive', action='store_true', help='Reuse one HTTP/1.1 connection per client')
+    parser.add_argument('--post', action='store_true', help='POST JSON to /api/analyze like the extension (api target)')
+    args = parser.parse_args()
+
+    port = 8503 if args.target == 'api' else 8000
+    base_url = (args.base_url or f'http://127.0.0.1:{port}').rstrip('/')
+    process = spawn_server(args.target, int(base_url.rsplit(':', 1)[-1])) if args.spawn else None
+
+    try:
+        article_base = start_article_server()
+        unique = args.unique or args.requests
+        requests = [
+            build_request(args.target, base_url, f'{article_base}/article/{index % unique}', args.post)
+            for index in range(args.requests)
+        ]
+
+        sender = send_keepalive if args.keepalive else send
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            results = list(executor.map(lambda request: sender(request, args.timeout), requests))
+        elapsed = time.perf_counter() - start
+
+        latencies = [latency for latency, _ in results]
+        outcomes = [outcome for _, outcome in results]
+        print(f'target:      {args.target} ({base_url}), concurrency {args.concurrency}, {unique} distinct URLs'
+              f"{', keep-alive' if args.keepalive else ''}{', POST' if args.post else ''}")
+        report(latencies, outcomes, elapsed)
+
+        try:
+            metrics = json.loads(urlopen(f'{base_url}/api/metrics', timeout=5).read())
+            print('server metrics:')
+            print(json.dumps(metrics, indent=2, default=str))
+        except (URLError, HTTPError, ValueError):
+            pass
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+
+if __name__ == '__main__':
+    main()
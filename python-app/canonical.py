@@ -0,0 +1,61 @@
+"""
+Canonical Keys Module
+This module reduces URLs and request payloads to stable keys so that
+equivalent requests can share in-flight work and cached results.
+"""
+
+import hashlib
+import json
+from typing import Any
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that only track the visitor and never change the article
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid',
+    'ref', 'ref_src', 'referrer', 'source', 'cmpid', 'ito', 'pfrom', 'amp'
+}
+TRACKING_PREFIXES = ('utm_', 'pk_', 'ga_', 'yclid')
+
+def canonical_url(url: str) -> str:
+    """
+    Normalize an article URL
+
+    Lowercases the scheme and host, drops default ports, fragments,
+    tracking parameters and trailing slashes, and sorts the query string.
+
+    Args:
+        url: The URL as received from a client
+
+    Returns:
+        Canonical form of the URL
+    """
+    url = (url or '').strip()
+    parts = urlsplit(url)
+    if not parts.netloc:
+        return url
+
+    scheme = parts.scheme.lower() or 'https'
+    host = parts.hostname or ''
+    if parts.port and not (scheme == 'http' and parts.port == 80) and not (scheme == 'https' and parts.port == 443):
+        host = f'{host}:{parts.port}'
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+def canonical_key(value: Any) -> str:
+    """
+    Build a stable hash for any JSON-like value
+
+    Args:
+        value: Dictionary, list or scalar describing a request
+
+    Returns:
+        Hex digest that is identical for equal values regardless of key order
+    """
+    encoded = json.dumps(value, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha1(encoded.encode()).hexdigest()
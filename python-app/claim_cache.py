@@ -0,0 +1,132 @@
+"""
+Claim Cache Module
+This module caches Google Fact Check lookups by a normalized claim key so
+repeated sentences (wire copy, quotes carried by several outlets) are answered
+locally. Entries live in a small in-memory LRU in front of the database (or
+file) store, expire after a TTL, and empty results are cached for a shorter
+time so new fact checks are still picked up.
+"""
+
+import asyncio
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+from text_utils import stem as stem_word
+from config import FACT_CHECK_CACHE_TTL, FACT_CHECK_NEGATIVE_TTL, FACT_CHECK_CACHE_STEM
+
+# Entries kept in memory in front of the persistent store
+MEMORY_ENTRIES = 4096
+
+# Serializes writes so the file fallback is never written by two threads at once
+_store_lock = threading.Lock()
+
+_punctuation_regex = re.compile(r"[^\w\s]+")
+_whitespace_regex = re.compile(r'\s+')
+
+def normalize_claim(claim_text: str, stem: bool = FACT_CHECK_CACHE_STEM) -> str:
+    """
+    Fold case, punctuation and whitespace (and optionally word endings) of a claim
+
+    Args:
+        claim_text: The claim as extracted from the article
+        stem: Strip common English suffixes so inflected variants share a key
+
+    Returns:
+        Normalized claim string
+    """
+    text = _punctuation_regex.sub(' ', claim_text.lower().replace('’', "'").replace("'", ''))
+    words = _whitespace_regex.split(text.strip())
+    if stem:
+        words = [stem_word(word) for word in words]
+    return ' '.join(words)
+
+def claim_key(claim_text: str) -> str:
+    """Cache key of a claim (hash of the normalized text)"""
+    return hashlib.sha1(normalize_claim(claim_text).encode()).hexdigest()
+
+class ClaimCache:
+    """Two-level (memory, then database or file) TTL cache of fact check results"""
+
+    def __init__(self):
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, key: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > MEMORY_ENTRIES:
+                self._memory.popitem(last=False)
+
+    def get(self, claim_text: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up the cached fact check results of a claim
+
+        Args:
+            claim_text: The claim text
+
+        Returns:
+            Cached results (possibly an empty list for a cached miss), or None if not cached
+        """
+        key = claim_key(claim_text)
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry is None or entry['expires_at'] <= datetime.now():
+            # Imported lazily: the database module connects to MongoDB on import
+            from database import get_cached_claim
+            entry = get_cached_claim(key)
+            if entry is not None:
+                self._remember(key, entry)
+
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry['claims']
+
+    def put(self, claim_text: str, claims: List[Dict[str, Any]]) -> None:
+        """
+        Cache the fact check results of a claim (empty results use the shorter negative TTL)
+
+        Args:
+            claim_text: The claim text
+            claims: Results returned by the fact check API
+        """
+        from database import store_cached_claim
+        ttl = FACT_CHECK_CACHE_TTL if claims else FACT_CHECK_NEGATIVE_TTL
+        key = claim_key(claim_text)
+        entry = {'claims': claims, 'expires_at': datetime.now() + timedelta(seconds=ttl)}
+        self._remember(key, entry)
+        with _store_lock:
+            store_cached_claim(key, claim_text, claims, entry['expires_at'])
+
+    async def aget(self, claim_text: str) -> Optional[List[Dict[str, Any]]]:
+        """Async lookup; the persistent store is only queried off the event loop on a memory miss"""
+        key = claim_key(claim_text)
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry is not None and entry['expires_at'] > datetime.now():
+            self.hits += 1
+            return entry['claims']
+        return await asyncio.to_thread(self.get, claim_text)
+
+    async def aput(self, claim_text: str, claims: List[Dict[str, Any]]) -> None:
+        await asyncio.to_thread(self.put, claim_text, claims)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'memory_entries': len(self._memory)
+        }
+
+# Shared cache for every verifier in the process
+claim_cache = ClaimCache()
@@ -0,0 +1,206 @@
+"""
+Claim Matcher Module
+This module finds earlier fact-checked claims that paraphrase a new claim,
+so repeat stories reuse the stored verification summary instead of being
+verified from scratch. Claims are shingled into character 5-grams of their
+normalized text, hashed into MinHash signatures and bucketed with
+locality-sensitive hashing (LSH); candidates from the buckets are confirmed
+by their estimated Jaccard similarity, and a verdict is only reused when
+both claims state the same numbers, negations and directions and name the
+same entities (so "GDP grew 7.5%" never answers "GDP shrank 2.5%").
+"""
+
+import re
+import threading
+import zlib
+from collections import defaultdict
+from typing import Dict, Any, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+
+from claim_cache import normalize_claim, claim_key
+from config import FACT_CHECK_SIMILARITY
+
+SHINGLE_SIZE = 5
+# 20 bands of 6 rows: claims with Jaccard similarity around 0.6 or more almost always share a bucket
+# (well below the default FACT_CHECK_SIMILARITY, so the threshold rather than the banding decides)
+NUM_BANDS = 20
+ROWS_PER_BAND = 6
+NUM_PERMUTATIONS = NUM_BANDS * ROWS_PER_BAND
+
+# Universal hashing (a * x + b) mod p over 32-bit shingle hashes; a < 2^31 keeps products within uint64
+_PRIME = np.uint64(4294967311)
+_random = np.random.RandomState(42)
+_A = _random.randint(1, 2 ** 31 - 1, NUM_PERMUTATIONS).astype(np.uint64)
+_B = _random.randint(0, 2 ** 31 - 1, NUM_PERMUTATIONS).astype(np.uint64)
+
+_number_regex = re.compile(r'\d+(?:[.,]\d+)*')
+_word_regex = re.compile(r"[A-Za-z]+(?:['’][A-Za-z]+)?")
+
+# Words that flip or set the sense of a claim, folded to a polarity label
+POLARITY_WORDS = {
+    **dict.fromkeys(('not', "n't", 'no', 'never', 'none', 'nothing', 'nobody', 'neither', 'nor', 'without',
+                     'deny', 'denies', 'denied', 'false', 'fake', 'untrue'), 'not'),
+    **dict.fromkeys(('rise', 'rises', 'rose', 'risen', 'rising', 'grow', 'grows', 'grew', 'grown', 'growing', 'growth',
+                     'increase', 'increases', 'increased', 'increasing', 'gain', 'gains', 'gained', 'up', 'higher',
+                     'more', 'above', 'surge', 'surged', 'jump', 'jumped', 'climb', 'climbed', 'double', 'doubled'), 'up'),
+    **dict.fromkeys(('fall', 'falls', 'fell', 'fallen', 'falling', 'drop', 'drops', 'dropped', 'decline', 'declines',
+                     'declined', 'decrease', 'decreases', 'decreased', 'shrink', 'shrinks', 'shrank', 'shrunk',
+                     'down', 'lower', 'less', 'below', 'lose', 'lost', 'loss', 'cut', 'plunge', 'plunged',
+                     'halve', 'halved'), 'down')
+}
+
+# Capitalized function words that start sentences rather than name entities
+_CAPITALIZED_STOPWORDS = {
+    'a', 'an', 'the', 'this', 'that', 'these', 'those', 'in', 'on', 'at', 'of', 'for', 'by', 'from', 'to',
+    'and', 'but', 'or', 'as', 'it', 'its', 'he', 'she', 'they', 'we', 'i', 'there', 'after', 'before', 'according'
+}
+
+def shingles(text: str) -> np.ndarray:
+    """Hashes of the character shingles of a normalized claim"""
+    normalized = normalize_claim(text)
+    if len(normalized) <= SHINGLE_SIZE:
+        pieces = {normalized}
+    else:
+        pieces = {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+    return np.fromiter((zlib.crc32(piece.encode()) for piece in pieces), dtype=np.uint64, count=len(pieces))
+
+def minhash(text: str) -> np.ndarray:
+    """MinHash signature of a claim (one minimum per hash permutation)"""
+    hashes = shingles(text)
+    return ((np.outer(hashes, _A) + _B) % _PRIME).min(axis=0)
+
+def key_terms(text: str) -> Tuple[FrozenSet[str], FrozenSet[str], FrozenSet[str], FrozenSet[str]]:
+    """
+    Terms two claims must share for one to reuse the other's verdict
+
+    Args:
+        text: The claim text
+
+    Returns:
+        Tuple of (numbers, polarity labels, capitalized entities, all words), lowercased
+    """
+    numbers = frozenset(number.replace(',', '') for number in _number_regex.findall(text))
+    words = _word_regex.findall(text.replace('’', "'"))
+    polarity = set()
+    entities = set()
+    lowered = set()
+    for word in words:
+        lower = word.lower()
+        lowered.add(re.sub(r"'s$", '', lower))
+        if lower.endswith("n't"):
+            polarity.add('not')
+        elif lower in POLARITY_WORDS:
+            polarity.add(POLARITY_WORDS[lower])
+        if word[0].isupper() and lower not in _CAPITALIZED_STOPWORDS:
+            # "India's" and "India" name the same entity
+            entities.add(re.sub(r"'s$", '', lower))
+    return numbers, frozenset(polarity), frozenset(entities), frozenset(lowered)
+
+def same_key_terms(terms, other) -> bool:
+    """Whether two claims (their key_terms) state the same numbers, polarity and entities"""
+    numbers, polarity, entities, words = terms
+    other_numbers, other_polarity, other_entities, other_words = other
+    # Entities are checked against all words of the other claim, so lowercase claims still match
+    return (numbers == other_numbers and polarity == other_polarity
+            and entities <= other_words and other_entities <= words)
+
+class ClaimMatcher:
+    """LSH index over the signatures of resolved claims"""
+
+    def __init__(self, threshold: float = FACT_CHECK_SIMILARITY):
+        self.threshold = threshold
+        self.entries: List[Dict[str, Any]] = []
+        self.signatures: List[np.ndarray] = []
+        self.buckets = [defaultdict(list) for _ in range(NUM_BANDS)]
+        self.keys = set()
+        self._lock = threading.Lock()
+
+    def _bands(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes() for band in range(NUM_BANDS)]
+
+    def add(self, claim: str, verification: Dict[str, Any]) -> bool:
+        """
+        Index a resolved claim
+
+        Args:
+            claim: The claim text
+            verification: Its verification summary
+
+        Returns:
+            False if the same (normalized) claim is already indexed
+        """
+        key = claim_key(claim)
+        signature = minhash(claim)
+        with self._lock:
+            if key in self.keys:
+                return False
+            self.keys.add(key)
+            entry_id = len(self.entries)
+            self.entries.append({'claim': claim, 'verification': verification, 'terms': key_terms(claim)})
+            self.signatures.append(signature)
+            for band, bucket_key in enumerate(self._bands(signature)):
+                self.buckets[band][bucket_key].append(entry_id)
+        return True
+
+    def match(self, claim: str) -> Optional[Tuple[float, Dict[str, Any]]]:
+        """
+        Find the most similar resolved claim
+
+        Args:
+            claim: The new claim
+
+        Returns:
+            Tuple of (estimated Jaccard similarity, entry with 'claim' and 'verification'),
+            or None if no resolved claim reaches the threshold with the same key terms
+        """
+        signature = minhash(claim)
+        terms = key_terms(claim)
+        with self._lock:
+            candidates = {
+                entry_id
+                for band, bucket_key in enumerate(self._bands(signature))
+                for entry_id in self.buckets[band].get(bucket_key, ())
+            }
+            if not candidates:
+                return None
+            candidates = list(candidates)
+            similarities = (np.stack([self.signatures[entry_id] for entry_id in candidates]) == signature).mean(axis=1)
+            # Most similar first; a claim with a different number, direction or entity never reuses a verdict
+            for index in np.argsort(-similarities):
+                if similarities[index] < self.threshold:
+                    return None
+                entry = self.entries[candidates[index]]
+                if same_key_terms(entry['terms'], terms):
+                    return round(float(similarities[index]), 3), entry
+            return None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+def get_claim_matcher() -> ClaimMatcher:
+    """Return the shared matcher, loading the resolved claims from the database on first use"""
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                matcher = ClaimMatcher()
+                try:
+                    # Imported lazily: the database module connects to MongoDB on import
+                    from database import get_resolved_claims
+                    for entry in get_resolved_claims():
+                        matcher.add(entry['claim'], entry['verification'])
+                    print(f'[ClaimMatcher] Loaded {len(matcher)} resolved claims')
+                except Exception as exc:
+                    print(f'[ClaimMatcher] Could not load resolved claims: {exc}')
+                _matcher = matcher
+    return _matcher
+
+def remember_claim(claim: str, verification: Dict[str, Any]) -> None:
+    """Index a newly resolved claim and store it for later runs"""
+    if get_claim_matcher().add(claim, verification):
+        from database import store_resolved_claim
+        store_resolved_claim(claim_key(claim), claim, verification)
@@ -0,0 +1,116 @@
+"""
+Claim Selection Module
+This module picks the sentences of an article most worth fact checking. It
+segments the text into sentences with the shared segmenter in text_utils and
+scores every sentence on check-worthiness features:
+numbers and quantities, named entities, attribution verbs and comparatives.
+Features are counted with one regex pass over the whole article and binned
+into sentences with NumPy, so scoring cost barely grows with sentence count.
+"""
+
+import re
+from typing import List, Tuple
+
+import numpy as np
+
+from keywords import alias_regex
+from text_utils import segment_sentences, is_boilerplate, sentence_key
+
+# Sentences outside this length range are headlines, captions or run-ons
+MIN_CLAIM_CHARS = 40
+MAX_CLAIM_CHARS = 400
+
+# Check-worthiness features, each counted over the whole text at once
+FEATURES = [
+    # Numbers, dates and figures
+    ('numbers', re.compile(r'\b\d[\d,.]*\b')),
+    # Quantities and money
+    ('quantities', re.compile(r'%|\bper ?cent\b|\b(?:crore|lakh|million|billion|trillion|thousand|hundred)s?\b|\bRs\.?\s?\d|[$₹£€]\s?\d', re.IGNORECASE)),
+    # Capitalized words (sentence-initial words are subtracted below)
+    ('entities', re.compile(r'\b[A-Z][a-z]+(?:[-\'][A-Za-z]+)?\b')),
+    ('acronyms', re.compile(r'\b[A-Z]{2,6}\b')),
+    ('organizations', alias_regex),
+    # Reported statements are what fact checkers review
+    ('attribution', re.compile(r'\b(?:said|says|told|claimed|claims|according to|alleged|alleges|announced|stated|reported|confirmed|denied|estimated|revealed|insisted|accused)\b', re.IGNORECASE)),
+    # Comparisons and changes are checkable against records
+    ('comparatives', re.compile(r'\b(?:more|less|fewer) than\b|\b(?:higher|lower|highest|lowest|largest|biggest|smallest|fastest|record|doubled?|tripled?|increased?|decreased?|rose|rise|risen|fell|fall|dropped|surged?|declined?|grew|jumped|slumped)\b', re.IGNORECASE)),
+    # Opinion, speculation and questions are not checkable
+    ('opinion', re.compile(r'\b(?:i think|i believe|we believe|in my opinion|should|might|perhaps|hopefully|could be|may be)\b|\?', re.IGNORECASE)),
+]
+
+FEATURE_WEIGHTS = np.array([
+    1.0,   # numbers
+    1.2,   # quantities
+    0.6,   # entities
+    0.5,   # acronyms
+    0.8,   # organizations
+    1.0,   # attribution
+    0.9,   # comparatives
+    -1.5,  # opinion
+])
+
+def _binned_counts(regex: re.Pattern, text: str, starts: np.ndarray) -> np.ndarray:
+    # Count matches over the whole text and assign each to the sentence it starts in
+    positions = np.fromiter((match.start() for match in regex.finditer(text)), dtype=np.int64)
+    if not positions.size:
+        return np.zeros(len(starts))
+    sentence_index = np.searchsorted(starts, positions, side='right') - 1
+    sentence_index = sentence_index[sentence_index >= 0]
+    return np.bincount(sentence_index, minlength=len(starts)).astype(float)
+
+def score_sentences(text: str) -> Tuple[List[str], np.ndarray]:
+    """
+    Score every sentence of a text for check-worthiness
+
+    Args:
+        text: The article text
+
+    Returns:
+        Tuple of (sentences, scores); unusable sentences (too short or long, boilerplate) score -inf
+    """
+    spans = segment_sentences(text)
+    if not spans:
+        return [], np.array([])
+    sentences = [text[start:end] for start, end in spans]
+    starts = np.array([start for start, _ in spans], dtype=np.int64)
+
+    counts = np.column_stack([_binned_counts(regex, text, starts) for _, regex in FEATURES])
+    # The first word of a sentence is capitalized anyway
+    entity_column = [name for name, _ in FEATURES].index('entities')
+    counts[:, entity_column] = np.maximum(counts[:, entity_column] - 1, 0)
+
+    # Diminishing returns: the fifth number in a sentence adds less than the first
+    scores = np.log1p(counts) @ FEATURE_WEIGHTS
+
+    lengths = np.array([end - start for start, end in spans])
+    boilerplate = np.array([is_boilerplate(sentence) for sentence in sentences])
+    scores[(lengths < MIN_CLAIM_CHARS) | (lengths > MAX_CLAIM_CHARS) | boilerplate] = -np.inf
+    return sentences, scores
+
+def select_claims(text: str, max_claims: int = 3) -> List[str]:
+    """
+    Pick the most check-worthy sentences of an article
+
+    Args:
+        text: The article text
+        max_claims: Number of claims to return
+
+    Returns:
+        Claims, most check-worthy first (repeated sentences are returned once)
+    """
+    sentences, scores = score_sentences(text)
+    if not sentences:
+        return []
+
+    # Stable sort keeps article order between equal scores
+    order = np.argsort(-scores, kind='stable')
+    claims = []
+    seen = set()
+    for index in order:
+        if not np.isfinite(scores[index]) or len(claims) >= max_claims:
+            break
+        key = sentence_key(sentences[index])
+        if key not in seen:
+            seen.add(key)
+            claims.append(sentences[index])
+    return claims
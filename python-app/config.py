@@ -10,3 +10,94 @@ ADMIN_EMAIL = os.getenv('ADMIN_EMAIL')
 ADMIN_PASSWORD = os.getenv('ADMIN_PASSWORD')
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 FACT_CHECK_API_KEY = os.getenv('FACT_CHECK_API_KEY')  # Google Fact Check API key
+
+# Fact check requests: concurrent API calls, per-request timeout and overall deadline per article (seconds)
+FACT_CHECK_CONCURRENCY = int(os.getenv('FACT_CHECK_CONCURRENCY', '3'))
+FACT_CHECK_TIMEOUT = float(os.getenv('FACT_CHECK_TIMEOUT', '5'))
+FACT_CHECK_DEADLINE = float(os.getenv('FACT_CHECK_DEADLINE', '8'))
+# Fact check cache: lifetime of cached results and of cached empty results (seconds), and whether claim keys are stemmed
+FACT_CHECK_CACHE_TTL = int(os.getenv('FACT_CHECK_CACHE_TTL', str(7 * 24 * 3600)))
+FACT_CHECK_NEGATIVE_TTL = int(os.getenv('FACT_CHECK_NEGATIVE_TTL', str(24 * 3600)))
+FACT_CHECK_CACHE_STEM = os.getenv('FACT_CHECK_CACHE_STEM', '1').lower() in ('1', 'true', 'yes')
+# Fact check backend: 'local-first' (imported ClaimReview index, Google API on misses), 'local' or 'remote'
+FACT_CHECK_BACKEND = os.getenv('FACT_CHECK_BACKEND', 'local-first').lower()
+# Local fact check index directory and the minimum match score (0-1) for a local hit
+FACT_CHECK_INDEX_DIR = os.getenv('FACT_CHECK_INDEX_DIR', 'factcheck_index')
+FACT_CHECK_INDEX_MIN_SCORE = float(os.getenv('FACT_CHECK_INDEX_MIN_SCORE', '0.6'))
+# Minimum estimated Jaccard similarity (0-1) for a claim to reuse the verification of an earlier, similar claim
+# (numbers, negations, directions and named entities must also match)
+FACT_CHECK_SIMILARITY = float(os.getenv('FACT_CHECK_SIMILARITY', '0.85'))
+
+# Gemini prompt sizing: per-request content budget (in tokens) and parallelism for long articles
+GEMINI_TOKEN_BUDGET = int(os.getenv('GEMINI_TOKEN_BUDGET', '6000'))
+GEMINI_CHUNK_WORKERS = int(os.getenv('GEMINI_CHUNK_WORKERS', '4'))
+
+# Gemini quota: requests and tokens per minute, and the share of it held back from batch work
+GEMINI_RPM = int(os.getenv('GEMINI_RPM', '15'))
+GEMINI_TPM = int(os.getenv('GEMINI_TPM', '1000000'))
+GEMINI_BATCH_RESERVE = float(os.getenv('GEMINI_BATCH_RESERVE', '0.25'))
+# File holding the quota buckets shared by every process on the host (extension API, FastAPI backend, Streamlit);
+# empty picks a per-key file in the temp directory, 'none' keeps the quota per process
+GEMINI_QUOTA_FILE = os.getenv('GEMINI_QUOTA_FILE', '')
+
+# Chat history: token threshold before older turns are summarized, and the number of recent turns kept verbatim
+CHAT_HISTORY_BUDGET = int(os.getenv('CHAT_HISTORY_BUDGET', '8000'))
+CHAT_KEEP_TURNS = int(os.getenv('CHAT_KEEP_TURNS', '4'))
+
+# Sentiment mode: 'gemini' (model fills sentiment), 'local' (lexicon scoring) or 'hybrid' (local first, Gemini upgrade in background)
+SENTIMENT_MODE = os.getenv('SENTIMENT_MODE', 'gemini').lower()
+
+# Build the Gemini model at import time instead of on first use (warmer first request, slower startup)
+GEMINI_EAGER_INIT = os.getenv('GEMINI_EAGER_INIT', '').lower() in ('1', 'true', 'yes')
+
+# Model backend: 'gemini' (Google API) or 'mock' (offline stand-in for load testing)
+GEMINI_BACKEND = os.getenv('GEMINI_BACKEND', 'gemini').lower()
+# Mock backend behavior: latency distribution ('fixed:<s>', 'uniform:<low>:<high>' or 'lognormal:<median>:<sigma>'),
+# and the share of calls failing with a 429 or returning malformed output
+MOCK_GEMINI_LATENCY = os.getenv('MOCK_GEMINI_LATENCY', 'lognormal:1.5:0.4')
+MOCK_GEMINI_RATE_LIMIT = float(os.getenv('MOCK_GEMINI_RATE_LIMIT', '0.02'))
+MOCK_GEMINI_MALFORMED = float(os.getenv('MOCK_GEMINI_MALFORMED', '0.01'))
+
+# Gemini cost accounting: USD per million input/output tokens, and how often the daily metrics rollup is persisted (seconds)
+GEMINI_INPUT_PRICE = float(os.getenv('GEMINI_INPUT_PRICE', '0.075'))
+GEMINI_OUTPUT_PRICE = float(os.getenv('GEMINI_OUTPUT_PRICE', '0.30'))
+METRICS_FLUSH_INTERVAL = int(os.getenv('METRICS_FLUSH_INTERVAL', '60'))
+
+# Extension API server (Api.py): worker threads, read timeout of a request in progress and how long an
+# idle keep-alive connection may hold its worker waiting for the next request (seconds)
+API_WORKERS = int(os.getenv('API_WORKERS', '16'))
+API_REQUEST_TIMEOUT = float(os.getenv('API_REQUEST_TIMEOUT', '15'))
+API_KEEPALIVE_TIMEOUT = float(os.getenv('API_KEEPALIVE_TIMEOUT', '2'))
+# Longest a job event stream holds its worker before it ends and the client reconnects (seconds)
+API_EVENT_STREAM_TIMEOUT = float(os.getenv('API_EVENT_STREAM_TIMEOUT', '30'))
+
+# Batch analyze endpoint (/api/analyze/batch): URLs per request and seconds to wait before answering
+API_BATCH_MAX_URLS = int(os.getenv('API_BATCH_MAX_URLS', '50'))
+API_BATCH_WAIT = float(os.getenv('API_BATCH_WAIT', '10'))
+
+# Background jobs (both APIs): jobs running at once and seconds finished job results are kept
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '4'))
+JOB_TTL = float(os.getenv('JOB_TTL', '3600'))
+
+# Response encoding (both APIs): JSON serializer ('auto' uses orjson when installed, 'orjson' or 'json'),
+# smallest body compressed (bytes) and gzip level / brotli quality
+JSON_SERIALIZER = os.getenv('JSON_SERIALIZER', 'auto').lower()
+COMPRESSION_MIN_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', '1024'))
+GZIP_LEVEL = int(os.getenv('GZIP_LEVEL', '5'))
+BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', '4'))
+
+# Storage: MongoDB server and database, and the directory of the JSON file fallback
+# (the load test points these at scratch stores so benchmark analyses stay out of the real one)
+MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
+MONGODB_DATABASE = os.getenv('MONGODB_DATABASE', 'news_database')
+DATA_DIR = os.getenv('DATA_DIR', '.')
+
+# Write-behind storage of analyses: queued writes before callers wait, writes per batch, seconds a batch waits to fill,
+# seconds a caller waits on a full queue before storing its write itself, seconds pending writes are flushed for at exit,
+# and attempts at a failing batch before it is spilled to DATA_DIR/failed_writes.jsonl (replayed when the writer next starts)
+DB_WRITE_QUEUE_SIZE = int(os.getenv('DB_WRITE_QUEUE_SIZE', '1000'))
+DB_WRITE_BATCH_SIZE = int(os.getenv('DB_WRITE_BATCH_SIZE', '50'))
+DB_WRITE_INTERVAL = float(os.getenv('DB_WRITE_INTERVAL', '0.5'))
+DB_WRITE_TIMEOUT = float(os.getenv('DB_WRITE_TIMEOUT', '5'))
+DB_FLUSH_TIMEOUT = float(os.getenv('DB_FLUSH_TIMEOUT', '30'))
+DB_WRITE_RETRIES = int(os.getenv('DB_WRITE_RETRIES', '3'))
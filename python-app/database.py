@@ -1,18 +1,29 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
 from datetime import datetime, timedelta
 import pandas as pd
+import atexit
 import json
 import os
+import queue
+import threading
+import time
+
+from config import MONGODB_URI, MONGODB_DATABASE, DATA_DIR, DB_WRITE_QUEUE_SIZE, DB_WRITE_BATCH_SIZE, DB_WRITE_INTERVAL, DB_WRITE_TIMEOUT, DB_FLUSH_TIMEOUT, DB_WRITE_RETRIES
 
 # MongoDB connection settings
 MONGODB_AVAILABLE = True
 try:
     # Increase timeout for first connection
-    client = MongoClient('mongodb://localhost:27017/', serverSelectionTimeoutMS=5000)
+    client = MongoClient(MONGODB_URI, serverSelectionTimeoutMS=5000)
     client.server_info()  # Will throw an exception if the connection fails
-    database = client['news_database']
+    database = client[MONGODB_DATABASE]
     news_collection = database['news']
     trends_collection = database['trends']
+    metrics_collection = database['metrics']
+    claims_collection = database['claims']
+    resolved_claims_collection = database['resolved_claims']
+    # Cached fact check lookups are removed by MongoDB once they expire
+    claims_collection.create_index('expires_at', expireAfterSeconds=0)
     print("MongoDB connection successful")
 except Exception as e:
     MONGODB_AVAILABLE = False
@@ -20,8 +31,14 @@ except Exception as e:
     print("Using local file storage for data as fallback")
 
 # Local file storage (fallback when MongoDB is not available)
-NEWS_FILE = "news_data.json"
-TRENDS_FILE = "trends_data.json"
+NEWS_FILE = os.path.join(DATA_DIR, "news_data.json")
+TRENDS_FILE = os.path.join(DATA_DIR, "trends_data.json")
+NEWS_VERSIONS_FILE = os.path.join(DATA_DIR, "news_versions.json")
+METRICS_FILE = os.path.join(DATA_DIR, "metrics_data.json")
+CLAIMS_FILE = os.path.join(DATA_DIR, "claims_cache.json")
+RESOLVED_CLAIMS_FILE = os.path.join(DATA_DIR, "resolved_claims.json")
+# Analysis writes that could not be stored, one JSON batch per line
+FAILED_WRITES_FILE = os.path.join(DATA_DIR, "failed_writes.jsonl")
 
 def get_news_from_file():
     """Get news data from local file"""
@@ -49,46 +66,268 @@ def save_trends_to_file(trends_data):
     with open(TRENDS_FILE, 'w') as f:
         json.dump(trends_data, f, default=str)  # Convert datetime objects to strings
 
-def database_history(document_name, data):
-    """Store news data in database or file"""
+def get_versions_from_file():
+    """Get the analysis version tags of the stored news data from local file"""
     try:
-        if MONGODB_AVAILABLE:
-            # MongoDB implementation
-            news_document = news_collection.find_one({'_id': document_name})
-            if news_document and news_document.get('news_data') == data:
-                print(f'[Database] News data for "{document_name}" already exists.')
-                return
+        with open(NEWS_VERSIONS_FILE, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
 
-            news_collection.update_one(
-                {'_id': document_name},
-                {'$set': {'news_data': data}},
-                upsert=True
-            )
+def save_versions_to_file(versions):
+    """Save the analysis version tags to local file"""
+    with open(NEWS_VERSIONS_FILE, 'w') as f:
+        json.dump(versions, f, default=str)
+
+def database_history(document_name, data, version=None, record_trend=True):
+    """
+    Queue news data to be stored in the database or file
+
+    The write-behind writer stores it in the background (see WriteBehindQueue),
+    so the caller does not wait for storage. The data must not be modified after
+    it is queued.
 
-            print(f'[Database] News data for "{document_name}" stored.')
+    Args:
+        document_name: Document key (the article URL)
+        data: News analysis data
+        version: Analysis version tag ({'prompt_version', 'model'}) for Gemini analyses, None otherwise
+        record_trend: Whether to add the analysis to the trends collection
+    """
+    write_queue.put((document_name, data, version, record_trend))
+
+def store_analyses(items):
+    """
+    Store a batch of news data in the database or file
+
+    Args:
+        items: List of (document_name, data, version, record_trend) tuples; a later
+            item for the same document replaces an earlier one
+    """
+    batch = {}
+    for document_name, data, version, record_trend in items:
+        earlier = batch.get(document_name)
+        version_fields = {'prompt_version': None, 'model': None, **(version or {})}
+        batch[document_name] = (data, version_fields, record_trend or bool(earlier and earlier[2]))
+
+    try:
+        analyzed_at = datetime.now()
+        if MONGODB_AVAILABLE:
+            # MongoDB implementation: one lookup and one bulk upsert for the whole batch
+            stored = {
+                news_document['_id']: news_document
+                for news_document in news_collection.find({'_id': {'$in': list(batch)}}, {'news_data': 1, 'prompt_version': 1})
+            }
+            changed = [
+                document_name for document_name, (data, version_fields, _) in batch.items()
+                if not (document_name in stored
+                        and stored[document_name].get('news_data') == data
+                        and stored[document_name].get('prompt_version') == version_fields['prompt_version'])
+            ]
+            if changed:
+                news_collection.bulk_write([
+                    UpdateOne(
+                        {'_id': document_name},
+                        {'$set': {'news_data': batch[document_name][0], **batch[document_name][1], 'analyzed_at': analyzed_at}},
+                        upsert=True
+                    )
+                    for document_name in changed
+                ], ordered=False)
         else:
-            # File-based implementation
+            # File-based implementation: the files are read and rewritten once per batch
+            # (version tags are kept alongside, so the news file format is unchanged)
             news_data = get_news_from_file()
-            
-            if document_name in news_data and news_data[document_name] == data:
-                print(f'[Database] News data for "{document_name}" already exists.')
-                return
-            
-            news_data[document_name] = data
-            save_news_to_file(news_data)
-            print(f'[Database] News data for "{document_name}" stored.')
-            
+            versions = get_versions_from_file()
+            changed = [
+                document_name for document_name, (data, version_fields, _) in batch.items()
+                if not (document_name in news_data
+                        and news_data[document_name] == data
+                        and versions.get(document_name, {}).get('prompt_version') == version_fields['prompt_version'])
+            ]
+            if changed:
+                for document_name in changed:
+                    news_data[document_name] = batch[document_name][0]
+                    versions[document_name] = {**batch[document_name][1], 'analyzed_at': analyzed_at}
+                save_news_to_file(news_data)
+                save_versions_to_file(versions)
+
+        print(f'[Database] {len(changed)} news data stored, {len(batch) - len(changed)} already existed.')
+
         # Store trend data for historical analysis
-        store_trend_data(data)
+        trends = [trend_record(batch[document_name][0]) for document_name in changed if batch[document_name][2]]
+        store_trend_records([trend for trend in trends if trend is not None])
     except Exception as exc:
+        # The write-behind writer retries the batch
         print(f'Storage error:\n {exc}')
+        raise
 
-def store_trend_data(data):
+class WriteBehindQueue:
     """
-    Store trend data in the trends collection
-    
+    Background writer for analyses
+
+    Writes are queued and stored in batches by one writer thread, which waits
+    up to DB_WRITE_INTERVAL seconds for a batch to fill. When the queue is full
+    the caller waits for room (backpressure) for up to DB_WRITE_TIMEOUT seconds
+    and then stores its write itself, so no write is dropped. A batch that fails
+    is retried with backoff up to DB_WRITE_RETRIES times and then spilled to
+    FAILED_WRITES_FILE, which the writer replays when it next starts. Pending
+    writes are flushed at exit.
+    """
+
+    def __init__(self, store, max_pending=DB_WRITE_QUEUE_SIZE, batch_size=DB_WRITE_BATCH_SIZE,
+                 interval=DB_WRITE_INTERVAL, timeout=DB_WRITE_TIMEOUT, retries=DB_WRITE_RETRIES,
+                 spill_file=FAILED_WRITES_FILE):
+        self._store = store
+        self._queue = queue.Queue(maxsize=max_pending)
+        self.batch_size = batch_size
+        self.interval = interval
+        self.timeout = timeout
+        self.retries = retries
+        self.spill_file = spill_file
+        # The writer and callers storing their own write never rewrite the files at the same time
+        self._store_lock = threading.Lock()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self.queued = 0
+        self.written = 0
+        self.batches = 0
+        self.waits = 0
+        self.inline_writes = 0
+        self.retried = 0
+        self.failed_batches = 0
+        self.spilled = 0
+        self.replayed = 0
+
+    def _start(self):
+        # Started with the first write, so importing the module starts no thread
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._run, name='db-writer', daemon=True)
+                    self._writer.start()
+                    atexit.register(self.flush)
+
+    def put(self, item):
+        """Queue a write, waiting for room if the writer has fallen behind"""
+        self._start()
+        self.queued += 1
+        try:
+            self._queue.put_nowait(item)
+            return
+        except queue.Full:
+            self.waits += 1
+        try:
+            self._queue.put(item, timeout=self.timeout)
+        except queue.Full:
+            print('[Database] Write queue full, storing the write directly')
+            self.inline_writes += 1
+            # The caller has already waited, so its write is tried once before it is spilled
+            self._write([item], attempts=1)
+
+    def _write(self, batch, attempts):
+        """Store a batch, retrying with backoff; spill it to disk if every attempt fails"""
+        for attempt in range(attempts):
+            try:
+                with self._store_lock:
+                    self._store(batch)
+                self.written += len(batch)
+                return
+            except Exception as exc:
+                print(f'[Database] Write batch failed (attempt {attempt + 1} of {attempts}): {exc}')
+                if attempt + 1 < attempts:
+                    self.retried += 1
+                    time.sleep(min(2 ** attempt, 10))
+        self.failed_batches += 1
+        self._spill(batch)
+
+    def _spill(self, batch):
+        try:
+            with self._store_lock, open(self.spill_file, 'a') as f:
+                f.write(json.dumps(batch, default=str) + '\n')
+            self.spilled += len(batch)
+            print(f'[Database] {len(batch)} writes spilled to {self.spill_file}')
+        except OSError as exc:
+            print(f'[Database] {len(batch)} writes lost, spilling failed: {exc}')
+
+    def _replay_spilled(self):
+        # Claimed by renaming, so writers of several processes never replay the same batches
+        claimed = f'{self.spill_file}.{os.getpid()}'
+        try:
+            os.replace(self.spill_file, claimed)
+        except OSError:
+            return
+        try:
+            with open(claimed) as f:
+                batches = [json.loads(line) for line in f if line.strip()]
+        except (OSError, ValueError) as exc:
+            print(f'[Database] Spilled writes in {claimed} could not be read: {exc}')
+            return
+        os.remove(claimed)
+        for batch in batches:
+            print(f'[Database] Replaying {len(batch)} spilled writes')
+            self.replayed += len(batch)
+            self._write([tuple(item) for item in batch], attempts=self.retries)
+
+    def _run(self):
+        self._replay_spilled()
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch, attempts=self.retries)
+            finally:
+                self.batches += 1
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self, timeout=DB_FLUSH_TIMEOUT):
+        """
+        Wait until every queued write is stored (or spilled)
+
+        Returns:
+            False if the timeout passed with writes still pending
+        """
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    print(f'[Database] {self._queue.unfinished_tasks} writes still pending after {timeout}s')
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def stats(self):
+        """Return the queue counters for the metrics endpoint"""
+        return {
+            'pending': self._queue.qsize(),
+            'queued': self.queued,
+            'written': self.written,
+            'batches': self.batches,
+            'backpressure_waits': self.waits,
+            'inline_writes': self.inline_writes,
+            'retries': self.retried,
+            'failed_batches': self.failed_batches,
+            'spilled': self.spilled,
+            'replayed': self.replayed
+        }
+
+# Shared write-behind queue for all analysis writes in the process
+write_queue = WriteBehindQueue(store_analyses)
+
+def trend_record(data):
+    """
+    Build the trend entry of an analysis
+
     Args:
         data: News analysis data
+
+    Returns:
+        Trend dictionary, or None if the analysis has no usable sentiment
     """
     try:
         # Extract relevant data for trends
@@ -116,19 +355,310 @@ def store_trend_data(data):
             if isinstance(fact_check, dict) and fact_check.get('article_status') == 'False':
                 trend_data['misinformation_flag'] = True
                 trend_data['misinformation_count'] = len(fact_check.get('verified_claims', []))
-        
-        # Store trend data
+        return trend_data
+    except Exception as exc:
+        print(f'Error storing trend data: {exc}')
+        return None
+
+def store_trend_records(trend_records):
+    """
+    Store trend entries in the trends collection
+
+    Args:
+        trend_records: List of trend dictionaries
+    """
+    if not trend_records:
+        return
+    try:
         if MONGODB_AVAILABLE:
             # MongoDB implementation
-            trends_collection.insert_one(trend_data)
+            trends_collection.insert_many(trend_records)
         else:
             # File-based implementation
             trends_data = get_trends_from_file()
-            trends_data.append(trend_data)
+            trends_data.extend(trend_records)
             save_trends_to_file(trends_data)
     except Exception as exc:
         print(f'Error storing trend data: {exc}')
 
+def store_trend_data(data):
+    """
+    Store trend data in the trends collection
+    
+    Args:
+        data: News analysis data
+    """
+    trend_data = trend_record(data)
+    if trend_data is not None:
+        store_trend_records([trend_data])
+
+def get_analysis(document_name, with_version=False):
+    """
+    Get the stored analysis of a single article
+
+    Args:
+        document_name: Document key (the canonical article URL)
+        with_version: Also return the version tag stored with the analysis
+
+    Returns:
+        Analysis dictionary, or None if the article has not been analyzed
+        (a tuple of (analysis, version tag or None) with with_version)
+    """
+    analysis, version = None, None
+    try:
+        if MONGODB_AVAILABLE:
+            news_document = news_collection.find_one({'_id': document_name}, {'news_data': 1, 'prompt_version': 1, 'model': 1})
+            if news_document:
+                analysis = news_document.get('news_data')
+                version = {'prompt_version': news_document.get('prompt_version'), 'model': news_document.get('model')}
+        else:
+            analysis = get_news_from_file().get(document_name)
+            version = get_versions_from_file().get(document_name) if with_version else None
+    except Exception as exc:
+        print(f'Error retrieving analysis: {exc}')
+    return (analysis, version) if with_version else analysis
+
+def get_stored_analyses(limit=None, category_source=None):
+    """
+    Get stored article analyses from the news collection
+
+    Args:
+        limit: Maximum number of analyses to return, most recently analyzed first (all if None)
+        category_source: Only return analyses whose category has this source (e.g. 'gemini')
+
+    Returns:
+        List of analysis dictionaries (archive results and other non-dict entries are skipped)
+    """
+    try:
+        if MONGODB_AVAILABLE:
+            query = {'news_data.category_source': category_source} if category_source else {}
+            cursor = news_collection.find(query, {'news_data': 1})
+            if limit:
+                cursor = cursor.sort('analyzed_at', -1).limit(limit)
+            analyses = [document.get('news_data') for document in cursor]
+        else:
+            # The news file keeps insertion order, so the latest analyses are at the end
+            analyses = [
+                analysis for analysis in get_news_from_file().values()
+                if not category_source or (isinstance(analysis, dict) and analysis.get('category_source') == category_source)
+            ]
+            if limit:
+                analyses = analyses[::-1][:limit]
+        return [analysis for analysis in analyses if isinstance(analysis, dict)]
+    except Exception as exc:
+        print(f'Error retrieving stored analyses: {exc}')
+        return []
+
+# The metrics flusher and day rollovers may write the rollup file at the same time
+_metrics_lock = threading.Lock()
+
+def store_metrics_rollup(day, process, rollup):
+    """
+    Store a process's daily Gemini usage rollup (one document per day and process, overwritten as the day progresses)
+
+    Args:
+        day: ISO date of the rollup
+        process: Id of the process that recorded the calls
+        rollup: Rollup dictionary from the metrics module
+    """
+    key = f'{day}|{process}'
+    try:
+        if MONGODB_AVAILABLE:
+            metrics_collection.update_one(
+                {'_id': key},
+                {'$set': {**rollup, 'day': day, 'process': process, 'updated_at': datetime.now()}},
+                upsert=True
+            )
+        else:
+            with _metrics_lock:
+                try:
+                    with open(METRICS_FILE, 'r') as f:
+                        rollups = json.load(f)
+                except (FileNotFoundError, json.JSONDecodeError):
+                    rollups = {}
+                rollups[key] = {**rollup, 'day': day, 'process': process, 'updated_at': datetime.now()}
+                with open(METRICS_FILE, 'w') as f:
+                    json.dump(rollups, f, default=str)
+    except Exception as exc:
+        print(f'Error storing metrics rollup: {exc}')
+
+def get_metrics_rollups(days=30):
+    """
+    Get the per-process Gemini usage rollups of the most recent days
+
+    Args:
+        days: Number of days to return
+
+    Returns:
+        List of rollup dictionaries (metrics.merge_rollups sums them per day)
+    """
+    since = (datetime.now() - timedelta(days=days - 1)).date().isoformat()
+    try:
+        if MONGODB_AVAILABLE:
+            return list(metrics_collection.find({'day': {'$gte': since}}))
+        with open(METRICS_FILE, 'r') as f:
+            rollups = json.load(f)
+        # Files written before per-process rollups are keyed by day alone
+        return [rollup for rollup in rollups.values() if isinstance(rollup, dict) and rollup.get('day', '') >= since]
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+    except Exception as exc:
+        print(f'Error retrieving metrics rollups: {exc}')
+        return []
+
+def get_stale_analyses(version, limit=None):
+    """
+    Get stored Gemini analyses produced with a different prompt or model
+
+    Records stored before versioning (no tag at all) count as stale; records
+    explicitly stored without a version (local or mock analyses) are skipped.
+
+    Args:
+        version: Current analysis version tag ({'prompt_version', 'model'})
+        limit: Maximum number of records to return (all if None)
+
+    Returns:
+        List of (document name, analysis dictionary) pairs
+    """
+    def is_stale(tag):
+        if tag is None:
+            return True
+        if tag.get('prompt_version') is None:
+            return False
+        return tag.get('prompt_version') != version['prompt_version'] or tag.get('model') != version['model']
+
+    try:
+        if MONGODB_AVAILABLE:
+            cursor = news_collection.find(
+                {'$or': [
+                    {'prompt_version': {'$exists': False}},
+                    {'prompt_version': {'$nin': [None, version['prompt_version']]}},
+                    {'prompt_version': version['prompt_version'], 'model': {'$ne': version['model']}}
+                ]},
+                {'news_data': 1}
+            )
+            records = [(document['_id'], document.get('news_data')) for document in cursor]
+        else:
+            versions = get_versions_from_file()
+            records = [
+                (document_name, data) for document_name, data in get_news_from_file().items()
+                if is_stale(versions.get(document_name))
+            ]
+        records = [
+            (name, data) for name, data in records
+            if isinstance(data, dict) and data.get('content') and data.get('analysis_mode') not in ('local', 'mock')
+        ]
+        return records[:limit] if limit else records
+    except Exception as exc:
+        print(f'Error retrieving stale analyses: {exc}')
+        return []
+
+def get_cached_claim(claim_key):
+    """
+    Get a cached fact check lookup
+
+    Args:
+        claim_key: Normalized claim key
+
+    Returns:
+        Dictionary with 'claims' and 'expires_at', or None if not cached or expired
+    """
+    try:
+        if MONGODB_AVAILABLE:
+            entry = claims_collection.find_one({'_id': claim_key})
+        else:
+            try:
+                with open(CLAIMS_FILE, 'r') as f:
+                    entry = json.load(f).get(claim_key)
+            except (FileNotFoundError, json.JSONDecodeError):
+                entry = None
+            if entry:
+                entry['expires_at'] = datetime.fromisoformat(entry['expires_at'])
+        # The TTL index removes expired documents only periodically, so expiry is checked here too
+        if entry and entry['expires_at'] > datetime.now():
+            return entry
+        return None
+    except Exception as exc:
+        print(f'Error retrieving cached claim: {exc}')
+        return None
+
+def store_cached_claim(claim_key, claim_text, claims, expires_at):
+    """
+    Cache a fact check lookup until it expires
+
+    Args:
+        claim_key: Normalized claim key
+        claim_text: Claim as sent to the fact check API
+        claims: Fact check results (an empty list caches a miss)
+        expires_at: Expiry datetime
+    """
+    entry = {'claim': claim_text, 'claims': claims, 'expires_at': expires_at}
+    try:
+        if MONGODB_AVAILABLE:
+            claims_collection.update_one({'_id': claim_key}, {'$set': entry}, upsert=True)
+        else:
+            try:
+                with open(CLAIMS_FILE, 'r') as f:
+                    cache = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                cache = {}
+            # Expired entries are pruned whenever the file is rewritten
+            now = datetime.now().isoformat()
+            cache = {key: value for key, value in cache.items() if value.get('expires_at', '') > now}
+            cache[claim_key] = {**entry, 'expires_at': expires_at.isoformat()}
+            with open(CLAIMS_FILE, 'w') as f:
+                json.dump(cache, f, default=str)
+    except Exception as exc:
+        print(f'Error storing cached claim: {exc}')
+
+# Resolved claims are stored from concurrent fact checks (API server threads, archive searches),
+# so the file fallback's read-modify-write is serialized
+_resolved_claims_lock = threading.Lock()
+
+def get_resolved_claims():
+    """
+    Get every claim resolved by a fact check
+
+    Returns:
+        List of dictionaries with 'claim' and 'verification'
+    """
+    try:
+        if MONGODB_AVAILABLE:
+            return list(resolved_claims_collection.find({}, {'_id': 0, 'claim': 1, 'verification': 1}))
+        with open(RESOLVED_CLAIMS_FILE, 'r') as f:
+            return list(json.load(f).values())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+    except Exception as exc:
+        print(f'Error retrieving resolved claims: {exc}')
+        return []
+
+def store_resolved_claim(claim_key, claim_text, verification):
+    """
+    Store a claim and its verification summary for fuzzy matching of later claims
+
+    Args:
+        claim_key: Normalized claim key
+        claim_text: The claim
+        verification: Verification summary of the claim
+    """
+    entry = {'claim': claim_text, 'verification': verification, 'resolved_at': datetime.now()}
+    try:
+        if MONGODB_AVAILABLE:
+            resolved_claims_collection.update_one({'_id': claim_key}, {'$set': entry}, upsert=True)
+        else:
+            with _resolved_claims_lock:
+                try:
+                    with open(RESOLVED_CLAIMS_FILE, 'r') as f:
+                        resolved = json.load(f)
+                except (FileNotFoundError, json.JSONDecodeError):
+                    resolved = {}
+                resolved[claim_key] = entry
+                with open(RESOLVED_CLAIMS_FILE, 'w') as f:
+                    json.dump(resolved, f, default=str)
+    except Exception as exc:
+        print(f'Error storing resolved claim: {exc}')
+
 def get_db_connection():
     """
     Get MongoDB database connection
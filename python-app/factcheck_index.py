@@ -0,0 +1,342 @@
+"""
+Fact Check Index Module
+This module keeps a local, read-only index of imported ClaimReview data so
+claims can be verified at local-disk latency before (or instead of) calling
+the Google Fact Check API. The importer accepts Fact Check API responses
+(JSON or JSONL of claims) and schema.org ClaimReview feeds, stores the claims
+in the API's shape and builds an inverted index scored with BM25. Postings
+are flat NumPy arrays memory-mapped from disk, so opening the index is cheap
+and only the pages of the queried terms are read.
+
+Usage:
+    python factcheck_index.py import claims.jsonl datafeed.json
+    python factcheck_index.py search "Vaccines contain microchips"
+"""
+
+import argparse
+import json
+import mmap
+import os
+import shutil
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from claim_cache import normalize_claim
+from text_utils import stem
+from config import FACT_CHECK_INDEX_DIR, FACT_CHECK_INDEX_MIN_SCORE
+from keywords import STOPWORDS
+
+# BM25 parameters (standard values for short documents)
+K1 = 1.2
+B = 0.75
+
+def index_terms(text: str) -> List[str]:
+    """Normalized, stemmed terms of a claim without stopwords"""
+    words = normalize_claim(text or '', stem=False).split()
+    return [stem(word) for word in words if word not in STOPWORDS and len(word) > 1]
+
+def _schema_claim(review: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    # schema.org ClaimReview -> Fact Check API claim shape
+    text = review.get('claimReviewed')
+    if not text:
+        return None
+    item_reviewed = review.get('itemReviewed') or {}
+    author = item_reviewed.get('author') or {}
+    rating = review.get('reviewRating') or {}
+    publisher = review.get('author') or {}
+    return {
+        'text': text,
+        'claimant': author.get('name') if isinstance(author, dict) else None,
+        'claimDate': item_reviewed.get('datePublished'),
+        'claimReview': [{
+            'publisher': {'name': publisher.get('name', 'Unknown'), 'site': publisher.get('url')},
+            'url': review.get('url', ''),
+            'title': review.get('name') or review.get('headline'),
+            'reviewDate': review.get('datePublished'),
+            'textualRating': rating.get('alternateName') or rating.get('ratingExplanation') or 'Unknown',
+            'languageCode': review.get('inLanguage')
+        }]
+    }
+
+def parse_claims(document: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Extract claims in the Fact Check API shape from a parsed dump document
+
+    Args:
+        document: A Fact Check API claim or response, a ClaimReview object, a DataFeed, or a list of these
+
+    Yields:
+        Claim dictionaries with 'text' and 'claimReview'
+    """
+    if isinstance(document, list):
+        for item in document:
+            yield from parse_claims(item)
+    elif isinstance(document, dict):
+        if 'claims' in document:
+            yield from parse_claims(document['claims'])
+        elif 'dataFeedElement' in document:
+            for element in document['dataFeedElement']:
+                yield from parse_claims(element.get('item', []))
+        elif document.get('@type') == 'ClaimReview' or 'claimReviewed' in document:
+            claim = _schema_claim(document)
+            if claim:
+                yield claim
+        elif document.get('text') and document.get('claimReview'):
+            yield document
+
+def read_dump(path: str) -> Iterator[Dict[str, Any]]:
+    """Read claims from a JSON or JSONL dump file"""
+    with open(path, 'r', encoding='utf-8') as file:
+        if path.endswith('.jsonl'):
+            for line in file:
+                if line.strip():
+                    yield from parse_claims(json.loads(line))
+        else:
+            yield from parse_claims(json.load(file))
+
+def _claim_id(claim: Dict[str, Any]) -> Tuple[str, Tuple[str, ...]]:
+    # The same claim reviewed by the same articles is imported once
+    urls = tuple(sorted(review.get('url', '') for review in claim.get('claimReview', [])))
+    return normalize_claim(claim['text']), urls
+
+def build_index(claims: Iterable[Dict[str, Any]], index_dir: str = FACT_CHECK_INDEX_DIR) -> int:
+    """
+    Write a new index for a set of claims, replacing the existing one
+
+    Files: claims.jsonl (documents), offsets.npy (document byte offsets),
+    doc_lengths.npy, terms.json (term -> [start, document frequency]),
+    postings_docs.npy / postings_tf.npy (flat postings grouped by term) and meta.json.
+
+    Args:
+        claims: Claims in the Fact Check API shape
+        index_dir: Directory of the index
+
+    Returns:
+        Number of indexed claims
+    """
+    seen = set()
+    documents = []
+    for claim in claims:
+        key = _claim_id(claim)
+        if key not in seen:
+            seen.add(key)
+            documents.append(claim)
+
+    postings = defaultdict(list)
+    doc_lengths = np.zeros(len(documents), dtype=np.int32)
+    for doc_id, claim in enumerate(documents):
+        terms = Counter(index_terms(claim['text']))
+        doc_lengths[doc_id] = sum(terms.values())
+        for term, tf in terms.items():
+            postings[term].append((doc_id, tf))
+
+    terms = {}
+    docs, tfs = [], []
+    for term in sorted(postings):
+        entries = postings[term]
+        terms[term] = [len(docs), len(entries)]
+        docs.extend(doc_id for doc_id, _ in entries)
+        tfs.extend(min(tf, 65535) for _, tf in entries)
+
+    # Build beside the live index and swap it in, so readers never see a partial index
+    build_dir = f'{index_dir}.new'
+    shutil.rmtree(build_dir, ignore_errors=True)
+    os.makedirs(build_dir)
+
+    offsets = [0]
+    with open(os.path.join(build_dir, 'claims.jsonl'), 'wb') as file:
+        for claim in documents:
+            line = json.dumps(claim, ensure_ascii=False).encode('utf-8') + b'\n'
+            file.write(line)
+            offsets.append(offsets[-1] + len(line))
+    np.save(os.path.join(build_dir, 'offsets.npy'), np.array(offsets, dtype=np.int64))
+    np.save(os.path.join(build_dir, 'doc_lengths.npy'), doc_lengths)
+    np.save(os.path.join(build_dir, 'postings_docs.npy'), np.array(docs, dtype=np.uint32))
+    np.save(os.path.join(build_dir, 'postings_tf.npy'), np.array(tfs, dtype=np.uint16))
+    with open(os.path.join(build_dir, 'terms.json'), 'w') as file:
+        json.dump(terms, file)
+    with open(os.path.join(build_dir, 'meta.json'), 'w') as file:
+        json.dump({
+            'documents': len(documents),
+            'average_length': float(doc_lengths.mean()) if len(documents) else 0.0,
+            'terms': len(terms)
+        }, file)
+
+    old_dir = f'{index_dir}.old'
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.isdir(index_dir):
+        os.rename(index_dir, old_dir)
+    os.rename(build_dir, index_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return len(documents)
+
+def import_dumps(paths: List[str], index_dir: str = FACT_CHECK_INDEX_DIR) -> int:
+    """
+    Import ClaimReview dumps, merging them with the claims already indexed
+
+    Args:
+        paths: JSON or JSONL dump files
+        index_dir: Directory of the index
+
+    Returns:
+        Number of claims in the new index
+    """
+    existing = []
+    if os.path.exists(os.path.join(index_dir, 'claims.jsonl')):
+        with open(os.path.join(index_dir, 'claims.jsonl'), 'r', encoding='utf-8') as file:
+            existing = [json.loads(line) for line in file if line.strip()]
+
+    def all_claims() -> Iterator[Dict[str, Any]]:
+        yield from existing
+        for path in paths:
+            yield from read_dump(path)
+
+    count = build_index(all_claims(), index_dir)
+    print(f'[FactCheckIndex] Indexed {count} claims ({count - len(existing)} new)')
+    return count
+
+class FactCheckIndex:
+    """Read-only BM25 index over imported claims, memory-mapped from disk"""
+
+    def __init__(self, index_dir: str = FACT_CHECK_INDEX_DIR):
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, 'meta.json'), 'r') as file:
+            meta = json.load(file)
+        with open(os.path.join(index_dir, 'terms.json'), 'r') as file:
+            self.terms = json.load(file)
+        self.documents = meta['documents']
+        self.average_length = meta['average_length'] or 1.0
+
+        self.offsets = np.load(os.path.join(index_dir, 'offsets.npy'), mmap_mode='r')
+        self.postings_docs = np.load(os.path.join(index_dir, 'postings_docs.npy'), mmap_mode='r')
+        self.postings_tf = np.load(os.path.join(index_dir, 'postings_tf.npy'), mmap_mode='r')
+        # Length normalization is precomputed once per document
+        doc_lengths = np.load(os.path.join(index_dir, 'doc_lengths.npy'))
+        self.length_norm = (K1 * (1 - B + B * doc_lengths / self.average_length)).astype(np.float32)
+
+        self._claims_file = open(os.path.join(index_dir, 'claims.jsonl'), 'rb')
+        self._claims = mmap.mmap(self._claims_file.fileno(), 0, access=mmap.ACCESS_READ) if self.offsets[-1] else b''
+
+    def idf(self, document_frequency: int) -> float:
+        return float(np.log(1 + (self.documents - document_frequency + 0.5) / (document_frequency + 0.5)))
+
+    def claim(self, doc_id: int) -> Dict[str, Any]:
+        """Return an indexed claim by document id"""
+        return json.loads(self._claims[self.offsets[doc_id]:self.offsets[doc_id + 1]])
+
+    def search(self, text: str, top_k: int = 3, min_score: float = FACT_CHECK_INDEX_MIN_SCORE) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Find indexed claims matching a claim text
+
+        Scores are BM25 divided by the score a document containing every query
+        term once would get, so 1.0 means all terms matched and unknown query
+        terms (weighted as the rarest term) pull the score down.
+
+        Args:
+            text: The claim to look up
+            top_k: Maximum number of matches
+            min_score: Minimum normalized score of a match
+
+        Returns:
+            List of (normalized score, claim) pairs, best first
+        """
+        query = Counter(index_terms(text))
+        if not query or not self.documents:
+            return []
+
+        max_idf = self.idf(0)
+        doc_ids, contributions = [], []
+        ideal = 0.0
+        for term, query_tf in query.items():
+            entry = self.terms.get(term)
+            if entry is None:
+                ideal += max_idf * query_tf
+                continue
+            start, document_frequency = entry
+            idf = self.idf(document_frequency)
+            ideal += idf * query_tf
+            docs = self.postings_docs[start:start + document_frequency]
+            tf = self.postings_tf[start:start + document_frequency].astype(np.float32)
+            doc_ids.append(docs)
+            contributions.append(query_tf * idf * tf * (K1 + 1) / (tf + self.length_norm[docs]))
+        if not doc_ids:
+            return []
+
+        # Accumulate per-document scores over the (few) matched documents only
+        docs = np.concatenate(doc_ids)
+        unique_docs, positions = np.unique(docs, return_inverse=True)
+        scores = np.bincount(positions, weights=np.concatenate(contributions)) / ideal
+
+        best = np.argsort(-scores)[:top_k]
+        return [
+            (round(float(scores[index]), 3), self.claim(int(unique_docs[index])))
+            for index in best if scores[index] >= min_score
+        ]
+
+    def close(self) -> None:
+        if isinstance(self._claims, mmap.mmap):
+            self._claims.close()
+        self._claims_file.close()
+
+_index = None
+_index_mtime = None
+_index_lock = threading.Lock()
+
+def get_index() -> Optional[FactCheckIndex]:
+    """Return the local index, reopening it after an import; None if nothing has been imported"""
+    global _index, _index_mtime
+    meta_path = os.path.join(FACT_CHECK_INDEX_DIR, 'meta.json')
+    try:
+        mtime = os.stat(meta_path).st_mtime
+    except OSError:
+        return None
+    if _index is not None and mtime == _index_mtime:
+        return _index
+
+    with _index_lock:
+        if _index is None or mtime != _index_mtime:
+            try:
+                # The previous index stays mapped for searches already running on it
+                _index = FactCheckIndex(FACT_CHECK_INDEX_DIR)
+                _index_mtime = mtime
+                print(f'[FactCheckIndex] Loaded {_index.documents} claims')
+            except (OSError, ValueError, KeyError) as exc:
+                print(f'[FactCheckIndex] Could not load the index: {exc}')
+                return None
+    return _index
+
+def search_claims(text: str, top_k: int = 3) -> List[Dict[str, Any]]:
+    """
+    Look up a claim in the local index
+
+    Args:
+        text: The claim to look up
+        top_k: Maximum number of matches
+
+    Returns:
+        Matching claims in the Fact Check API shape, each with a 'matchScore' (empty if none or no index)
+    """
+    index = get_index()
+    if index is None:
+        return []
+    return [{**claim, 'matchScore': score} for score, claim in index.search(text, top_k)]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local ClaimReview fact check index')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    import_parser = subparsers.add_parser('import', help='Import JSON or JSONL ClaimReview dumps')
+    import_parser.add_argument('paths', nargs='+')
+    search_parser = subparsers.add_parser('search', help='Search the index for a claim')
+    search_parser.add_argument('text')
+    search_parser.add_argument('--top', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == 'import':
+        import_dumps(args.paths)
+    else:
+        for match in search_claims(args.text, args.top):
+            ratings = ', '.join(review.get('textualRating', '') for review in match.get('claimReview', []))
+            print(f"{match['matchScore']:.3f}  {match['text']}  [{ratings}]")
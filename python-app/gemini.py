@@ -1,15 +1,27 @@
-# Core library imports: Google Generative AI setup
-import streamlit as st
-import google.generativeai as genai
-from google.generativeai import GenerativeModel
-from typing import Dict, Any
+# Core library imports: Google Generative AI setup (the SDK itself is imported on first use)
+import ast
+import contextvars
+import hashlib
+import importlib.util
+import json
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Iterator, List, Tuple
 
-# Local project-specific imports: Gemini API key from .env
-from config import GEMINI_API_KEY
+# Local project-specific imports: Gemini API key from .env and token budget helpers
+from config import GEMINI_API_KEY, GEMINI_TOKEN_BUDGET, GEMINI_CHUNK_WORKERS, CHAT_HISTORY_BUDGET, CHAT_KEEP_TURNS, GEMINI_EAGER_INIT, GEMINI_BACKEND
+from token_budget import estimate_tokens, compact_content, chunk_content
+from canonical import canonical_key
+from singleflight import get_group
+from scheduler import scheduler, Priority
+from metrics import gemini_metrics
 
-# Load Gemini API key from Streamlit secrets.toml
-# GEMINI_API_KEY = st.secrets["gemini"]["api_key"]
-genai.configure(api_key=GEMINI_API_KEY)
+MODEL_NAME = 'gemini-1.5-flash-latest'
+# Model tag of analyses produced by the mock backend, so they are never taken for Gemini output
+MOCK_MODEL_NAME = 'mock'
 
 # Generation settings to control the model's output
 generation_config = {
@@ -29,28 +41,331 @@ safety_settings = [
     {'category': 'HARM_CATEGORY_DANGEROUS_CONTENT', 'threshold': 'BLOCK_NONE'}
 ]
 
-# Load system instructions for the Gemini model
-import os
-instructions_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'metadata/gemini_instructions.md')
-with open(instructions_path, 'r') as file:
-    gemini_instructions = file.read()
-
-# Initialize the Gemini model with custom settings and instructions
-llm = GenerativeModel(
-    model_name='gemini-1.5-flash-latest',
-    generation_config=generation_config,
-    safety_settings=safety_settings,
-    system_instruction=gemini_instructions
-)
-
-# Start a chat session with the Gemini model
-chat_session = llm.start_chat(history=[])
-
-def perspec(news_data: Dict[str, Any]) -> Dict[str, Any]:
-    # Send the news data to the Gemini model as plain text due to formatting requirements
-    user_message = f'News Data: {news_data}'
-    bot_response = chat_session.send_message(user_message)
+instructions_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'metadata/gemini_instructions.md')
+
+# Tokens of a typical analysis reply
+expected_output_tokens = 1024
+
+# Flagged passages kept when merging the misinformation status of chunked analyses
+MAX_FLAGGED_EXCERPTS = 3
+
+# Models are built on first use, so importing this module never touches the SDK
+_models: Dict[str, Any] = {}
+_instructions = None
+_model_lock = threading.Lock()
+
+def gemini_available() -> bool:
+    # Check that the SDK is installed without importing it (the mock backend needs no SDK)
+    if GEMINI_BACKEND == 'mock':
+        return True
+    try:
+        return importlib.util.find_spec('google.generativeai') is not None
+    except ModuleNotFoundError:
+        return False
+
+def get_instructions() -> str:
+    # Load system instructions for the Gemini model
+    global _instructions
+    if _instructions is None:
+        with open(instructions_path, 'r') as file:
+            _instructions = file.read()
+    return _instructions
+
+def prompt_version() -> str:
+    """Short hash of the system instructions, stored with every analysis to detect prompt changes"""
+    return hashlib.sha256(get_instructions().encode()).hexdigest()[:12]
+
+def analysis_version() -> Dict[str, str]:
+    """Version tag of analyses produced by the current instructions and model"""
+    return {'prompt_version': prompt_version(), 'model': MOCK_MODEL_NAME if GEMINI_BACKEND == 'mock' else MODEL_NAME}
+
+def model_source() -> str:
+    """Source tag of fields filled by the model ('gemini', or 'mock' for the mock backend)"""
+    return MOCK_MODEL_NAME if GEMINI_BACKEND == 'mock' else 'gemini'
+
+def _build_models() -> None:
+    if GEMINI_BACKEND == 'mock':
+        # Offline stand-in for load testing, with injected latency and failures
+        from mock_gemini import MockGenerativeModel
+        _models['llm'] = MockGenerativeModel(MODEL_NAME, generation_config, safety_settings, get_instructions())
+        _models['summary_llm'] = MockGenerativeModel(MODEL_NAME, generation_config, safety_settings)
+        print('[Gemini] Using the mock backend')
+        return
+
+    import google.generativeai as genai
+    from google.generativeai import GenerativeModel
+
+    # Load Gemini API key from Streamlit secrets.toml
+    # GEMINI_API_KEY = st.secrets["gemini"]["api_key"]
+    genai.configure(api_key=GEMINI_API_KEY)
+
+    # Initialize the Gemini model with custom settings and instructions
+    _models['llm'] = GenerativeModel(
+        model_name=MODEL_NAME,
+        generation_config=generation_config,
+        safety_settings=safety_settings,
+        system_instruction=get_instructions()
+    )
+
+    # Plain model (no Perspec instructions) used to summarize old chat turns
+    _models['summary_llm'] = GenerativeModel(
+        model_name=MODEL_NAME,
+        generation_config={**generation_config, 'max_output_tokens': 1024},
+        safety_settings=safety_settings
+    )
+
+def _get(name: str) -> Any:
+    # Double-checked locking: the lock is only taken until the models exist
+    if name not in _models:
+        with _model_lock:
+            if name not in _models:
+                _build_models()
+    return _models[name]
+
+def get_model() -> Any:
+    """Return the Perspec model, configuring the SDK on first use (thread-safe)"""
+    return _get('llm')
+
+def get_summary_model() -> Any:
+    """Return the plain model used for chat summaries, configuring the SDK on first use (thread-safe)"""
+    return _get('summary_llm')
+
+# Deployments that prefer a warm first request can still build the models at import time
+if GEMINI_EAGER_INIT:
+    get_model()
+
+def _request_tokens(user_message: str, session: Any) -> int:
+    tokens = estimate_tokens(get_instructions()) + estimate_tokens(user_message) + expected_output_tokens
+    if session is not None:
+        tokens += history_tokens(session.history)
+    return tokens
+
+def _run(call: Callable[[], Any], priority: Priority, tokens: int, settle_usage: bool = True) -> Tuple[Any, float, float]:
+    # Every Gemini request goes through the shared scheduler so quota is spent in priority order.
+    # Each attempt is timed; failed attempts (including retried 429s) are recorded here, successes by the caller.
+    queued = time.perf_counter()
+    started = [queued]
+
+    def attempt() -> Any:
+        started[0] = time.perf_counter()
+        try:
+            return call()
+        except Exception as exc:
+            gemini_metrics.record(time.perf_counter() - started[0], started[0] - queued, error=exc)
+            raise
+
+    response = scheduler.run(attempt, priority, tokens, settle_usage=settle_usage)
+    return response, started[0], started[0] - queued
+
+def _timed(call: Callable[[], Any], priority: Priority, tokens: int) -> Any:
+    response, started, queue_wait = _run(call, priority, tokens)
+    gemini_metrics.record(time.perf_counter() - started, queue_wait, getattr(response, 'usage_metadata', None))
+    return response
+
+def send_message(user_message: str, priority: Priority = Priority.INTERACTIVE, session: Any = None) -> Any:
+    tokens = _request_tokens(user_message, session)
+    if session is None:
+        return _timed(lambda: get_model().generate_content(user_message), priority, tokens)
+    return _timed(lambda: session.send_message(user_message), priority, tokens)
+
+def stream_message(user_message: str, priority: Priority = Priority.INTERACTIVE, session: Any = None) -> Iterator[str]:
+    # Same as send_message but yields the reply text chunk by chunk as Gemini generates it
+    tokens = _request_tokens(user_message, session)
+    if session is None:
+        start = lambda: get_model().generate_content(user_message, stream=True)
+    else:
+        start = lambda: session.send_message(user_message, stream=True)
+    response, started, queue_wait = _run(start, priority, tokens, settle_usage=False)
 
+    try:
+        for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunks without text parts (e.g. safety or finish metadata) are skipped
+                continue
+            if text:
+                yield text
+    except Exception as exc:
+        gemini_metrics.record(time.perf_counter() - started, queue_wait, getattr(response, 'usage_metadata', None), error=exc)
+        raise
+
+    # Usage metadata is complete only after the stream has been read
+    usage = getattr(response, 'usage_metadata', None)
+    gemini_metrics.record(time.perf_counter() - started, queue_wait, usage)
+    actual = getattr(usage, 'total_token_count', None)
+    if actual:
+        scheduler.settle(tokens, actual)
+
+def _message_text(message: Any) -> str:
+    # History entries are either plain dicts or SDK Content objects
+    parts = message['parts'] if isinstance(message, dict) else message.parts
+    return ' '.join(part if isinstance(part, str) else getattr(part, 'text', '') for part in parts)
+
+def history_tokens(history: List[Any]) -> int:
+    return sum(estimate_tokens(_message_text(message)) for message in history)
+
+def start_chat(history: List[Dict[str, Any]]) -> Any:
+    # Chat sessions are cheap local objects, so one is built per turn from the user's own history
+    return get_model().start_chat(history=history)
+
+def compact_history(history: List[Dict[str, Any]], budget: int = CHAT_HISTORY_BUDGET, keep_turns: int = CHAT_KEEP_TURNS) -> List[Dict[str, Any]]:
+    # Leave the history untouched while it fits in the budget
+    if history_tokens(history) <= budget or len(history) <= keep_turns * 2:
+        return history
+
+    older, recent = history[:-keep_turns * 2], history[-keep_turns * 2:]
+    transcript = '\n'.join(f"{message['role']}: {_message_text(message)}" for message in older)
+    try:
+        # Summaries are limited to a quarter of the budget so compaction is not needed again right away
+        response = _timed(
+            lambda: get_summary_model().generate_content(
+                'Summarize this conversation between a user and a news analysis assistant in under '
+                f'{budget // 4} tokens. Keep names, facts, numbers and open questions.\n\n{transcript}'
+            ),
+            Priority.STANDARD,
+            estimate_tokens(transcript) + budget // 4
+        )
+        summary = response.text.strip()
+    except Exception as exc:
+        # Without a summary the older turns are simply dropped
+        print(f'[Chat] History summary failed, dropping {len(older)} messages: {exc}')
+        return recent
+
+    return [
+        {'role': 'user', 'parts': [f'Summary of our earlier conversation: {summary}']},
+        {'role': 'model', 'parts': ['Understood, I will keep that context in mind.']}
+    ] + recent
+
+def parse_response(response_text: str) -> Any:
     # Filter out the JSON code block and return the response as a dictionary
-    filtered_response = bot_response.text.replace('```json', '').replace('```', '')
-    return eval(filtered_response) # If eval() throws an error, use ast.literal_eval() or json.loads() instead
+    filtered_response = response_text.replace('```json', '').replace('```', '')
+    try:
+        # Gemini answers in JSON (null/true/false), occasionally in Python literal syntax
+        return json.loads(filtered_response)
+    except json.JSONDecodeError:
+        return ast.literal_eval(filtered_response.strip())
+
+def perspec(news_data: Any, priority: Priority = Priority.INTERACTIVE) -> Any:
+    # Identical payloads that are already being analysed share the in-flight Gemini call
+    return get_group('perspec').do(canonical_key(news_data), _perspec, news_data, priority)
+
+def _perspec(news_data: Any, priority: Priority) -> Any:
+    content, category_source = None, None
+    if isinstance(news_data, dict):
+        content = news_data.get('content')
+        # A category left null is filled by the model; one set locally keeps its source (the tag is not sent to the model)
+        category_source = news_data.get('category_source') if news_data.get('category') is not None else model_source()
+        news_data = {key: value for key, value in news_data.items() if key != 'category_source'}
+
+    # Compact article content first and route articles that are still over budget to the chunked analysis
+    if content:
+        news_data = {**news_data, 'content': compact_content(content)}
+    if content and estimate_tokens(news_data['content']) > GEMINI_TOKEN_BUDGET:
+        result = perspec_chunked(news_data, priority)
+    else:
+        # Send the news data to the Gemini model as plain text due to formatting requirements
+        user_message = f'News Data: {news_data}'
+        bot_response = send_message(user_message, priority)
+        result = parse_response(bot_response.text)
+
+    if isinstance(result, dict):
+        # Only the prompt is compacted; the stored analysis keeps the scraped article body
+        if content:
+            result['content'] = content
+        if category_source and result.get('category') not in (None, '', 'Not Available'):
+            result['category_source'] = category_source
+    return result
+
+def perspec_chunked(news_data: Dict[str, Any], priority: Priority = Priority.INTERACTIVE) -> Dict[str, Any]:
+    # Map: analyse each chunk independently (stateless calls, so they can run in parallel)
+    chunks = chunk_content(news_data['content'], GEMINI_TOKEN_BUDGET)
+    chunk_inputs = [{**news_data, 'content': chunk} for chunk in chunks]
+
+    def analyse_chunk(chunk_data: Dict[str, Any]) -> Dict[str, Any]:
+        response = send_message(f'News Data: {chunk_data}', priority)
+        return parse_response(response.text)
+
+    with ThreadPoolExecutor(max_workers=min(GEMINI_CHUNK_WORKERS, len(chunk_inputs))) as executor:
+        # Each worker runs in a copy of the caller's context so calls keep their endpoint and user attribution
+        futures = [executor.submit(contextvars.copy_context().run, analyse_chunk, chunk) for chunk in chunk_inputs]
+        chunk_results = [future.result() for future in futures]
+
+    # Reduce: merge the partial analyses locally, weighting each chunk by its size
+    weights = [estimate_tokens(chunk) for chunk in chunks]
+    return merge_chunk_results(news_data, chunk_results, weights)
+
+def _percentage(value: Any) -> Any:
+    try:
+        return float(str(value).strip().rstrip('%'))
+    except (TypeError, ValueError):
+        return None
+
+def _merge_values(values: List[Any], weights: List[int]) -> Any:
+    pairs = [(value, weight) for value, weight in zip(values, weights) if value not in (None, '', [], {})]
+    if not pairs:
+        return None
+
+    # Percentages are averaged by chunk size
+    if all(isinstance(value, str) and value.strip().endswith('%') for value, _ in pairs):
+        numbers = [(_percentage(value), weight) for value, weight in pairs]
+        numbers = [(number, weight) for number, weight in numbers if number is not None]
+        if numbers:
+            total = sum(weight for _, weight in numbers)
+            return f'{round(sum(number * weight for number, weight in numbers) / total)}%'
+
+    # Durations such as read time add up across chunks
+    if all(isinstance(value, str) and value.strip().endswith('minutes') for value, _ in pairs):
+        minutes = [_percentage(value.replace('minutes', '')) for value, _ in pairs]
+        return f'{round(sum(m for m in minutes if m is not None))} minutes'
+
+    # Lists are concatenated without duplicates
+    if all(isinstance(value, list) for value, _ in pairs):
+        merged = []
+        for value, _ in pairs:
+            merged.extend(item for item in value if item not in merged)
+        return merged
+
+    # Short labels (category, language, organization) are decided by weighted vote; for longer text
+    # (highlight, sentiment excerpts) the text of the largest chunk is kept, the first one on a tie
+    if all(isinstance(value, str) for value, _ in pairs):
+        if all(len(value) <= 60 for value, _ in pairs):
+            votes = Counter()
+            for value, weight in pairs:
+                votes[value] += weight
+            return votes.most_common(1)[0][0]
+        return max(pairs, key=lambda pair: pair[1])[0].strip()
+
+    return pairs[0][0]
+
+def merge_chunk_results(news_data: Dict[str, Any], chunk_results: List[Dict[str, Any]], weights: List[int]) -> Dict[str, Any]:
+    # Keep the scraped values and only fill the keys that were left null for Gemini
+    merged = dict(news_data)
+    for key, value in news_data.items():
+        if value is None:
+            merged[key] = _merge_values([result.get(key) for result in chunk_results], weights)
+
+    # Misinformation is reported at the most severe level found in any chunk
+    authenticity = news_data.get('authenticity')
+    if isinstance(authenticity, dict) and authenticity.get('Misinformation Status') is None:
+        severity = {'No': 0, 'Partial': 1, 'Yes': 2}
+        statuses = [
+            result.get('authenticity', {}).get('Misinformation Status')
+            for result in chunk_results
+            if isinstance(result.get('authenticity'), dict)
+        ]
+        statuses = [status for status in statuses if isinstance(status, dict)]
+        if statuses:
+            worst = max(statuses, key=lambda status: severity.get(status.get('Misinformation'), 0))
+            flagged = [
+                status.get('Flagged Text') for status in statuses
+                if status.get('Misinformation') in ('Yes', 'Partial') and status.get('Flagged Text') not in (None, '', 'Not Applicable')
+            ][:MAX_FLAGGED_EXCERPTS]
+            merged['authenticity'] = {
+                **authenticity,
+                'Misinformation Status': {
+                    **worst,
+                    'Flagged Text': ' '.join(map(str, flagged)) if flagged else worst.get('Flagged Text', 'Not Applicable')
+                }
+            }
+    return merged
@@ -1,6 +1,7 @@
 # Core library imports: Streamlit setup
 import requests
 import json
+import time
 import streamlit as st
 from datetime import datetime
 
@@ -8,6 +9,28 @@ from datetime import datetime
 from utils import custom_css, person_card
 from auth import get_current_user
 
+API_URL = 'http://localhost:8000'
+
+def run_job(endpoint: str, payload: dict, timeout: int = 180, partial: bool = False) -> dict | None:
+    # Queue the request as a background job and poll it, so no connection is held open for the whole analysis.
+    # Returns the finished job, or with partial set the running job as soon as it has a partial result
+    try:
+        api_response = requests.post(f'{API_URL}{endpoint}', json={**payload, 'async': True}, timeout=10)
+        if api_response.status_code != 202:
+            return None
+        status_url = API_URL + api_response.json()['links']['status']
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            job = requests.get(status_url, timeout=10).json()
+            if job.get('status') == 'done' or (partial and job.get('partial')):
+                return job
+            if job.get('status') not in ('queued', 'running'):
+                return None
+            time.sleep(0.5)
+    except requests.RequestException as exc:
+        print(f'[Home] Job request to {endpoint} failed: {exc}')
+    return None
+
 # NOTE: session_state is a Streamlit feature that allows storing data across pages
 # Reference: https://docs.streamlit.io/develop/api-reference/caching-and-state/st.session_state
 def home() -> None:
@@ -63,19 +86,20 @@ def home() -> None:
         if not st.session_state.news_source or not st.session_state.news_topic:
             st.warning('Please select the news source and topic', icon=':material/warning:')
         else:
-            st.warning('Please wait up to 30 seconds for the results to load', icon=':material/info:')
-            # Send a POST request to the FastAPI backend with the selected source, date, and topic
-            api_response = requests.post(
-                'http://localhost:8000/api/archive',
-                json={
-                    'source': st.session_state.news_source,
-                    'date': st.session_state.news_date.strftime('%d-%m-%Y'),
-                    'topic': st.session_state.news_topic
-                }
-            )
-            if api_response.status_code == 200:
+            # Run the archive search on the FastAPI backend with the selected source, date, and topic
+            with st.spinner('Searching and analysing the news articles...'):
+                job = run_job(
+                    '/api/archive',
+                    {
+                        'source': st.session_state.news_source,
+                        'date': st.session_state.news_date.strftime('%d-%m-%Y'),
+                        'topic': st.session_state.news_topic,
+                        'user': current_user['username'] if current_user else None
+                    }
+                )
+            if job is not None:
                 # Store the search results in session state and switch to the search results page
-                st.session_state.search_results = api_response.json()
+                st.session_state.search_results = job['result']
                 st.switch_page('pages/1_search.py')
             else:
                 st.error('Error occurred while processing the news articles', icon=':material/error:')
@@ -91,15 +115,25 @@ def home() -> None:
         if not st.session_state.article_url:
             st.warning('Please enter the article URL', icon=':material/warning:')
         else:
-            st.warning('Please wait up to 30 seconds for the results to load', icon=':material/info:')
-            # Send a POST request to the FastAPI backend with the article URL
-            api_response = requests.post(
-                'http://localhost:8000/api/url',
-                json={'url': st.session_state.article_url}
-            )
-            if api_response.status_code == 200:
-                # Store the analysis results in session state and switch to the analysis page
-                st.session_state.update(api_response.json())
+            # Run the article analysis on the FastAPI backend, until the page metadata is ready
+            with st.spinner('Analysing the news article...'):
+                job = run_job(
+                    '/api/url',
+                    {
+                        'url': st.session_state.article_url,
+                        'user': current_user['username'] if current_user else None
+                    },
+                    partial=True
+                )
+            if job is not None:
+                # Store the analysis results in session state and switch to the analysis page;
+                # while the job runs, the dashboard shows the partial result and polls for the rest
+                if job['status'] == 'done':
+                    st.session_state.update(job['result'])
+                    st.session_state.analysis_job = None
+                else:
+                    st.session_state.update(job['partial'])
+                    st.session_state.analysis_job = job['id']
                 st.switch_page('pages/2_analyse.py')
             else:
                 st.error('Error occurred while processing the news article', icon=':material/error:')
@@ -0,0 +1,316 @@
+"""
+Jobs Module
+This module runs long analyses (archive searches, article analyses) as
+background jobs, so HTTP handlers answer at once with a job id instead of
+holding the connection for the whole scrape, fact check and Gemini pipeline.
+Jobs run on a bounded worker pool; coroutine jobs share one long-lived event
+loop so pooled HTTP clients are reused. Work can publish partial results as
+its stages finish (report_progress); work shared by coalesced jobs publishes
+its stages to every job following it (follow_progress). Clients poll a job or subscribe to its
+updates as Server-Sent Events, and finished jobs are kept for a TTL.
+"""
+
+import asyncio
+import contextvars
+import inspect
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, Optional, Set
+
+FINISHED = ('done', 'failed')
+
+# The job run by the current thread or task, so the work can report partial results
+_current_job = contextvars.ContextVar('current_job', default=None)
+
+# Jobs following shared work by key, with the stage fields published so far (replayed to late followers)
+_followers: Dict[str, Dict[str, Any]] = {}
+_followers_lock = threading.Lock()
+
+class JobManager:
+    """Bounded pool of background jobs whose status can be polled or subscribed to"""
+
+    def __init__(self, workers: int = 4, ttl: float = 3600, name: str = 'job'):
+        """
+        Args:
+            workers: Jobs running at once; later jobs wait in the queue
+            ttl: Seconds a finished job (and its result) is kept
+            name: Prefix of the worker thread names
+        """
+        self.workers = workers
+        self.ttl = ttl
+        self.name = name
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._futures = {}
+        self._finished_at: Dict[str, float] = {}
+        # Notified on every job update, so subscribers wake without polling
+        self._changed = threading.Condition()
+        self._loop = None
+        self._loop_lock = threading.Lock()
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        # Started with the first coroutine job and kept for the life of the process
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name=f'{self.name}-loop', daemon=True).start()
+                self._loop = loop
+        return self._loop
+
+    def submit(self, kind: str, fn: Callable[..., Any], *args, **kwargs) -> str:
+        """
+        Queue a job
+
+        Args:
+            kind: Job type reported to clients (e.g. 'archive', 'analyze')
+            fn: Function or coroutine function doing the work; its return value is the job result
+            *args, **kwargs: Arguments for fn
+
+        Returns:
+            The job id
+        """
+        self._expire()
+        job_id = uuid.uuid4().hex
+        now = datetime.now().isoformat()
+        with self._changed:
+            self._jobs[job_id] = {
+                'id': job_id,
+                'kind': kind,
+                'status': 'queued',
+                'created_at': now,
+                'updated_at': now,
+                'stage': None,
+                'partial': None,
+                'result': None,
+                'error': None,
+                'version': 0
+            }
+        # The job keeps the caller's context (metrics attribution by endpoint and user)
+        context = contextvars.copy_context()
+        self._futures[job_id] = self._executor.submit(context.run, self._execute, job_id, fn, args, kwargs)
+        return job_id
+
+    def _execute(self, job_id: str, fn: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        # Runs in the job's own context copy, which coroutine jobs inherit on the event loop
+        _current_job.set((self, job_id))
+        self.update(job_id, status='running')
+        try:
+            if inspect.iscoroutinefunction(fn):
+                result = asyncio.run_coroutine_threadsafe(fn(*args, **kwargs), self._event_loop()).result()
+            else:
+                result = fn(*args, **kwargs)
+        except Exception as exc:
+            print(f'[Jobs] {self._jobs[job_id]["kind"]} job {job_id} failed: {exc}')
+            self.update(job_id, status='failed', error=str(exc))
+        else:
+            self.update(job_id, status='done', result=result)
+
+    def update(self, job_id: str, **fields) -> None:
+        """Change fields of a job and wake its subscribers"""
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(fields)
+            job['updated_at'] = datetime.now().isoformat()
+            job['version'] += 1
+            if job['status'] in FINISHED:
+                self._finished_at[job_id] = time.monotonic()
+            self._changed.notify_all()
+
+    def publish(self, job_id: str, stage: str, partial: Dict[str, Any]) -> None:
+        """Merge the fields of a finished stage into the partial result of a running job"""
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is not None and job['status'] == 'running':
+                self.update(job_id, stage=stage, partial={**(job['partial'] or {}), **partial})
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Snapshot of a job, or None if it is unknown or expired"""
+        self._expire()
+        with self._changed:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def wait_for_update(self, job_id: str, after_version: int, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Block until a job changes
+
+        Args:
+            job_id: The job id
+            after_version: Last version the caller has seen
+            timeout: Seconds to wait at most
+
+        Returns:
+            Snapshot of the job (unchanged if the timeout passed first), or None if it is unknown
+        """
+        with self._changed:
+            self._changed.wait_for(
+                lambda: job_id not in self._jobs or self._jobs[job_id]['version'] > after_version,
+                timeout
+            )
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def updates(self, job_id: str, keepalive: float = 15, after_version: int = -1) -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        Yield a job snapshot after every change until the job finishes
+
+        None is yielded when nothing changed for keepalive seconds, so streams can send a heartbeat.
+        A reconnecting stream passes the last version it sent as after_version to resume after it.
+        """
+        version = after_version
+        while True:
+            job = self.wait_for_update(job_id, version, keepalive)
+            if job is None:
+                return
+            if job['version'] == version:
+                if job['status'] in FINISHED:
+                    return
+                yield None
+                continue
+            version = job['version']
+            yield job
+            if job['status'] in FINISHED:
+                return
+
+    async def aupdates(self, job_id: str, keepalive: float = 15, after_version: int = -1) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Async version of updates; the blocking wait runs off the event loop"""
+        version = after_version
+        while True:
+            job = await asyncio.to_thread(self.wait_for_update, job_id, version, keepalive)
+            if job is None:
+                return
+            if job['version'] == version:
+                if job['status'] in FINISHED:
+                    return
+                yield None
+                continue
+            version = job['version']
+            yield job
+            if job['status'] in FINISHED:
+                return
+
+    def wait(self, job_ids: Iterable[str], timeout: Optional[float] = None) -> Set[str]:
+        """Wait up to timeout seconds for jobs to finish and return the ids of the finished ones"""
+        futures = {self._futures[job_id]: job_id for job_id in job_ids if job_id in self._futures}
+        done, _ = wait(futures, timeout=timeout)
+        return {futures[future] for future in done}
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        with self._changed:
+            expired = [job_id for job_id, finished in self._finished_at.items() if now - finished > self.ttl]
+            for job_id in expired:
+                del self._finished_at[job_id]
+                self._jobs.pop(job_id, None)
+                self._futures.pop(job_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._changed:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+        return {'workers': self.workers, 'ttl': self.ttl, 'jobs': counts}
+
+    def shutdown(self, cleanup: Optional[Callable[[], Any]] = None) -> None:
+        """
+        Cancel queued jobs and stop the event loop
+
+        Args:
+            cleanup: Coroutine function run on the job event loop before it stops (e.g. closing HTTP clients)
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._loop is not None:
+            if cleanup is not None:
+                try:
+                    asyncio.run_coroutine_threadsafe(cleanup(), self._loop).result(timeout=5)
+                except Exception as exc:
+                    print(f'[Jobs] Cleanup failed: {exc}')
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+def report_progress(stage: str, partial: Dict[str, Any]) -> None:
+    """
+    Publish a partial result of the running job (does nothing outside jobs)
+
+    Args:
+        stage: Name of the finished stage (e.g. 'metadata', 'fact_check')
+        partial: Fields known after this stage; merged with those of earlier stages
+    """
+    current = _current_job.get()
+    if current is not None:
+        manager, job_id = current
+        manager.publish(job_id, stage, partial)
+
+@contextmanager
+def follow_progress(key: str) -> Iterator[None]:
+    """
+    Have the running job receive the stages published for key until the block exits (does nothing outside jobs)
+
+    Shared work such as a coalesced analysis runs in the context of the job that
+    started it, so report_progress would only reach that job; every job waiting
+    on the same work follows its key instead.
+
+    Args:
+        key: Key of the shared work (e.g. the coalescing group and canonical URL)
+    """
+    current = _current_job.get()
+    if current is None:
+        yield
+        return
+    with _followers_lock:
+        entry = _followers.setdefault(key, {'jobs': [], 'stage': None, 'partial': {}})
+        entry['jobs'].append(current)
+        stage, partial = entry['stage'], dict(entry['partial'])
+    # A job joining work already under way starts from the stages finished so far
+    if stage is not None:
+        manager, job_id = current
+        manager.publish(job_id, stage, partial)
+    try:
+        yield
+    finally:
+        with _followers_lock:
+            entry['jobs'].remove(current)
+            if not entry['jobs'] and _followers.get(key) is entry:
+                del _followers[key]
+
+def publish_progress(key: str, stage: str, partial: Dict[str, Any]) -> None:
+    """
+    Publish a partial result of shared work to every job following its key
+
+    Args:
+        key: Key of the shared work, as passed to follow_progress
+        stage: Name of the finished stage
+        partial: Fields known after this stage; merged with those of earlier stages
+    """
+    with _followers_lock:
+        entry = _followers.get(key)
+        if entry is None:
+            return
+        entry['stage'] = stage
+        entry['partial'].update(partial)
+        followers = list(entry['jobs'])
+    for manager, job_id in followers:
+        manager.publish(job_id, stage, partial)
+
+def job_links(job_id: str, prefix: str = '/api/jobs') -> Dict[str, str]:
+    """Polling and event stream URLs of a job"""
+    return {'status': f'{prefix}/{job_id}', 'events': f'{prefix}/{job_id}/events'}
+
+def last_event_version(last_event_id: Optional[str]) -> int:
+    """Job version named by a reconnecting client's Last-Event-ID header (-1 if missing or invalid)"""
+    try:
+        return int(last_event_id)
+    except (TypeError, ValueError):
+        return -1
+
+def format_event(job: Optional[Dict[str, Any]]) -> str:
+    """A job snapshot as a Server-Sent Event (None gives a heartbeat comment)"""
+    if job is None:
+        return ': keep-alive\n\n'
+    return f"id: {job['version']}\nevent: {job['status']}\ndata: {json.dumps(job)}\n\n"
@@ -0,0 +1,193 @@
+"""
+Keyword Extraction Module
+This module extracts keyphrases, organizations and highlight sentences from
+article text locally, so archive searches can report trending topics
+without asking Gemini to read every article a second time.
+"""
+
+import json
+import os
+import re
+from collections import Counter
+from typing import Dict, Any, List
+
+from text_utils import split_sentences
+
+# Load the organization gazetteer (aliases to canonical names, name suffixes, ignored acronyms)
+gazetteer_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'metadata/organizations.json')
+with open(gazetteer_path, 'r') as file:
+    _gazetteer = json.load(file)
+
+ORGANIZATION_ALIASES = _gazetteer['aliases']
+ORGANIZATION_SUFFIXES = set(_gazetteer['suffixes'])
+IGNORED_ACRONYMS = set(_gazetteer['ignored_acronyms'])
+
+STOPWORDS = frozenset('''
+a about above after again against all also am an and any are as at be because been before being below between
+both but by can could did do does doing down during each even ever every few for from further had has have
+having he her here hers herself him himself his how however i if in into is it its itself just last let like
+made make many may me might more most much must my myself near new no nor not now of off on once one only or
+other our ours ourselves out over own per said same say says she should since so some still such than that the
+their theirs them themselves then there these they this those through to too two under until up upon us very
+via was we were what when where whether which while who whom whose why will with within without would year
+years yet you your yours yourself according across added adding already among another around asked back become
+called came come comes day days done first get gets got including later least less made mr mrs ms next often
+part people put see seen set several show shows since take taken tell think three told took week weeks well
+went whose
+'''.split())
+
+# Number of keyphrases, organizations and highlights kept per article
+KEYWORDS_PER_ARTICLE = 10
+ORGANIZATIONS_PER_ARTICLE = 10
+HIGHLIGHTS_PER_ARTICLE = 2
+
+_phrase_split_regex = re.compile(r"[^a-z0-9'\- ]+")
+_word_regex = re.compile(r"[a-z][a-z'\-]*[a-z]|[a-z]")
+alias_regex = re.compile(
+    r'\b(' + '|'.join(sorted(map(re.escape, ORGANIZATION_ALIASES), key=len, reverse=True)) + r')\b'
+)
+# Runs of capitalized words, allowing lowercase connectors such as "of" and "and"
+_capitalized_span_regex = re.compile(r"\b[A-Z][\w&'\-]*(?:\s+(?:of|and|for|the|&)?\s*[A-Z][\w&'\-]*)*")
+_acronym_regex = re.compile(r'\b[A-Z][A-Z0-9]{1,5}\b')
+
+def extract_keyphrases(text: str, top_n: int = KEYWORDS_PER_ARTICLE) -> List[str]:
+    """
+    Extract keyphrases with RAKE (rapid automatic keyword extraction)
+
+    Candidate phrases are runs of words between stopwords and punctuation;
+    each word is scored by degree / frequency and phrases by the sum of their words.
+
+    Args:
+        text: The article text
+        top_n: Number of phrases to return
+
+    Returns:
+        Lowercase keyphrases, best first
+    """
+    phrases = []
+    for fragment in _phrase_split_regex.split((text or '').lower()):
+        phrase = []
+        for word in _word_regex.findall(fragment):
+            if word in STOPWORDS:
+                if phrase:
+                    phrases.append(tuple(phrase))
+                phrase = []
+            else:
+                phrase.append(word)
+        if phrase:
+            phrases.append(tuple(phrase))
+
+    # Long runs are usually sentence fragments rather than topics
+    phrases = [phrase for phrase in phrases if len(phrase) <= 3 and any(len(word) > 2 for word in phrase)]
+    frequency = Counter()
+    degree = Counter()
+    for phrase in phrases:
+        for word in phrase:
+            frequency[word] += 1
+            degree[word] += len(phrase)
+
+    phrase_counts = Counter(phrases)
+    scores = {
+        phrase: sum(degree[word] / frequency[word] for word in phrase) * (1 + 0.5 * (count - 1))
+        for phrase, count in phrase_counts.items()
+    }
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    return [' '.join(phrase) for phrase in ranked[:top_n]]
+
+def extract_organizations(text: str, top_n: int = ORGANIZATIONS_PER_ARTICLE) -> List[str]:
+    """
+    Detect organizations from the gazetteer, acronyms and capitalized spans ending in an organization word
+
+    Args:
+        text: The article text
+        top_n: Number of organizations to return
+
+    Returns:
+        Organization names, most mentioned first
+    """
+    text = text or ''
+    mentions = Counter()
+
+    for match in alias_regex.finditer(text):
+        mentions[ORGANIZATION_ALIASES[match.group(1)]] += 1
+
+    for match in _capitalized_span_regex.finditer(text):
+        span = re.sub(r'^The\s+', '', match.group(0).strip())
+        words = span.split()
+        # "Monetary Policy Committee" or "Ministry of Finance"
+        is_organization = words[-1] in ORGANIZATION_SUFFIXES or (len(words) > 2 and words[0] in ORGANIZATION_SUFFIXES and words[1] == 'of')
+        if len(words) > 1 and is_organization and span not in ORGANIZATION_ALIASES:
+            mentions[span] += 1
+
+    for match in _acronym_regex.finditer(text):
+        acronym = match.group(0)
+        if acronym not in ORGANIZATION_ALIASES and acronym not in IGNORED_ACRONYMS and not acronym.isdigit():
+            mentions[acronym] += 1
+
+    return [name for name, _ in mentions.most_common(top_n)]
+
+def extract_highlights(text: str, keyphrases: List[str], top_n: int = HIGHLIGHTS_PER_ARTICLE) -> List[str]:
+    """
+    Pick the sentences that cover the most keyphrases
+
+    Args:
+        text: The article text
+        keyphrases: Keyphrases of the article, best first
+        top_n: Number of sentences to return
+
+    Returns:
+        Highlight sentences in article order
+    """
+    sentences = [sentence for sentence in split_sentences(text) if 40 <= len(sentence) <= 400]
+    # Better-ranked keyphrases are worth more
+    weights = {phrase: len(keyphrases) - rank for rank, phrase in enumerate(keyphrases)}
+    scored = [
+        (sum(weight for phrase, weight in weights.items() if phrase in sentence.lower()), index)
+        for index, sentence in enumerate(sentences)
+    ]
+    best = sorted((item for item in scored if item[0] > 0), reverse=True)[:top_n]
+    return [sentences[index] for _, index in sorted(best, key=lambda item: item[1])]
+
+def article_signals(text: str) -> Dict[str, List[str]]:
+    """
+    Compute the trending fields for a single article
+
+    Args:
+        text: The article text
+
+    Returns:
+        Dictionary with 'trending_keywords', 'trending_organizations' and 'trending_highlights'
+    """
+    keyphrases = extract_keyphrases(text)
+    return {
+        'trending_highlights': extract_highlights(text, keyphrases),
+        'trending_keywords': keyphrases,
+        'trending_organizations': extract_organizations(text)
+    }
+
+def aggregate_trending(articles: List[Dict[str, Any]], top_n: int = 10) -> Dict[str, List[str]]:
+    """
+    Aggregate per-article trending fields across an archive search
+
+    Items are ranked by the number of articles mentioning them.
+
+    Args:
+        articles: Article dictionaries carrying the per-article trending fields
+        top_n: Number of items to keep per field
+
+    Returns:
+        Dictionary with the top keywords, organizations and highlights
+    """
+    keywords = Counter(keyword for article in articles for keyword in set(article.get('trending_keywords') or []))
+    organizations = Counter(name for article in articles for name in set(article.get('trending_organizations') or []))
+
+    # Highlights from different articles are ranked by how many trending keywords they mention
+    top_keywords = [keyword for keyword, _ in keywords.most_common(top_n)]
+    highlights = [highlight for article in articles for highlight in (article.get('trending_highlights') or [])]
+    highlights.sort(key=lambda highlight: sum(keyword in highlight.lower() for keyword in top_keywords), reverse=True)
+
+    return {
+        'trending_highlights': highlights[:top_n],
+        'trending_keywords': top_keywords,
+        'trending_organizations': [name for name, _ in organizations.most_common(top_n)]
+    }
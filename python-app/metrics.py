@@ -0,0 +1,304 @@
+"""
+Gemini Metrics Module
+This module records every Gemini call: latency histograms, input/output
+token counts from the response usage metadata, error types and estimated
+cost, broken down per endpoint and per user. Totals are exposed through the
+APIs' metrics endpoints and persisted as a daily rollup. Every process (the
+extension API, the FastAPI backend, the Streamlit app) stores its own rollup
+document per day, with mergeable histogram counts, and daily_rollups sums them.
+"""
+
+import atexit
+import bisect
+import contextvars
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date
+from typing import Dict, Any, Iterable, List, Optional
+
+from config import GEMINI_INPUT_PRICE, GEMINI_OUTPUT_PRICE, METRICS_FLUSH_INTERVAL
+
+# Identifies this process's rollup documents; a restarted process writes new ones, so earlier totals are kept
+PROCESS_ID = f'{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}'
+
+# Endpoint and user the current Gemini call is made for (propagated to worker threads and tasks)
+current_endpoint = contextvars.ContextVar('current_endpoint', default='unknown')
+current_user = contextvars.ContextVar('current_user', default='anonymous')
+
+@contextmanager
+def call_context(endpoint: str, user: Optional[str] = None):
+    """Attribute the Gemini calls made inside the block to an endpoint and user"""
+    endpoint_token = current_endpoint.set(endpoint)
+    user_token = current_user.set(user or 'anonymous')
+    try:
+        yield
+    finally:
+        current_endpoint.reset(endpoint_token)
+        current_user.reset(user_token)
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with interpolated percentiles"""
+
+    # Bucket upper bounds in seconds (roughly logarithmic, up to two minutes)
+    BOUNDS = [0.05, 0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 3, 5, 7.5, 10, 15, 20, 30, 60, 120]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.BOUNDS[index - 1] if index else 0.0
+                upper = self.BOUNDS[index] if index < len(self.BOUNDS) else self.max
+                return min(self.max, lower + (upper - lower) * (rank - seen) / count)
+            seen += count
+        return self.max
+
+    def state(self) -> Dict[str, Any]:
+        """Bucket counts and totals, which add up across processes"""
+        return {'counts': list(self.counts), 'count': self.count, 'total': self.total, 'max': self.max}
+
+    def merge(self, state: Dict[str, Any]) -> None:
+        for index, count in enumerate(state.get('counts', [])[:len(self.counts)]):
+            self.counts[index] += count
+        self.count += state.get('count', 0)
+        self.total += state.get('total', 0.0)
+        self.max = max(self.max, state.get('max', 0.0))
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 3) if self.count else 0.0,
+            'p50': round(self.percentile(0.50), 3),
+            'p90': round(self.percentile(0.90), 3),
+            'p99': round(self.percentile(0.99), 3),
+            'max': round(self.max, 3)
+        }
+
+class CallStats:
+    """Totals for one endpoint or user"""
+
+    def __init__(self):
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cost = 0.0
+        self.errors = Counter()
+        self.latency = LatencyHistogram()
+        self.queue_wait = LatencyHistogram()
+
+    def state(self) -> Dict[str, Any]:
+        """Raw totals and histograms, which add up across processes"""
+        return {
+            'calls': self.calls,
+            'input_tokens': self.input_tokens,
+            'output_tokens': self.output_tokens,
+            'cost': self.cost,
+            'errors': dict(self.errors),
+            'latency': self.latency.state(),
+            'queue_wait': self.queue_wait.state()
+        }
+
+    def merge(self, state: Dict[str, Any]) -> None:
+        self.calls += state.get('calls', 0)
+        self.input_tokens += state.get('input_tokens', 0)
+        self.output_tokens += state.get('output_tokens', 0)
+        self.cost += state.get('cost', 0.0)
+        self.errors.update(state.get('errors', {}))
+        self.latency.merge(state.get('latency', {}))
+        self.queue_wait.merge(state.get('queue_wait', {}))
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'input_tokens': self.input_tokens,
+            'output_tokens': self.output_tokens,
+            'estimated_cost_usd': round(self.cost, 6),
+            'errors': dict(self.errors),
+            'latency_seconds': self.latency.summary(),
+            'queue_wait_seconds': self.queue_wait.summary()
+        }
+
+def estimate_cost(input_tokens: int, output_tokens: int) -> float:
+    """Estimated cost in USD from the configured per-million-token prices"""
+    return (input_tokens * GEMINI_INPUT_PRICE + output_tokens * GEMINI_OUTPUT_PRICE) / 1_000_000
+
+class GeminiMetrics:
+    """Per-endpoint and per-user Gemini call statistics for the current day"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset(date.today().isoformat())
+        self._flusher = None
+
+    def _reset(self, day: str) -> None:
+        self.day = day
+        self.endpoints: Dict[str, CallStats] = {}
+        self.users: Dict[str, CallStats] = {}
+
+    def record(self, latency: float, queue_wait: float = 0.0, usage: Any = None, error: BaseException = None) -> None:
+        """
+        Record one Gemini call
+
+        Args:
+            latency: Seconds spent in the model call
+            queue_wait: Seconds spent waiting for the scheduler
+            usage: Response usage metadata (prompt_token_count, candidates_token_count)
+            error: Exception raised by the call, if any
+        """
+        input_tokens = getattr(usage, 'prompt_token_count', 0) or 0
+        output_tokens = getattr(usage, 'candidates_token_count', 0) or 0
+        cost = estimate_cost(input_tokens, output_tokens)
+
+        rollover = None
+        with self._lock:
+            today = date.today().isoformat()
+            if today != self.day:
+                rollover = self._rollup()
+                self._reset(today)
+
+            for stats in (
+                self.endpoints.setdefault(current_endpoint.get(), CallStats()),
+                self.users.setdefault(current_user.get(), CallStats())
+            ):
+                stats.calls += 1
+                stats.input_tokens += input_tokens
+                stats.output_tokens += output_tokens
+                stats.cost += cost
+                stats.latency.observe(latency)
+                stats.queue_wait.observe(queue_wait)
+                if error is not None:
+                    stats.errors[type(error).__name__] += 1
+
+        # The finished day is persisted outside the lock
+        if rollover is not None:
+            persist_rollup(rollover)
+        self._start_flusher()
+
+    def _snapshot(self) -> Dict[str, Any]:
+        return summarize(self.day, self.endpoints, self.users)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return today's statistics of this process for the metrics endpoint"""
+        with self._lock:
+            return self._snapshot()
+
+    def _rollup(self) -> Dict[str, Any]:
+        # Summary for readers of a single document, plus the raw state that daily_rollups sums
+        return {
+            **self._snapshot(),
+            'process': PROCESS_ID,
+            'state': {
+                'endpoints': {name: stats.state() for name, stats in self.endpoints.items()},
+                'users': {name: stats.state() for name, stats in self.users.items()}
+            }
+        }
+
+    def _start_flusher(self) -> None:
+        # The daily rollup is written periodically by a background thread started on the first call
+        if self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+                self._flusher.start()
+                atexit.register(self.flush)
+
+    def _flush_loop(self) -> None:
+        while True:
+            time.sleep(METRICS_FLUSH_INTERVAL)
+            self.flush()
+
+    def flush(self) -> None:
+        """Persist this process's rollup of today (its own document, so other processes' totals are untouched)"""
+        with self._lock:
+            rollup = self._rollup()
+        if rollup['totals']['calls']:
+            persist_rollup(rollup)
+
+def summarize(day: str, endpoints: Dict[str, CallStats], users: Dict[str, CallStats]) -> Dict[str, Any]:
+    """Day totals and per-endpoint and per-user summaries"""
+    totals = CallStats()
+    for stats in endpoints.values():
+        totals.calls += stats.calls
+        totals.input_tokens += stats.input_tokens
+        totals.output_tokens += stats.output_tokens
+        totals.cost += stats.cost
+        totals.errors.update(stats.errors)
+    return {
+        'day': day,
+        'totals': {
+            'calls': totals.calls,
+            'input_tokens': totals.input_tokens,
+            'output_tokens': totals.output_tokens,
+            'estimated_cost_usd': round(totals.cost, 6),
+            'errors': dict(totals.errors)
+        },
+        'endpoints': {name: stats.summary() for name, stats in endpoints.items()},
+        'users': {name: stats.summary() for name, stats in users.items()}
+    }
+
+def merge_rollups(rollups: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Sum per-process rollup documents into one rollup per day
+
+    Args:
+        rollups: Stored rollup documents (any days and processes)
+
+    Returns:
+        Daily rollups, newest first, with the processes that contributed
+    """
+    days: Dict[str, Dict[str, Any]] = {}
+    for rollup in rollups:
+        day = days.setdefault(rollup['day'], {'endpoints': {}, 'users': {}, 'processes': []})
+        day['processes'].append(rollup.get('process'))
+        for group in ('endpoints', 'users'):
+            if 'state' in rollup:
+                states = rollup['state'].get(group, {})
+            else:
+                # Rollups stored before per-process documents only have summaries (no histogram counts)
+                states = {
+                    name: {**summary, 'cost': summary.get('estimated_cost_usd', 0.0)}
+                    for name, summary in rollup.get(group, {}).items()
+                }
+            for name, state in states.items():
+                day[group].setdefault(name, CallStats()).merge(state)
+    return [
+        {**summarize(day, merged['endpoints'], merged['users']), 'processes': merged['processes']}
+        for day, merged in sorted(days.items(), reverse=True)
+    ]
+
+def daily_rollups(days: int = 30) -> List[Dict[str, Any]]:
+    """Gemini usage of the last days summed over every process, newest first"""
+    # Imported lazily: the database module connects to MongoDB on import
+    from database import get_metrics_rollups
+    return merge_rollups(get_metrics_rollups(days))
+
+def persist_rollup(rollup: Dict[str, Any]) -> None:
+    try:
+        # Imported lazily: the database module connects to MongoDB on import
+        from database import store_metrics_rollup
+        store_metrics_rollup(rollup['day'], rollup['process'], rollup)
+    except Exception as exc:
+        print(f'[Metrics] Could not persist rollup: {exc}')
+
+# Shared metrics for every Gemini call in the process
+gemini_metrics = GeminiMetrics()
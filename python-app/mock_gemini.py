@@ -0,0 +1,204 @@
+"""
+Mock Gemini Module
+This module is a local stand-in for the Gemini model used for offline load
+testing. It answers with schema-valid analysis payloads for the article and
+archive shapes, and injects configurable latency, rate-limit (429) errors
+and malformed output so the app can be measured under realistic model behavior.
+Select it with GEMINI_BACKEND=mock.
+"""
+
+import ast
+import json
+import random
+import re
+import time
+from typing import Dict, Any, List
+
+from config import MOCK_GEMINI_LATENCY, MOCK_GEMINI_RATE_LIMIT, MOCK_GEMINI_MALFORMED
+from token_budget import estimate_tokens
+from text_utils import split_sentences
+
+TOPICS = ['Business', 'Entertainment', 'Environment', 'Health', 'Politics', 'Science', 'Sports', 'Technology', 'Travel', 'World News']
+ORGANIZATIONS = ['Reserve Bank of India', 'Supreme Court', 'United Nations', 'World Health Organization', 'Election Commission of India']
+
+class MockRateLimitError(Exception):
+    """Quota error shaped like the SDK's ResourceExhausted (HTTP 429)"""
+    code = 429
+
+class UsageMetadata:
+    def __init__(self, prompt_tokens: int, output_tokens: int):
+        self.prompt_token_count = prompt_tokens
+        self.candidates_token_count = output_tokens
+        self.total_token_count = prompt_tokens + output_tokens
+
+class _Part:
+    def __init__(self, text: str):
+        self.text = text
+
+class _Content:
+    def __init__(self, role: str, text: str):
+        self.role = role
+        self.parts = [_Part(text)]
+
+class _Candidate:
+    def __init__(self, text: str):
+        self.content = _Content('model', text)
+
+class MockResponse:
+    """Complete response with the attributes the app reads from the SDK response"""
+
+    def __init__(self, text: str, prompt_tokens: int):
+        self.text = text
+        self.candidates = [_Candidate(text)]
+        self.usage_metadata = UsageMetadata(prompt_tokens, estimate_tokens(text))
+
+class MockStreamResponse:
+    """Streamed response yielding the text in small chunks with inter-chunk delays"""
+
+    def __init__(self, text: str, prompt_tokens: int, chunk_delay: float):
+        self._chunks = [text[i:i + 40] for i in range(0, len(text), 40)] or ['']
+        self._chunk_delay = chunk_delay
+        self.text = text
+        self.candidates = [_Candidate(text)]
+        self.usage_metadata = UsageMetadata(prompt_tokens, 0)
+        self._final_usage = UsageMetadata(prompt_tokens, estimate_tokens(text))
+
+    def __iter__(self):
+        for index, chunk in enumerate(self._chunks):
+            if index:
+                time.sleep(self._chunk_delay)
+            yield MockResponse(chunk, 0)
+        self.usage_metadata = self._final_usage
+
+def sample_latency(spec: str = None) -> float:
+    """
+    Draw a response latency in seconds from a distribution spec
+
+    Specs: 'fixed:<s>', 'uniform:<low>:<high>', 'lognormal:<median>:<sigma>' (default)
+    """
+    spec = spec or MOCK_GEMINI_LATENCY
+    kind, *params = spec.split(':')
+    values = [float(param) for param in params]
+    if kind == 'fixed':
+        return values[0]
+    if kind == 'uniform':
+        return random.uniform(values[0], values[1])
+    median, sigma = (values + [1.0, 0.5][len(values):])[:2]
+    return random.lognormvariate(0, sigma) * median
+
+def _sentiment() -> List[str]:
+    positive = random.randint(10, 70)
+    negative = random.randint(5, 100 - positive)
+    return [f'{positive}%', f'{100 - positive - negative}%', f'{negative}%']
+
+def _fill_article(article: Dict[str, Any]) -> Dict[str, Any]:
+    content = article.get('content') or ''
+    sentences = split_sentences(content) or ['No content available.']
+    positive, neutral, negative = _sentiment()
+    values = {
+        'category': random.choice(TOPICS),
+        'highlight': sentences[0],
+        'organization': random.choice(ORGANIZATIONS),
+        'positive_percentage': positive,
+        'positive_text': random.choice(sentences),
+        'neutral_percentage': neutral,
+        'neutral_text': random.choice(sentences),
+        'negative_percentage': negative,
+        'negative_text': random.choice(sentences),
+        'language': 'English',
+        'read_time': f'{max(1, len(content.split()) // 200)} minutes',
+        'trending_highlights': sentences[:2],
+        'trending_keywords': random.sample(['economy', 'election', 'inflation', 'climate', 'cricket', 'budget'], 3),
+        'trending_organizations': random.sample(ORGANIZATIONS, 2),
+        'average_positive_percentage': positive,
+        'average_neutral_percentage': neutral,
+        'average_negative_percentage': negative,
+        'flagged_articles': random.randint(0, 2),
+        'ai_generated_articles': random.randint(0, 1),
+        'total_articles': 1
+    }
+
+    filled = {}
+    for key, value in article.items():
+        if value is None:
+            filled[key] = values.get(key, 'Not Available')
+        elif key == 'authenticity' and isinstance(value, dict):
+            filled[key] = {
+                **value,
+                'Misinformation Status': value.get('Misinformation Status') or {
+                    'Misinformation': random.choice(['No', 'No', 'No', 'Partial', 'Yes']),
+                    'Flagged Text': 'Not Applicable'
+                },
+                'Related Articles': value.get('Related Articles') or {'Other Sources': [], 'Source Links': []}
+            }
+        else:
+            filled[key] = value
+    if filled.get('authenticity') == 'Not Available':
+        filled['authenticity'] = _fill_article({'authenticity': {}})['authenticity']
+    return filled
+
+def mock_reply(message: str) -> str:
+    """Build the reply text for a prompt, mimicking Perspec's fenced JSON output"""
+    match = re.match(r'\s*News Data:\s*(.*)', message, re.DOTALL)
+    if not match:
+        # Chat turns and summaries get free text
+        return f'This is a mock perspective on: {message[:200]}'
+
+    try:
+        news_data = ast.literal_eval(match.group(1))
+    except (ValueError, SyntaxError):
+        return '```json\n{}\n```'
+
+    if isinstance(news_data, list):
+        result = [_fill_article(article) if isinstance(article, dict) else article for article in news_data]
+    else:
+        result = _fill_article(news_data)
+    return f'```json\n{json.dumps(result, indent=2)}\n```'
+
+class MockGenerativeModel:
+    """Drop-in replacement for GenerativeModel with injected latency and failures"""
+
+    def __init__(self, model_name: str = 'mock', generation_config: Dict[str, Any] = None, safety_settings: Any = None, system_instruction: str = None):
+        self.model_name = model_name
+        self.system_instruction = system_instruction or ''
+
+    def generate_content(self, message: Any, stream: bool = False) -> Any:
+        message = message if isinstance(message, str) else str(message)
+        latency = sample_latency()
+        prompt_tokens = estimate_tokens(self.system_instruction) + estimate_tokens(message)
+
+        # Quota errors are returned quickly, as the real API does
+        if random.random() < MOCK_GEMINI_RATE_LIMIT:
+            time.sleep(min(latency, 0.05))
+            raise MockRateLimitError('429 Resource has been exhausted (e.g. check quota).')
+
+        text = mock_reply(message)
+        if random.random() < MOCK_GEMINI_MALFORMED:
+            # Truncated output, as when the model stops mid-answer
+            text = text[:max(1, len(text) // 2)]
+
+        if stream:
+            # Time to first token is a fraction of the latency, the rest is spread over the chunks
+            time.sleep(latency * 0.3)
+            chunks = max(1, len(text) // 40)
+            return MockStreamResponse(text, prompt_tokens, latency * 0.7 / chunks)
+        time.sleep(latency)
+        return MockResponse(text, prompt_tokens)
+
+    def start_chat(self, history: List[Any] = None) -> 'MockChatSession':
+        return MockChatSession(self, history or [])
+
+class MockChatSession:
+    """Chat session that records history like the SDK's ChatSession"""
+
+    def __init__(self, model: MockGenerativeModel, history: List[Any]):
+        self.model = model
+        self.history = list(history)
+
+    def send_message(self, message: str, stream: bool = False) -> Any:
+        response = self.model.generate_content(message, stream=stream)
+        self.history += [
+            {'role': 'user', 'parts': [message]},
+            {'role': 'model', 'parts': [response.text]}
+        ]
+        return response
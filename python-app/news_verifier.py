@@ -3,11 +3,19 @@ News Verification API Module
 This module integrates with external fact-checking APIs to verify news claims.
 """
 
-import requests
+import asyncio
+import httpx
 import logging
 import json
+import weakref
 from typing import Dict, Any, List, Optional
 
+from config import FACT_CHECK_CONCURRENCY, FACT_CHECK_TIMEOUT, FACT_CHECK_DEADLINE, FACT_CHECK_BACKEND
+from claim_cache import claim_cache
+from claims import select_claims
+from factcheck_index import search_claims
+from claim_matcher import get_claim_matcher, remember_claim
+
 class NewsVerifier:
     """Class to verify news articles against external fact-checking sources"""
     
@@ -27,6 +35,35 @@ class NewsVerifier:
                 self.api_key = FACT_CHECK_API_KEY
             except (ImportError, AttributeError):
                 logging.warning("Fact Check API key not found in config")
+
+        # One pooled client and concurrency limit per event loop (httpx clients cannot be shared across loops)
+        self._loop_state = weakref.WeakKeyDictionary()
+
+    def _get_loop_state(self) -> Dict[str, Any]:
+        """
+        Get the shared HTTP client and semaphore for the running event loop
+
+        Returns:
+            Dictionary with the 'client' and 'semaphore' of the current loop
+        """
+        loop = asyncio.get_running_loop()
+        state = self._loop_state.get(loop)
+        if state is None or state['client'].is_closed:
+            state = {
+                'client': httpx.AsyncClient(
+                    timeout=FACT_CHECK_TIMEOUT,
+                    limits=httpx.Limits(max_connections=FACT_CHECK_CONCURRENCY * 2, max_keepalive_connections=FACT_CHECK_CONCURRENCY)
+                ),
+                'semaphore': asyncio.Semaphore(FACT_CHECK_CONCURRENCY)
+            }
+            self._loop_state[loop] = state
+        return state
+
+    async def aclose(self) -> None:
+        """Close the HTTP client of the running event loop"""
+        state = self._loop_state.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            await state['client'].aclose()
     
     async def verify_claim(self, claim_text: str) -> List[Dict[str, Any]]:
         """
@@ -38,24 +75,41 @@ class NewsVerifier:
         Returns:
             List of claim verification results
         """
+        # The imported ClaimReview index answers at local-disk latency; the API is only asked on misses
+        if FACT_CHECK_BACKEND != 'remote':
+            local_results = search_claims(claim_text)
+            if local_results or FACT_CHECK_BACKEND == 'local':
+                return local_results
+
         if not self.api_key:
             logging.error("No API key available for fact checking")
             return []
+
+        # Repeated claims (including cached misses) are answered without calling the API
+        cached = await claim_cache.aget(claim_text)
+        if cached is not None:
+            return cached
             
         params = {
             "key": self.api_key,
             "query": claim_text
         }
         
+        state = self._get_loop_state()
         try:
-            response = requests.get(self.google_base_url, params=params)
+            # The semaphore bounds concurrent requests to the API across all articles being verified
+            async with state['semaphore']:
+                response = await state['client'].get(self.google_base_url, params=params)
             response.raise_for_status()
             data = response.json()
-            
-            return data.get("claims", [])
         except Exception as e:
+            # Failed lookups are not cached so the claim is retried next time
             logging.error(f"Error verifying claim: {e}")
             return []
+
+        claims = data.get("claims", [])
+        await claim_cache.aput(claim_text, claims)
+        return claims
     
     def get_verification_summary(self, claim_results: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -100,31 +154,58 @@ class NewsVerifier:
             "sources": sources
         }
         
-    async def verify_article_claims(self, article_text: str, max_claims: int = 3) -> Dict[str, Any]:
+    async def verify_article_claims(self, article_text: str, max_claims: int = 3, deadline: float = None) -> Dict[str, Any]:
         """
         Extract and verify key claims from an article
         
         Args:
             article_text: The full text of the article
             max_claims: Maximum number of claims to verify
+            deadline: Seconds to wait for all claims (claims still pending are left unverified)
             
         Returns:
             Dictionary with verification results for the article
         """
-        # Simple claim extraction by splitting into sentences and taking the first few
-        # In a real implementation, this would use NLP to identify actual claims
-        sentences = [s.strip() for s in article_text.split('.') if len(s.strip()) > 40]
-        potential_claims = sentences[:max_claims]
+        # Spend the fact check budget on the most check-worthy sentences rather than the first few
+        potential_claims = select_claims(article_text, max_claims)
         
+        # Paraphrases of claims resolved before reuse the stored verification (sub-millisecond lookup)
+        matcher = await asyncio.to_thread(get_claim_matcher)
+        matches = {claim: matcher.match(claim) for claim in potential_claims}
+        unmatched = [claim for claim in potential_claims if matches[claim] is None]
+
+        # Verify the remaining claims concurrently and stop waiting at the deadline
+        tasks = {claim: asyncio.create_task(self.verify_claim(claim)) for claim in unmatched}
+        if tasks:
+            done, pending = await asyncio.wait(tasks.values(), timeout=deadline or FACT_CHECK_DEADLINE)
+            for task in pending:
+                task.cancel()
+            if pending:
+                logging.warning(f"Fact check deadline reached, {len(pending)} of {len(tasks)} claims unverified")
+
         all_results = []
         for claim in potential_claims:
-            claim_results = await self.verify_claim(claim)
+            if matches[claim] is not None:
+                score, entry = matches[claim]
+                all_results.append({
+                    "claim": claim,
+                    "verification": entry["verification"],
+                    "matched_claim": entry["claim"],
+                    "match_score": score
+                })
+                continue
+
+            task = tasks[claim]
+            if not task.done() or task.cancelled():
+                continue
+            claim_results = task.result()
             if claim_results:
                 summary = self.get_verification_summary(claim_results)
                 all_results.append({
                     "claim": claim,
                     "verification": summary
                 })
+                await asyncio.to_thread(remember_claim, claim, summary)
         
         # Overall article verification
         article_status = "Unverified"
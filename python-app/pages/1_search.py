@@ -2,8 +2,9 @@
 import streamlit as st
 from typing import Counter
 
-# Local project-specific imports: graph components
+# Local project-specific imports: graph components and trending aggregation
 from graphs import *
+from keywords import aggregate_trending
 
 # NOTE: session_state is a Streamlit feature that allows storing data across pages
 # Reference: https://docs.streamlit.io/develop/api-reference/caching-and-state/st.session_state
@@ -49,6 +50,8 @@ def search() -> None:
     # Retrieve the search results from session state and display the first article analysis
     search_results = st.session_state.search_results
     result = search_results[0]
+    # Trending fields are extracted per article, so rank them across all articles for display
+    trending = aggregate_trending(search_results)
 
     # Create a 3-column layout with a grid of 200px height containers
     row = st.columns(3, gap='medium')
@@ -58,13 +61,13 @@ def search() -> None:
     with grid[0]:
         st.subheader('Article Analysis')
         with st.expander('Trending Highlights'):
-            st.write(result.get('trending_highlights', ['Unavailable']))
+            st.write(trending['trending_highlights'] or ['Unavailable'])
 
         with st.expander('Trending Keywords'):
-            st.write(result.get('trending_keywords', ['Unavailable']))
+            st.write(trending['trending_keywords'] or ['Unavailable'])
 
         with st.expander('Trending Organizations'):
-            st.write(result.get('trending_organizations', ['Unavailable']))
+            st.write(trending['trending_organizations'] or ['Unavailable'])
 
     with grid[1]:
         st.subheader('Sentiment Analysis')
@@ -75,8 +78,11 @@ def search() -> None:
     with grid[2]:
         st.subheader('Media Analysis')
         st.write(f':orange[Total] Articles: {result.get("total_articles", "Unavailable")}')
+        st.write(f':blue[Analysed] Articles: {result.get("analysed_articles", "Unavailable")}')
         st.write(f':red[Flagged] Articles: {result.get("flagged_articles", "Unavailable")}')
-        st.write(f':green[AI Generated] Content: {result.get("ai_generated_articles", "Unavailable")}')
+        # Not detected per article, so local aggregates report it as None
+        ai_generated = result.get('ai_generated_articles')
+        st.write(f':green[AI Generated] Content: {ai_generated if ai_generated is not None else "Unavailable"}')
 
     st.divider()
 
@@ -119,6 +125,8 @@ def article_analysis_chart() -> None:
         # Count the occurrences of each item and sort them in descending order
         item_counts = dict(Counter(items))
         sorted_items = sorted(item_counts.items(), key=lambda x: x[1], reverse=True)
+        if not sorted_items:
+            return ['Unavailable'], [0]
         labels, values = zip(*sorted_items)
 
         return labels, values
@@ -146,9 +154,9 @@ def sentiment_analysis_dual_chart() -> None:
     sentiments = [
         'Positive', 'Neutral', 'Negative'
     ] * len(st.session_state.search_results)
-    # Extract the sentiment percentages from the search results for each sentiment
+    # Extract each article's own sentiment percentages (older results only carry the averages)
     percentages = [
-        float(article.get(f'average_{sentiment}_percentage', '0%').strip('%'))
+        float(str(article.get(f'{sentiment}_percentage') or article.get(f'average_{sentiment}_percentage', '0%')).strip('%'))
         for article in st.session_state.search_results
         for sentiment in ['positive', 'neutral', 'negative']
     ]
@@ -179,14 +187,14 @@ def sentiment_analysis_chart() -> None:
 
 def media_analysis_chart() -> None:
     # Define the labels for media analysis categories
-    labels = ['Total Articles', 'Flagged Articles', 'AI Generated Content']
-    # Extract the counts from the search results for each category
-    counts = [
-        st.session_state.search_results[0].get(label.lower().replace(' ', '_'), 0)
-        for label in labels
-    ]
-    # Define the colors for the horizontal bar chart (Orange, Red, Green)
-    colors = ['#FFA500', '#FF6347', '#3CB371']
+    fields = {'Total Articles': 'total_articles', 'Analysed Articles': 'analysed_articles', 'Flagged Articles': 'flagged_articles', 'AI Generated Content': 'ai_generated_articles'}
+    # Define the colors for the horizontal bar chart (Orange, Blue, Red, Green)
+    palette = {'Total Articles': '#FFA500', 'Analysed Articles': '#4682B4', 'Flagged Articles': '#FF6347', 'AI Generated Content': '#3CB371'}
+    # Extract the counts from the search results, leaving out unavailable categories
+    result = st.session_state.search_results[0]
+    labels = [label for label, field in fields.items() if result.get(field) is not None]
+    counts = [result[fields[label]] for label in labels]
+    colors = [palette[label] for label in labels]
     horizontal_bar_chart('Media Analysis (Overall)', counts, labels, 'Count', 'Types', colors)
 
 # Check if the search results is in session state to prevent direct URL access to this page
@@ -1,10 +1,42 @@
 # Core library imports: Streamlit setup
 import json
+import time
+import requests
 import streamlit as st
 
 # Local project-specific imports: graph components
 from graphs import *
 
+API_URL = 'http://localhost:8000'
+
+def refresh_analysis() -> bool:
+    # Merge the latest partial or final result of the background analysis into session state.
+    # Returns True while the analysis is still running
+    job_id = st.session_state.get('analysis_job')
+    if not job_id:
+        return False
+    try:
+        job = requests.get(f'{API_URL}/api/jobs/{job_id}', timeout=5).json()
+    except requests.RequestException:
+        job = {}
+
+    if job.get('status') in ('queued', 'running'):
+        st.session_state.update(job.get('partial') or {})
+        return True
+    if job.get('status') == 'done':
+        st.session_state.update(job['result'])
+    else:
+        st.error('The analysis could not be completed; showing the partial results', icon=':material/error:')
+    st.session_state.analysis_job = None
+    return False
+
+def field(key: str) -> str:
+    # Session state value, or a placeholder while the background analysis has not filled it yet
+    value = st.session_state.get(key)
+    if value is None:
+        return 'Loading...' if st.session_state.get('analysis_job') else 'Unavailable'
+    return value
+
 # NOTE: session_state is a Streamlit feature that allows storing data across pages
 # Reference: https://docs.streamlit.io/develop/api-reference/caching-and-state/st.session_state
 def analyse() -> None:
@@ -20,7 +52,14 @@ def analyse() -> None:
         "<h1 style='text-align: center;'>Dashboard</h1>",
         unsafe_allow_html=True
     )
-    st.divider()    # Create a 4-column layout
+    st.divider()
+
+    # Fact checks and the Gemini fields arrive after the page metadata; the page reruns until they are in
+    pending = refresh_analysis()
+    if pending:
+        st.info('Fact checks and the Gemini analysis are still running; this page updates when they finish', icon=':material/hourglass_top:')
+
+    # Create a 4-column layout
     col1, col2, col3, col4 = st.columns(4)
 
     # Display the article metadata in text inputs using session state
@@ -39,7 +78,7 @@ def analyse() -> None:
     st.text_area('Article Summary', value=st.session_state.get('content', 'Unavailable'), height=150, help='Powered by Gemini')
 
     # Display authenticity and fact check information
-    authenticity = st.session_state.get('authenticity', {})
+    authenticity = st.session_state.get('authenticity') or {}
     
     # Create expandable sections for authenticity details
     with st.expander("Article Authenticity", expanded=True):
@@ -49,6 +88,9 @@ def analyse() -> None:
             st.markdown("### Misinformation Analysis")
             st.write(misinformation_status)
         
+        if pending and not authenticity:
+            st.write('Checking the article claims...')
+
         # Display fact check results if available
         fact_check_results = authenticity.get('Fact Check', {})
         if fact_check_results and isinstance(fact_check_results, dict):
@@ -97,7 +139,7 @@ def analyse() -> None:
                     st.markdown("---")
             else:
                 st.write("No specific claims were verified.")
-        else:
+        elif authenticity:
             # If no fact check results available
             st.markdown("### Authenticity Analysis")
             st.write(json.dumps(authenticity, indent=4))
@@ -111,28 +153,28 @@ def analyse() -> None:
     # Display the article analysis, sentiment analysis, and media analysis in text inputs using session state
     with grid[0]:
         st.subheader('Article Analysis')
-        st.write(f':green[Category]: {st.session_state.get("category", "Unavailable")}')
-        st.write(f':orange[Highlight]: {st.session_state.get("highlight", "Unavailable")}')
-        st.write(f':blue[Organization]: {st.session_state.get("organization", "Unavailable")}')
+        st.write(f':green[Category]: {field("category")}')
+        st.write(f':orange[Highlight]: {field("highlight")}')
+        st.write(f':blue[Organization]: {field("organization")}')
 
     with grid[1]:
         st.subheader('Sentiment Analysis')
-        st.write(f':green[Positive]: {st.session_state.get("positive_percentage", "Unavailable")}')
+        st.write(f':green[Positive]: {field("positive_percentage")}')
         with st.expander('Positive Text'):
-            st.write(st.session_state.get('positive_text', 'Unavailable'))
+            st.write(field('positive_text'))
 
-        st.write(f':grey[Neutral]: {st.session_state.get("neutral_percentage", "Unavailable")}')
+        st.write(f':grey[Neutral]: {field("neutral_percentage")}')
         with st.expander('Neutral Text'):
-            st.write(st.session_state.get('neutral_text', 'Unavailable'))
+            st.write(field('neutral_text'))
 
-        st.write(f':red[Negative]: {st.session_state.get("negative_percentage", "Unavailable")}')
+        st.write(f':red[Negative]: {field("negative_percentage")}')
         with st.expander('Negative Text'):
-            st.write(st.session_state.get('negative_text', 'Unavailable'))
+            st.write(field('negative_text'))
 
     with grid[2]:
         st.subheader('Media Analysis')
-        st.write(f':green[Language]: {st.session_state.get("language", "Unavailable")}')
-        st.write(f':red[Read Time]: {st.session_state.get("read_time", "Unavailable")}')
+        st.write(f':green[Language]: {field("language")}')
+        st.write(f':red[Read Time]: {field("read_time")}')
         st.write(f':violet[Ads]: {st.session_state.get("ads", "Unavailable")}')
         st.write(f':blue[Links]: {st.session_state.get("links", "Unavailable")}')
         st.write(f':orange[Images]: {st.session_state.get("images", "Unavailable")}')
@@ -161,12 +203,16 @@ def analyse() -> None:
         unsafe_allow_html=True
     )
 
+    if pending:
+        time.sleep(1)
+        st.rerun()
+
 def sentiment_analysis_chart() -> None:
     # Define the labels for sentiment analysis categories
     labels = ['Positive', 'Neutral', 'Negative']
     # Extract the sentiment percentages from session state for each category
     values = [
-        float(st.session_state.get(f'{sentiment.lower()}_percentage', '0%').strip('%'))
+        float((st.session_state.get(f'{sentiment.lower()}_percentage') or '0%').strip('%'))
         for sentiment in labels
     ]
     # Define the colors for the pie chart (Green, Grey, Red)
@@ -1,7 +1,10 @@
 # Core library imports: Streamlit setup
+import time
 import streamlit as st
-# Local project-specific imports: chat session with Gemini API
-from gemini import chat_session
+# Local project-specific imports: per-user chat sessions with Gemini API
+from gemini import start_chat, compact_history, stream_message
+from metrics import call_context
+from auth import get_current_user
 
 def chat() -> None:
     print('chat.py loaded')
@@ -21,29 +24,67 @@ def chat() -> None:
     # Initialize empty list to store chat messages in session state
     if 'messages' not in st.session_state:
         st.session_state.messages = []
+    # Conversation history sent to Gemini, kept per user and compacted separately from the displayed messages
+    if 'chat_history' not in st.session_state:
+        st.session_state.chat_history = []
 
     # Display chat messages with roles and content fetched from session state
     for message in st.session_state.messages:
         with st.chat_message(message['role']):
             st.markdown(message['content'])
+            if 'timing' in message:
+                timing_caption(message['timing'])
 
     # Store user input in session state as a message with the role 'user'
     if prompt := st.chat_input('Ready for a new perspective?'):
         st.chat_message('user').markdown(prompt)
         st.session_state.messages.append({'role': 'user', 'content': prompt})
 
-        # Send user input to Gemini API and display the response as a message with the role 'assistant'
-        with st.spinner('Creating a new perspective...'):
-            response = chat_session.send_message(prompt)
-            if response.candidates:
-                assistant_response = response.candidates[0].content.parts[0].text
-            else:
-                assistant_response = "I'm sorry, but I couldn't generate a response."
-
-        # Display the assistant response in the chat
-        with st.chat_message('assistant'):
-            st.markdown(assistant_response)
+        # Stream the Gemini response into the assistant message as tokens arrive, timing the turn
+        timing = {'first_token': None, 'total': None}
+        # Gemini calls of this turn (summary and reply) are attributed to the chat endpoint and the signed-in user
+        current_user = get_current_user()
+        with call_context('chat', current_user['username'] if current_user else None):
+            with st.chat_message('assistant'):
+                with st.spinner('Creating a new perspective...'):
+                    start = time.perf_counter()
+                    # Summarize older turns once the history exceeds its token budget, then resume the user's session
+                    st.session_state.chat_history = compact_history(st.session_state.chat_history)
+                    chat_session = start_chat(st.session_state.chat_history)
+                    stream = timed_stream(stream_message(prompt, session=chat_session), start, timing)
+                    # Pull the first chunk behind the spinner so the wait before the first token is still visible
+                    first_chunk = next(stream, None)
+
+                if first_chunk is None:
+                    assistant_response = "I'm sorry, but I couldn't generate a response."
+                    st.markdown(assistant_response)
+                else:
+                    assistant_response = st.write_stream(prepend(first_chunk, stream))
+                timing['total'] = time.perf_counter() - start
+                timing_caption(timing)
+
+        print(f"[Chat] First token: {timing['first_token']}s, total: {timing['total']:.2f}s")
         # Store the assistant response in session state as a message with the role 'assistant'
-        st.session_state.messages.append({'role': 'assistant', 'content': assistant_response})
+        st.session_state.messages.append({'role': 'assistant', 'content': assistant_response, 'timing': timing})
+        st.session_state.chat_history += [
+            {'role': 'user', 'parts': [prompt]},
+            {'role': 'model', 'parts': [assistant_response]}
+        ]
+
+def timed_stream(stream, start: float, timing: dict):
+    # Record the time to the first token while passing the chunks through unchanged
+    for chunk in stream:
+        if timing['first_token'] is None:
+            timing['first_token'] = round(time.perf_counter() - start, 2)
+        yield chunk
+
+def prepend(first_chunk: str, stream):
+    yield first_chunk
+    yield from stream
+
+def timing_caption(timing: dict) -> None:
+    # Display the generation timings recorded for an assistant turn
+    if timing.get('first_token') is not None and timing.get('total') is not None:
+        st.caption(f"First token in {timing['first_token']:.2f}s · generated in {timing['total']:.2f}s")
 
 chat()
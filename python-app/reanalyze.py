@@ -0,0 +1,148 @@
+"""
+Re-analysis Module
+This module re-runs Gemini on stored analyses whose prompt version or model
+differs from the current one, so edits to metadata/gemini_instructions.md can
+be rolled across the stored corpus gradually. Calls go through the normal
+Gemini path at batch priority, and progress is checkpointed so an interrupted
+run resumes where it stopped.
+
+Usage:
+    python reanalyze.py [--limit 100]
+"""
+
+import argparse
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from gemini import perspec, analysis_version
+from metrics import call_context
+from scheduler import Priority
+from config import DATA_DIR
+
+# Kept next to the stored analyses it refers to, whatever directory the run starts in
+CHECKPOINT_FILE = os.path.join(DATA_DIR, 'reanalyze_checkpoint.json')
+
+# Records that keep failing are skipped after this many attempts (per prompt version)
+MAX_ATTEMPTS = 3
+
+# Fields filled by Gemini; everything else (scraped data, fact checks, local metadata) is kept
+LLM_FIELDS = [
+    'category', 'highlight', 'organization',
+    'positive_percentage', 'positive_text',
+    'neutral_percentage', 'neutral_text',
+    'negative_percentage', 'negative_text'
+]
+
+_job_thread = None
+_job_lock = threading.Lock()
+
+def load_checkpoint(version: Dict[str, str]) -> Dict[str, Any]:
+    # A checkpoint from another prompt version belongs to a finished or abandoned rollout
+    try:
+        with open(CHECKPOINT_FILE, 'r') as file:
+            checkpoint = json.load(file)
+        if checkpoint.get('version') == version:
+            return checkpoint
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+    return {'version': version, 'completed': 0, 'failures': {}, 'started_at': datetime.now().isoformat()}
+
+def save_checkpoint(checkpoint: Dict[str, Any]) -> None:
+    checkpoint['updated_at'] = datetime.now().isoformat()
+    with open(CHECKPOINT_FILE, 'w') as file:
+        json.dump(checkpoint, file)
+
+def reset_llm_fields(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Null the Gemini-filled fields of a stored analysis so perspec fills them again
+
+    Args:
+        analysis: Stored analysis dictionary
+
+    Returns:
+        Copy of the analysis ready to be sent to perspec
+    """
+    article = {key: value for key, value in analysis.items() if key not in ('analysis_mode', 'upgrade', 'category_source')}
+    for field in LLM_FIELDS:
+        if field in article:
+            article[field] = None
+
+    # Scraped articles keep their fact check and only the misinformation verdict is redone
+    authenticity = article.get('authenticity')
+    if isinstance(authenticity, dict) and 'Fact Check' in authenticity:
+        article['authenticity'] = {**authenticity, 'Misinformation Status': None}
+    else:
+        article['authenticity'] = None
+    return article
+
+def reanalyze(limit: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Re-analyze stored records produced with an older prompt or model
+
+    Args:
+        limit: Maximum number of records to process in this run (all if None)
+
+    Returns:
+        The checkpoint with the rollout progress
+    """
+    # Imported lazily: the database module connects to MongoDB on import
+    from database import database_history, get_stale_analyses, write_queue
+
+    version = analysis_version()
+    checkpoint = load_checkpoint(version)
+
+    # Re-analysed records carry the current version and drop out of the stale set, so the
+    # checkpoint only needs the failure counts and progress
+    records = [
+        (document_name, analysis) for document_name, analysis in get_stale_analyses(version)
+        if checkpoint['failures'].get(document_name, 0) < MAX_ATTEMPTS
+    ]
+    if limit:
+        records = records[:limit]
+    checkpoint['remaining'] = len(records)
+    print(f"[Reanalyze] {len(records)} stale analyses to update to prompt {version['prompt_version']}")
+
+    with call_context('reanalyze', 'system'):
+        for document_name, analysis in records:
+            try:
+                # Batch priority: interactive users are always served first and the batch reserve is left alone
+                result = perspec(reset_llm_fields(analysis), Priority.BATCH)
+                database_history(document_name, result, version, record_trend=False)
+                checkpoint['completed'] += 1
+                checkpoint['failures'].pop(document_name, None)
+            except Exception as exc:
+                print(f'[Reanalyze] Failed to re-analyze "{document_name}": {exc}')
+                checkpoint['failures'][document_name] = checkpoint['failures'].get(document_name, 0) + 1
+            checkpoint['remaining'] -= 1
+            save_checkpoint(checkpoint)
+
+    # Updated analyses are stored by the write-behind queue; a lost write only leaves the analysis stale for the next run
+    write_queue.flush()
+    print(f"[Reanalyze] Done: {checkpoint['completed']} updated, {len(checkpoint['failures'])} failing")
+    return checkpoint
+
+def start_reanalysis(limit: Optional[int] = None) -> bool:
+    """Start the re-analysis in a background thread; returns False if one is already running"""
+    global _job_thread
+    with _job_lock:
+        if _job_thread is not None and _job_thread.is_alive():
+            return False
+        _job_thread = threading.Thread(target=reanalyze, args=(limit,), daemon=True)
+        _job_thread.start()
+        return True
+
+def reanalysis_status() -> Dict[str, Any]:
+    """Return whether a re-analysis is running and the progress of the current prompt version"""
+    return {
+        'running': _job_thread is not None and _job_thread.is_alive(),
+        'checkpoint': load_checkpoint(analysis_version())
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Re-analyze stored articles after a prompt or model change')
+    parser.add_argument('--limit', type=int, help='Maximum number of records to process')
+    args = parser.parse_args()
+    reanalyze(args.limit)
@@ -0,0 +1,275 @@
+"""
+Gemini Scheduler Module
+This module orders every Gemini call by priority class and admits it only
+when the requests-per-minute and tokens-per-minute quotas allow, backing
+off adaptively when the API answers with a rate limit (HTTP 429). The quota
+buckets and the backoff state live in a locked file shared by every process
+using the same API key, so the extension API, the FastAPI backend and the
+Streamlit app together stay within one key's quota.
+"""
+
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from config import GEMINI_RPM, GEMINI_TPM, GEMINI_BATCH_RESERVE, GEMINI_QUOTA_FILE, GEMINI_API_KEY, GEMINI_BACKEND
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: byte-range locks instead of flock
+    fcntl = None
+    import msvcrt
+
+class Priority(IntEnum):
+    """Priority classes, lower values are admitted first"""
+    INTERACTIVE = 0  # Extension lookups, URL analysis and chat turns
+    STANDARD = 1     # Archive searches
+    BATCH = 2        # Background crawling and re-analysis
+
+class TokenBucket:
+    """Token bucket refilled continuously at a per-minute rate"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.rate = per_minute / 60.0
+        # Wall-clock time, so processes sharing the bucket agree on it
+        self.updated = time.time()
+
+    def refill(self, now: float, rate_factor: float = 1.0) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate * rate_factor)
+        self.updated = now
+
+    def wait_time(self, amount: float, reserve: float, rate_factor: float = 1.0) -> float:
+        # Seconds until amount can be taken while leaving reserve untouched
+        missing = amount + reserve - self.level
+        return max(0.0, missing / (self.rate * rate_factor))
+
+@contextmanager
+def locked_file(path: str) -> Iterator[None]:
+    """Hold an exclusive lock on path (created if missing) across processes"""
+    with open(path, 'a+') as file:
+        if fcntl is not None:
+            fcntl.flock(file, fcntl.LOCK_EX)
+        else:
+            file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.01)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(file, fcntl.LOCK_UN)
+            else:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+def default_quota_file() -> Optional[str]:
+    """Path of the shared quota state (one per API key and backend), or None to keep the quota per process"""
+    if GEMINI_QUOTA_FILE.lower() == 'none':
+        return None
+    if GEMINI_QUOTA_FILE:
+        return GEMINI_QUOTA_FILE
+    key = hashlib.sha256(f'{GEMINI_BACKEND}:{GEMINI_API_KEY}'.encode()).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f'godseye-gemini-quota-{key}.json')
+
+class RateLimitedError(Exception):
+    """Raised when a call is still rate limited after all retries"""
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """Detect a Gemini quota error without importing the SDK exception types"""
+    return (
+        getattr(exc, 'code', None) == 429
+        or type(exc).__name__ in ('ResourceExhausted', 'TooManyRequests')
+        or '429' in str(exc)
+    )
+
+class GeminiScheduler:
+    """Priority queue in front of the Gemini quota"""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, batch_reserve: float = 0.25, state_path: Optional[str] = None):
+        """
+        Initialize the scheduler
+
+        Args:
+            requests_per_minute: Request quota of the API key
+            tokens_per_minute: Token quota of the API key
+            batch_reserve: Fraction of each bucket that batch work may not use,
+                kept free so interactive requests are admitted immediately
+            state_path: File shared with the other processes using the key (None keeps the quota in this process)
+        """
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.batch_reserve = batch_reserve
+        self.state_path = state_path
+        self._cond = threading.Condition()
+        self._queue = []
+        self._sequence = itertools.count()
+
+        # Adaptive backoff state: a global pause after 429s and a rate multiplier (AIMD)
+        self.backoff = 0.0
+        self.backoff_until = 0.0
+        self.rate_factor = 1.0
+        self.rate_limited = 0
+        self.admitted = {priority.name: 0 for priority in Priority}
+
+    @contextmanager
+    def _shared_state(self) -> Iterator[None]:
+        # Load the buckets and backoff written by any process, and write them back after the change
+        if self.state_path is None:
+            yield
+            return
+        with locked_file(self.state_path + '.lock'):
+            try:
+                with open(self.state_path, 'r') as file:
+                    state = json.load(file)
+                self.requests.level, self.requests.updated = state['requests']
+                self.tokens.level, self.tokens.updated = state['tokens']
+                self.backoff, self.backoff_until, self.rate_factor = state['backoff']
+            except (FileNotFoundError, json.JSONDecodeError, KeyError, ValueError):
+                # First process to use the key (or an unreadable file): start from full buckets
+                pass
+            yield
+            state = {
+                'requests': [self.requests.level, self.requests.updated],
+                'tokens': [self.tokens.level, self.tokens.updated],
+                'backoff': [self.backoff, self.backoff_until, self.rate_factor]
+            }
+            with open(self.state_path, 'w') as file:
+                json.dump(state, file)
+
+    def _reserve(self, bucket: TokenBucket, priority: Priority) -> float:
+        if priority == Priority.INTERACTIVE:
+            return 0.0
+        reserve = self.batch_reserve if priority == Priority.BATCH else self.batch_reserve / 2
+        return bucket.capacity * reserve
+
+    def acquire(self, priority: Priority = Priority.INTERACTIVE, tokens: int = 0) -> None:
+        """
+        Block until a call with the given priority and token estimate may start
+
+        Args:
+            priority: Priority class of the call
+            tokens: Estimated tokens (prompt plus expected output)
+        """
+        tokens = min(tokens, self.tokens.capacity)
+        with self._cond:
+            ticket = (int(priority), next(self._sequence))
+            heapq.heappush(self._queue, ticket)
+            try:
+                while True:
+                    wait = None
+                    # Only the head of this process's queue competes for the shared quota
+                    if self._queue[0] == ticket:
+                        with self._shared_state():
+                            now = time.time()
+                            self.requests.refill(now, self.rate_factor)
+                            self.tokens.refill(now, self.rate_factor)
+                            wait = max(
+                                self.backoff_until - now,
+                                self.requests.wait_time(1, self._reserve(self.requests, priority), self.rate_factor),
+                                self.tokens.wait_time(tokens, self._reserve(self.tokens, priority), self.rate_factor)
+                            )
+                            if wait <= 0:
+                                self.requests.level -= 1
+                                self.tokens.level -= tokens
+                        if wait <= 0:
+                            heapq.heappop(self._queue)
+                            self.admitted[Priority(priority).name] += 1
+                            self._cond.notify_all()
+                            return
+                    # Higher priority arrivals notify the condition, so a bounded wait is enough
+                    self._cond.wait(timeout=min(wait, 1.0) if wait is not None else 1.0)
+            except BaseException:
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+                    heapq.heapify(self._queue)
+                    self._cond.notify_all()
+                raise
+
+    def settle(self, estimated: int, actual: int) -> None:
+        """Correct the token bucket once the real usage of a call is known"""
+        with self._cond, self._shared_state():
+            self.tokens.level -= actual - min(estimated, self.tokens.capacity)
+
+    def report_success(self) -> None:
+        with self._cond, self._shared_state():
+            self.backoff = 0.0
+            self.rate_factor = min(1.0, self.rate_factor + 0.05)
+
+    def report_rate_limit(self) -> None:
+        """Pause all callers (in every process sharing the quota) and halve the admission rate after a 429"""
+        with self._cond, self._shared_state():
+            self.rate_limited += 1
+            self.backoff = min(60.0, self.backoff * 2 if self.backoff else 1.0)
+            self.backoff_until = time.time() + self.backoff * random.uniform(1.0, 1.5)
+            self.rate_factor = max(0.1, self.rate_factor / 2)
+            self._cond.notify_all()
+
+    def run(self, fn: Callable[[], Any], priority: Priority = Priority.INTERACTIVE, tokens: int = 0, retries: int = 3, settle_usage: bool = True) -> Any:
+        """
+        Run a Gemini call under the scheduler, retrying on rate limits
+
+        Args:
+            fn: Function performing the call and returning the SDK response
+            priority: Priority class of the call
+            tokens: Estimated tokens (prompt plus expected output)
+            retries: Number of retries after a 429
+            settle_usage: Correct the token estimate from the response usage
+                (disabled for streamed responses, which settle once fully read)
+
+        Returns:
+            The value returned by fn
+        """
+        for attempt in range(retries + 1):
+            self.acquire(priority, tokens)
+            try:
+                response = fn()
+            except Exception as exc:
+                if not is_rate_limit_error(exc):
+                    raise
+                self.report_rate_limit()
+                if attempt == retries:
+                    raise RateLimitedError(f'Gemini quota exhausted after {retries + 1} attempts') from exc
+                continue
+
+            self.report_success()
+            if settle_usage:
+                usage = getattr(response, 'usage_metadata', None)
+                actual = getattr(usage, 'total_token_count', None)
+                if actual:
+                    self.settle(tokens, actual)
+            return response
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue and quota state for the metrics endpoint"""
+        with self._cond:
+            waiting = {priority.name: 0 for priority in Priority}
+            for priority, _ in self._queue:
+                waiting[Priority(priority).name] += 1
+            return {
+                'waiting': waiting,
+                'admitted': dict(self.admitted),
+                'rate_limited': self.rate_limited,
+                'rate_factor': round(self.rate_factor, 2),
+                'requests_available': round(self.requests.level, 1),
+                'tokens_available': round(self.tokens.level),
+                'shared_state': self.state_path
+            }
+
+# Shared scheduler for every Gemini call in the process; its quota is shared with the other processes using the key
+scheduler = GeminiScheduler(GEMINI_RPM, GEMINI_TPM, GEMINI_BATCH_RESERVE, default_quota_file())
@@ -1,14 +1,34 @@
 # Core library imports: Web scraping setup
+import asyncio
 import httpx
 import re
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse
 
-# Local project-specific imports: Gemini AI model and News Verifier
+# Local project-specific imports: Gemini AI model, News Verifier and request coalescing
 from gemini import perspec
+from scheduler import Priority
+from sentiment import analyze_sentiment
+from keywords import article_signals
+from aggregate import archive_aggregates
+from article_metadata import local_metadata
+from config import SENTIMENT_MODE
 from news_verifier import NewsVerifier
+from canonical import canonical_url
+from singleflight import get_group
+from jobs import follow_progress, publish_progress
+
+# Shared verifier: its pooled HTTP client is reused across articles
+verifier = NewsVerifier()
 
 async def ndtv_archive(url: str, topic: str, limit: int) -> list:
+    # Concurrent searches for the same archive month and topic share one scrape and analysis,
+    # and every archive job waiting on it sees its progress
+    key = f'{canonical_url(url)}|{topic.lower()}|{limit}'
+    with follow_progress(f'ndtv_archive|{key}'):
+        return await get_group('ndtv_archive').do_async(key, _ndtv_archive, url, topic, limit, f'ndtv_archive|{key}')
+
+async def _ndtv_archive(url: str, topic: str, limit: int, progress_key: str) -> list:
     try:
         # Send an asynchronous HTTP GET request to the NDTV archive URL and parse the HTML content
         async with httpx.AsyncClient() as client:
@@ -26,38 +46,65 @@ async def ndtv_archive(url: str, topic: str, limit: int) -> list:
                 if topic.lower() in urlparse(link['href']).path.lower()
             ]
 
-            # Construct a list of dictionaries containing the article data for each filtered link and pass it through the Gemini AI model
+            # Archive jobs report how many articles are analysed, not the fields of each article
+            selected_links = list(set(filtered_links))[:limit]
+            progress = {'articles': len(selected_links), 'analysed': 0}
+            publish_progress(progress_key, 'links', progress)
+
+            async def analyse(link: str) -> dict:
+                try:
+                    return await ndtv_url(urlparse(link).geturl(), Priority.STANDARD)
+                finally:
+                    progress['analysed'] += 1
+                    publish_progress(progress_key, 'articles', progress)
+
+            # Scrape and analyse the article behind each filtered link concurrently (Gemini calls are queued by the scheduler);
+            # an article that fails is left out instead of failing the whole search
+            records = await asyncio.gather(*[analyse(link) for link in selected_links], return_exceptions=True)
+            for record in records:
+                if isinstance(record, Exception):
+                    print(f'[Scraper] Archive article failed: {record!r}')
+            records = [record for record in records if isinstance(record, dict) and 'error' not in record]
+            if not records:
+                return [{'error': f'No {topic} articles could be analysed'}]
+
+            # Archive-level averages and counts are plain arithmetic over the per-article analyses; the total
+            # counts every link on the archive page, the analysed count only the articles scraped and analysed
+            aggregates = archive_aggregates(records, total_articles=len(links))
+
+            # Construct a list of dictionaries containing the article data, with keywords, organizations and
+            # highlights extracted locally at scrape time (no second Gemini pass is needed)
             article_data = [
                 {
                     'id': i + 1,
-                    'content': (await ndtv_url(urlparse(link).geturl()))['content'],
-                    'trending_highlights': None,
-                    'trending_keywords': None,
-                    'trending_organizations': None,
-                    'average_positive_percentage': None,
-                    'average_neutral_percentage': None,
-                    'average_negative_percentage': None,
-                    'total_articles': len(links),
-                    'flagged_articles': None,
-                    'ai_generated_articles': None
+                    'content': record.get('content'),
+                    **article_signals(record.get('content')),
+                    'positive_percentage': record.get('positive_percentage'),
+                    'neutral_percentage': record.get('neutral_percentage'),
+                    'negative_percentage': record.get('negative_percentage'),
+                    **aggregates
                 }
-                for i, link in enumerate(list(set(filtered_links))[:limit])
-                # if print(f'[{i + 1}/{limit}] {link}') is None
+                for i, record in enumerate(records)
             ]
-
-            filtered_data = perspec(article_data)
-            return filtered_data
+            return article_data
         else:
             return [{'error': 'No archive body found'}]
 
-    except httpx.RequestError as exc:
+    except (httpx.RequestError, httpx.HTTPStatusError) as exc:
         return [{'error': f'Error occurred: {exc}'}]
 
-async def ndtv_url(url: str) -> dict:
+async def ndtv_url(url: str, priority: Priority = Priority.INTERACTIVE, report_stages: bool = False) -> dict:
+    # Concurrent requests for the same article share one scrape, fact check and analysis
+    key = canonical_url(url)
+    if not report_stages:
+        return await get_group('ndtv_url').do_async(key, _ndtv_url, url, priority)
+    # Single-URL jobs show the article fields as its stages finish, whichever job started the analysis
+    with follow_progress(f'ndtv_url|{key}'):
+        return await get_group('ndtv_url').do_async(key, _ndtv_url, url, priority)
+
+async def _ndtv_url(url: str, priority: Priority) -> dict:
+    progress_key = f'ndtv_url|{canonical_url(url)}'
     try:
-        # Initialize the news verifier
-        verifier = NewsVerifier()
-        
         # Send an asynchronous HTTP GET request to the NDTV article URL and parse the HTML content
         async with httpx.AsyncClient() as client:
             response = await client.get(url)
@@ -83,23 +130,15 @@ async def ndtv_url(url: str) -> dict:
         article_body = soup.find('div', id='ins_storybody')
         raw_content = article_body.get_text(strip=True) if article_body else None
         filtered_content = re.sub(r'[^\x20-\x7E]', '', raw_content) if raw_content else None
-        
-        # Verify the article claims if content is available
-        fact_check_results = None
-        if filtered_content:
-            fact_check_results = await verifier.verify_article_claims(filtered_content)
 
-        # Construct a dictionary of the extracted article data and pass it through the Gemini AI model
+        # Construct a dictionary of the extracted article data; fact checks and the Gemini AI model fill the rest
         article_data = {
             'publisher': 'NDTV',
             'author': author,
             'publication_date': date,
             'edited_date': date,
             'content': filtered_content,
-            'authenticity': {
-                'Fact Check': fact_check_results,
-                'Misinformation Status': None
-            },
+            'authenticity': None,
             'category': None,
             'highlight': None,
             'organization': None,
@@ -118,8 +157,33 @@ async def ndtv_url(url: str) -> dict:
             'documents': total_documents
         }
 
-        filtered_data = perspec(article_data)
+        # Language, read time and (when the classifier is confident) category are computed locally,
+        # leaving fewer null fields for Gemini to fill
+        if filtered_content:
+            metadata = await asyncio.to_thread(local_metadata, filtered_content)
+            article_data.update({key: value for key, value in metadata.items() if value is not None})
+
+        # The lexicon sentiment is cheap; in local mode it fills the sentiment fields, so Gemini (which only fills nulls) keeps them
+        local_sentiment = analyze_sentiment(filtered_content) if filtered_content else {}
+        if SENTIMENT_MODE == 'local':
+            article_data.update(local_sentiment)
+
+        # Background jobs show the page fields and the lexicon sentiment at once, before fact checks and Gemini
+        publish_progress(progress_key, 'metadata', {**article_data, **local_sentiment})
+
+        # Verify the article claims if content is available
+        fact_check_results = None
+        if filtered_content:
+            fact_check_results = await verifier.verify_article_claims(filtered_content)
+        article_data['authenticity'] = {
+            'Fact Check': fact_check_results,
+            'Misinformation Status': None
+        }
+        publish_progress(progress_key, 'fact_check', {'authenticity': article_data['authenticity']})
+
+        # Run the scheduled Gemini call off the event loop so other requests keep being served
+        filtered_data = await asyncio.to_thread(perspec, article_data, priority)
         return filtered_data
 
-    except httpx.RequestError as exc:
+    except (httpx.RequestError, httpx.HTTPStatusError) as exc:
         return {'error': f'Error occurred: {exc}'}
@@ -0,0 +1,126 @@
+"""
+Local Sentiment Module
+This module scores article sentiment locally with a word lexicon so the
+sentiment fields can be filled in milliseconds without a Gemini round trip.
+"""
+
+import json
+import os
+import re
+from typing import Dict, Any, List
+
+import numpy as np
+
+from text_utils import split_sentences
+
+# Load the sentiment lexicon (word valence from -3 to +3, negations and intensifiers)
+lexicon_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'metadata/sentiment_lexicon.json')
+with open(lexicon_path, 'r') as file:
+    _lexicon = json.load(file)
+
+WORD_SCORES = _lexicon['words']
+NEGATIONS = set(_lexicon['negations'])
+INTENSIFIERS = _lexicon['intensifiers']
+
+# Sentences scoring beyond this (per square root of their length) are positive or negative
+SENTENCE_THRESHOLD = 0.3
+# Number of preceding words a negation applies to
+NEGATION_WINDOW = 3
+# Number of example sentences returned for each sentiment
+TEXT_SENTENCES = 2
+
+_word_regex = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+def _percentages(weights: np.ndarray) -> List[int]:
+    # Round shares to whole percentages that still add up to 100 (largest remainder)
+    if weights.sum() == 0:
+        return [0, 100, 0]
+    shares = weights / weights.sum() * 100
+    rounded = np.floor(shares).astype(int)
+    for index in np.argsort(rounded - shares)[:100 - rounded.sum()]:
+        rounded[index] += 1
+    return rounded.tolist()
+
+def score_sentences(sentences: List[str]) -> np.ndarray:
+    """
+    Score each sentence with the lexicon
+
+    Args:
+        sentences: List of sentences
+
+    Returns:
+        Array of sentence scores normalized by sentence length
+    """
+    words_per_sentence = [_word_regex.findall(sentence.lower()) for sentence in sentences]
+    lengths = np.array([len(words) for words in words_per_sentence])
+    if lengths.sum() == 0:
+        return np.zeros(len(sentences))
+
+    words = [word for words in words_per_sentence for word in words]
+    sentence_index = np.repeat(np.arange(len(sentences)), lengths)
+
+    # Look up each distinct word once, then gather the values for every position
+    vocabulary, inverse = np.unique(np.array(words), return_inverse=True)
+    valence = np.array([WORD_SCORES.get(word, 0) for word in vocabulary], dtype=float)[inverse]
+    is_negation = np.array([word in NEGATIONS for word in vocabulary])[inverse]
+    boost = np.array([INTENSIFIERS.get(word, 1.0) for word in vocabulary], dtype=float)[inverse]
+
+    # A word is negated when a negation occurs within the preceding window of the same sentence
+    negated = np.zeros(len(words), dtype=bool)
+    for shift in range(1, NEGATION_WINDOW + 1):
+        same_sentence = np.zeros(len(words), dtype=bool)
+        same_sentence[shift:] = sentence_index[shift:] == sentence_index[:-shift]
+        previous = np.zeros(len(words), dtype=bool)
+        previous[shift:] = is_negation[:-shift]
+        negated |= previous & same_sentence
+
+    # Intensifiers scale the word that follows them
+    multiplier = np.ones(len(words))
+    follows = np.zeros(len(words), dtype=bool)
+    follows[1:] = sentence_index[1:] == sentence_index[:-1]
+    multiplier[1:] = np.where(follows[1:], boost[:-1], 1.0)
+
+    word_scores = valence * multiplier * np.where(negated, -0.5, 1.0)
+    totals = np.bincount(sentence_index, weights=word_scores, minlength=len(sentences))
+    return totals / np.sqrt(np.maximum(lengths, 1))
+
+def analyze_sentiment(text: str) -> Dict[str, Any]:
+    """
+    Compute the article sentiment fields locally
+
+    Args:
+        text: The article text
+
+    Returns:
+        Dictionary with positive/neutral/negative percentages and example text
+    """
+    sentences = split_sentences(text)
+    if not sentences:
+        return {
+            'positive_percentage': '0%', 'positive_text': None,
+            'neutral_percentage': '100%', 'neutral_text': None,
+            'negative_percentage': '0%', 'negative_text': None
+        }
+
+    scores = score_sentences(sentences)
+    lengths = np.array([len(sentence) for sentence in sentences], dtype=float)
+    positive = scores > SENTENCE_THRESHOLD
+    negative = scores < -SENTENCE_THRESHOLD
+    neutral = ~(positive | negative)
+
+    # Sentiment shares are weighted by sentence length so short fragments count for less
+    weights = np.array([lengths[positive].sum(), lengths[neutral].sum(), lengths[negative].sum()])
+    positive_share, neutral_share, negative_share = _percentages(weights)
+
+    def examples(mask: np.ndarray, order: np.ndarray) -> Any:
+        picked = [sentences[index] for index in order if mask[index]][:TEXT_SENTENCES]
+        return ' '.join(picked) if picked else None
+
+    return {
+        'positive_percentage': f'{positive_share}%',
+        'positive_text': examples(positive, np.argsort(-scores)),
+        'neutral_percentage': f'{neutral_share}%',
+        'neutral_text': examples(neutral, np.argsort(np.abs(scores))),
+        'negative_percentage': f'{negative_share}%',
+        'negative_text': examples(negative, np.argsort(scores))
+    }
@@ -0,0 +1,166 @@
+"""
+Serialization Module
+This module encodes API responses for both servers. JSON is serialized with
+orjson when it is installed (several times faster than the standard library
+on article payloads) and falls back to json otherwise. Bodies above a size
+threshold are compressed with the best encoding the client accepts: brotli
+when the brotli package is installed, else gzip. CompressionMiddleware applies
+the same negotiation to the FastAPI app.
+"""
+
+import gzip
+import json
+from typing import Any, Optional, Tuple
+
+# Optional fast JSON serializer
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Optional brotli compression (gzip is always available)
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+try:
+    from config import JSON_SERIALIZER, COMPRESSION_MIN_BYTES, GZIP_LEVEL, BROTLI_QUALITY
+except ImportError:
+    JSON_SERIALIZER = 'auto'
+    COMPRESSION_MIN_BYTES = 1024
+    GZIP_LEVEL = 5
+    BROTLI_QUALITY = 4
+
+USE_ORJSON = ORJSON_AVAILABLE and JSON_SERIALIZER in ('auto', 'orjson')
+if JSON_SERIALIZER == 'orjson' and not ORJSON_AVAILABLE:
+    print('[Serialization] orjson is not installed, using the json module')
+
+def dumps(payload: Any) -> bytes:
+    """
+    Serialize a response payload to UTF-8 JSON
+
+    Args:
+        payload: JSON-compatible data (datetimes and NumPy values are also accepted with orjson)
+
+    Returns:
+        The encoded JSON document
+    """
+    if USE_ORJSON:
+        try:
+            return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            # Values orjson rejects (e.g. integers above 64 bits) are left to the json module
+            pass
+    return json.dumps(payload, ensure_ascii=False).encode()
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick the response encoding from an Accept-Encoding header
+
+    Args:
+        accept_encoding: The request header (may be None or empty)
+
+    Returns:
+        'br', 'gzip' or None if the client accepts neither
+    """
+    accepted = {}
+    for item in (accept_encoding or '').lower().split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name] = quality
+
+    def allowed(encoding: str) -> bool:
+        return accepted.get(encoding, accepted.get('*', 0.0)) > 0
+
+    if BROTLI_AVAILABLE and allowed('br'):
+        return 'br'
+    if allowed('gzip'):
+        return 'gzip'
+    return None
+
+def response_encoding(length: int, accept_encoding: Optional[str], min_bytes: int = COMPRESSION_MIN_BYTES) -> Optional[str]:
+    """Content-Encoding that compress uses for a body of this length (None if it is sent as it is)"""
+    if length < min_bytes:
+        return None
+    return negotiate_encoding(accept_encoding)
+
+def compress(body: bytes, accept_encoding: Optional[str], min_bytes: int = COMPRESSION_MIN_BYTES) -> Tuple[bytes, Optional[str]]:
+    """
+    Compress a response body with the negotiated encoding
+
+    Args:
+        body: The encoded response
+        accept_encoding: The request's Accept-Encoding header
+        min_bytes: Smaller bodies are sent as they are (compression would not pay off)
+
+    Returns:
+        Tuple of (body, Content-Encoding or None if the body is not compressed)
+    """
+    encoding = response_encoding(len(body), accept_encoding, min_bytes)
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY), 'br'
+    if encoding == 'gzip':
+        # A fixed mtime keeps the output identical for identical bodies
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0), 'gzip'
+    return body, None
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing complete responses with the negotiated encoding
+
+    Streamed responses (Server-Sent Events) and responses that already carry a
+    Content-Encoding are passed through unchanged.
+    """
+
+    def __init__(self, app, min_bytes: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.min_bytes = min_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = dict(scope['headers']).get(b'accept-encoding', b'').decode('latin-1')
+        if negotiate_encoding(accept_encoding) is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+
+        async def send_compressed(message):
+            nonlocal start
+            # The response start is held until the first body part shows whether the response is streamed
+            if message['type'] == 'http.response.start':
+                start = message
+                return
+            if message['type'] != 'http.response.body' or start is None:
+                await send(message)
+                return
+
+            held, start = start, None
+            headers = list(held.get('headers', []))
+            encoded = any(name.lower() == b'content-encoding' for name, _ in headers)
+            if not message.get('more_body') and not encoded:
+                body, encoding = compress(message.get('body', b''), accept_encoding, self.min_bytes)
+                if encoding is not None:
+                    headers = [(name, value) for name, value in headers if name.lower() != b'content-length']
+                    headers += [
+                        (b'content-encoding', encoding.encode()),
+                        (b'content-length', str(len(body)).encode()),
+                        (b'vary', b'Accept-Encoding')
+                    ]
+                    held = {**held, 'headers': headers}
+                    message = {**message, 'body': body}
+            await send(held)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
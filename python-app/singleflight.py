@@ -0,0 +1,125 @@
+"""
+Single-Flight Module
+This module coalesces identical concurrent requests: the first caller for a
+key does the work and every duplicate that arrives while it is running
+waits for the same result instead of starting its own Gemini or scrape call.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict
+
+class SingleFlight:
+    """Group of in-flight calls keyed by canonical input"""
+
+    def __init__(self, name: str):
+        """
+        Initialize an empty single-flight group
+
+        Args:
+            name: Name reported in the metrics
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self._tasks: Dict[str, tuple] = {}
+        self.total_calls = 0
+        self.executions = 0
+        self.shared_calls = 0
+
+    def do(self, key: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run fn once per key among concurrent (threaded) callers
+
+        Args:
+            key: Canonical key of the request
+            fn: Function doing the actual work
+
+        Returns:
+            The result of fn, shared with any duplicate callers
+        """
+        with self._lock:
+            self.total_calls += 1
+            future = self._calls.get(key)
+            if future is not None:
+                self.shared_calls += 1
+                leader = False
+            else:
+                future = Future()
+                self._calls[key] = future
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as exc:
+            future.set_exception(exc)
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+        return future.result()
+
+    async def do_async(self, key: str, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Run the coroutine function fn once per key among concurrent tasks
+
+        Args:
+            key: Canonical key of the request
+            fn: Coroutine function doing the actual work
+
+        Returns:
+            The result of fn, shared with any duplicate callers
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self.total_calls += 1
+            entry = self._tasks.get(key)
+            # Tasks can only be awaited from the loop that owns them
+            if entry is not None and entry[0] is loop:
+                self.shared_calls += 1
+                task = entry[1]
+            else:
+                task = loop.create_task(fn(*args, **kwargs))
+                self._tasks[key] = (loop, task)
+                self.executions += 1
+                task.add_done_callback(lambda _, key=key, task=task: self._forget(key, task))
+
+        # Shield the shared task so one cancelled client does not cancel it for everyone
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        with self._lock:
+            entry = self._tasks.get(key)
+            if entry is not None and entry[1] is task:
+                del self._tasks[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Return call counters for the metrics endpoint"""
+        with self._lock:
+            return {
+                'calls': self.total_calls,
+                'executions': self.executions,
+                'shared': self.shared_calls,
+                'in_flight': len(self._calls) + len(self._tasks)
+            }
+
+# Registry of all groups so the APIs can report them together
+_groups: Dict[str, SingleFlight] = {}
+_groups_lock = threading.Lock()
+
+def get_group(name: str) -> SingleFlight:
+    """Return the single-flight group with the given name, creating it if needed"""
+    with _groups_lock:
+        if name not in _groups:
+            _groups[name] = SingleFlight(name)
+        return _groups[name]
+
+def stats() -> Dict[str, Dict[str, int]]:
+    """Return the counters of every single-flight group"""
+    with _groups_lock:
+        groups = list(_groups.values())
+    return {group.name: group.stats() for group in groups}
@@ -0,0 +1,65 @@
+"""
+Tests for the archive aggregates computed from per-article analyses:
+averages skip missing values, flagged counts misinformation and very
+negative articles, and the total keeps counting the archive links.
+"""
+
+from aggregate import archive_aggregates, is_misinformation, parse_percentage
+
+def article(positive, neutral, negative, misinformation='No', article_status='True'):
+    return {
+        'positive_percentage': positive,
+        'neutral_percentage': neutral,
+        'negative_percentage': negative,
+        'authenticity': {
+            'Misinformation Status': {'Misinformation': misinformation},
+            'Fact Check': {'article_status': article_status}
+        }
+    }
+
+def test_parse_percentage():
+    assert parse_percentage('42%') == 42.0
+    assert parse_percentage(' 42.5 ') == 42.5
+    assert parse_percentage(7) == 7.0
+    assert parse_percentage(None) != parse_percentage(None)
+
+def test_averages_skip_missing_values():
+    aggregates = archive_aggregates([
+        article('40%', '40%', '20%'),
+        article('60%', None, '20%'),
+        article('Not Available', '20%', '40%'),
+    ])
+    assert aggregates['average_positive_percentage'] == '50.0%'
+    assert aggregates['average_neutral_percentage'] == '30.0%'
+    assert aggregates['average_negative_percentage'] == '26.7%'
+
+def test_flagged_counts_misinformation_and_very_negative_articles():
+    records = [
+        article('80%', '10%', '10%'),
+        article('80%', '10%', '10%', misinformation='Partial'),
+        article('80%', '10%', '10%', article_status='False'),
+        article('10%', '10%', '80%'),
+        article('30%', '20%', '50%'),
+    ]
+    assert [is_misinformation(record) for record in records] == [False, True, True, False, False]
+    assert archive_aggregates(records)['flagged_articles'] == 4
+
+def test_total_counts_the_archive_links_and_analysed_the_records():
+    aggregates = archive_aggregates([article('50%', '25%', '25%')] * 3, total_articles=12)
+    assert aggregates['total_articles'] == 12
+    assert aggregates['analysed_articles'] == 3
+    assert archive_aggregates([article('50%', '25%', '25%')])['total_articles'] == 1
+
+def test_ai_generated_count_is_unavailable():
+    assert archive_aggregates([article('50%', '25%', '25%')])['ai_generated_articles'] is None
+
+def test_no_records():
+    assert archive_aggregates([], total_articles=5) == {
+        'average_positive_percentage': '0%',
+        'average_neutral_percentage': '0%',
+        'average_negative_percentage': '0%',
+        'total_articles': 5,
+        'analysed_articles': 0,
+        'flagged_articles': 0,
+        'ai_generated_articles': None
+    }
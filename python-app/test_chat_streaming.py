@@ -0,0 +1,81 @@
+"""
+Tests for the streamed Perspec AI chat replies against the mock model: the
+chunks add up to the reply, the turn lands in the session history, usage is
+recorded once the stream is read, and long histories are compacted.
+"""
+
+import pytest
+
+import gemini
+import mock_gemini
+from metrics import GeminiMetrics
+from mock_gemini import MockGenerativeModel
+from scheduler import GeminiScheduler
+
+@pytest.fixture(autouse=True)
+def mock_model(monkeypatch):
+    # Instant, reliable mock replies, and a scheduler and metrics of the test's own
+    monkeypatch.setattr(mock_gemini, 'sample_latency', lambda spec=None: 0.0)
+    monkeypatch.setattr(mock_gemini, 'MOCK_GEMINI_RATE_LIMIT', 0.0)
+    monkeypatch.setattr(mock_gemini, 'MOCK_GEMINI_MALFORMED', 0.0)
+    monkeypatch.setattr(gemini, '_models', {'llm': MockGenerativeModel(), 'summary_llm': MockGenerativeModel()})
+    monkeypatch.setattr(gemini, 'scheduler', GeminiScheduler(600, 1_000_000))
+    metrics = GeminiMetrics()
+    # Test calls are never persisted to the metrics store
+    monkeypatch.setattr(metrics, '_start_flusher', lambda: None)
+    monkeypatch.setattr(gemini, 'gemini_metrics', metrics)
+
+def test_streamed_chunks_add_up_to_the_reply():
+    message = 'What does the budget mean for farmers? ' * 5
+    chunks = list(gemini.stream_message(message))
+    assert len(chunks) > 1
+    assert ''.join(chunks) == mock_gemini.mock_reply(message)
+
+def test_streamed_turn_is_added_to_the_session_history():
+    session = gemini.start_chat([])
+    reply = ''.join(gemini.stream_message('Summarize the article', session=session))
+    assert session.history == [
+        {'role': 'user', 'parts': ['Summarize the article']},
+        {'role': 'model', 'parts': [reply]}
+    ]
+
+def test_usage_is_recorded_and_settled_after_the_stream_is_read():
+    stream = gemini.stream_message('Who is quoted in the article?')
+    assert gemini.gemini_metrics.snapshot()['totals']['calls'] == 0
+    reply = ''.join(stream)
+
+    assert gemini.gemini_metrics.snapshot()['totals']['calls'] == 1
+    # The reservation (prompt plus expected output) is corrected to the usage the mock reports
+    used = gemini.estimate_tokens('Who is quoted in the article?') + gemini.estimate_tokens(reply)
+    assert gemini._request_tokens('Who is quoted in the article?', None) > used
+    assert 1_000_000 - gemini.scheduler.tokens.level == pytest.approx(used, abs=1)
+
+def test_chunks_without_text_are_skipped(monkeypatch):
+    class NoText:
+        @property
+        def text(self):
+            raise ValueError('finish metadata only')
+
+    class Chunk:
+        def __init__(self, text):
+            self.text = text
+
+    class Model:
+        def generate_content(self, message, stream=False):
+            return [Chunk('Hello'), NoText(), Chunk(''), Chunk(' world')]
+
+    monkeypatch.setattr(gemini, '_models', {'llm': Model()})
+    assert list(gemini.stream_message('hi')) == ['Hello', ' world']
+
+def test_short_history_is_not_compacted():
+    history = [{'role': 'user', 'parts': ['hi']}, {'role': 'model', 'parts': ['hello']}]
+    assert gemini.compact_history(history, budget=1000, keep_turns=2) is history
+
+def test_long_history_keeps_recent_turns_after_a_summary():
+    history = [
+        {'role': 'user' if index % 2 == 0 else 'model', 'parts': [f'message {index} ' + 'about the election ' * 20]}
+        for index in range(12)
+    ]
+    compacted = gemini.compact_history(history, budget=200, keep_turns=2)
+    assert compacted[0]['parts'][0].startswith('Summary of our earlier conversation: ')
+    assert compacted[2:] == history[-4:]
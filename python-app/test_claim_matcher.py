@@ -0,0 +1,58 @@
+"""
+Tests for the similar-claim matcher: paraphrases reuse a stored verdict,
+near misses with a different number, direction, negation or entity do not.
+"""
+
+import pytest
+
+from claim_matcher import ClaimMatcher
+
+STORED = 'The finance ministry said India GDP grew by 7.5 percent in the last financial year'
+
+@pytest.fixture
+def matcher():
+    matcher = ClaimMatcher(threshold=0.85)
+    matcher.add(STORED, {'status': 'True'})
+    return matcher
+
+@pytest.mark.parametrize('claim', [
+    STORED,
+    'The finance ministry said India GDP grew by 7.5 percent in the last financial year.',
+    "The finance ministry said India's GDP grew by 7.5 percent in the last financial year",
+    'the finance ministry said india gdp grew by 7.5 percent in the last financial year',
+])
+def test_paraphrase_reuses_verdict(matcher, claim):
+    match = matcher.match(claim)
+    assert match is not None
+    score, entry = match
+    assert score >= 0.85
+    assert entry['verification'] == {'status': 'True'}
+
+@pytest.mark.parametrize('claim', [
+    # Different number
+    'The finance ministry said India GDP grew by 2.5 percent in the last financial year',
+    'The finance ministry said India GDP grew by 7.5 percent in the last financial year 2019',
+    # Opposite direction
+    'The finance ministry said India GDP shrank by 7.5 percent in the last financial year',
+    'The finance ministry said India GDP fell by 7.5 percent in the last financial year',
+    # Negation
+    'The finance ministry said India GDP did not grow by 7.5 percent in the last financial year',
+    "The finance ministry said India GDP didn't grow by 7.5 percent in the last financial year",
+    # Different country
+    'The finance ministry said Pakistan GDP grew by 7.5 percent in the last financial year',
+    'The finance ministry said pakistan gdp grew by 7.5 percent in the last financial year',
+])
+def test_near_miss_does_not_reuse_verdict(matcher, claim):
+    assert matcher.match(claim) is None
+
+def test_near_miss_rejected_above_similarity_threshold(matcher):
+    # Only the number differs, so the claims are textually close; the key terms must still reject it
+    matcher.threshold = 0.5
+    assert matcher.match('The finance ministry said India GDP grew by 7.6 percent in the last financial year') is None
+
+def test_best_candidate_with_same_terms_wins():
+    matcher = ClaimMatcher(threshold=0.5)
+    matcher.add('India GDP grew by 7.5 percent last year', {'status': 'True'})
+    matcher.add('India GDP grew by 2.5 percent last year', {'status': 'False'})
+    _, entry = matcher.match('India GDP grew by 2.5 percent last year.')
+    assert entry['verification'] == {'status': 'False'}
@@ -0,0 +1,124 @@
+"""
+Tests for background jobs: results and errors of function and coroutine
+jobs, partial results published while a job runs (also to every job sharing
+coalesced work), update streams that resume after a version, and expiry.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from jobs import JobManager, follow_progress, format_event, last_event_version, publish_progress, report_progress
+from singleflight import SingleFlight
+
+@pytest.fixture
+def manager():
+    manager = JobManager(workers=4, ttl=3600, name='test-job')
+    yield manager
+    manager.shutdown()
+
+def finished(manager, job_id):
+    assert manager.wait([job_id], timeout=5) == {job_id}
+    return manager.get(job_id)
+
+def test_function_job_result(manager):
+    job_id = manager.submit('analyze', lambda url: {'url': url}, 'https://example.com/a')
+    job = finished(manager, job_id)
+    assert job['kind'] == 'analyze'
+    assert job['status'] == 'done'
+    assert job['result'] == {'url': 'https://example.com/a'}
+    assert manager.stats()['jobs'] == {'done': 1}
+
+def test_failed_job_keeps_the_error(manager):
+    def failing():
+        raise RuntimeError('scrape failed')
+
+    job = finished(manager, manager.submit('analyze', failing))
+    assert job['status'] == 'failed'
+    assert job['error'] == 'scrape failed'
+    assert job['result'] is None
+
+def test_coroutine_jobs_share_one_event_loop(manager):
+    async def current_loop():
+        await asyncio.sleep(0.01)
+        return id(asyncio.get_running_loop())
+
+    first = finished(manager, manager.submit('archive', current_loop))
+    second = finished(manager, manager.submit('archive', current_loop))
+    assert first['result'] == second['result']
+
+def test_progress_is_merged_into_the_partial_result(manager):
+    release = threading.Event()
+
+    def staged():
+        report_progress('metadata', {'language': 'English', 'category': None})
+        report_progress('fact_check', {'category': 'Politics'})
+        release.wait(5)
+        return 'done'
+
+    job_id = manager.submit('url', staged)
+    job = manager.wait_for_update(job_id, 2, timeout=5)
+    while job['stage'] != 'fact_check':
+        job = manager.wait_for_update(job_id, job['version'], timeout=5)
+    assert job['partial'] == {'language': 'English', 'category': 'Politics'}
+    release.set()
+    assert finished(manager, job_id)['result'] == 'done'
+
+def test_report_progress_outside_jobs_does_nothing():
+    report_progress('metadata', {'language': 'English'})
+
+def test_coalesced_jobs_all_follow_the_shared_work(manager):
+    group = SingleFlight('test')
+
+    async def shared_work():
+        publish_progress('url|a', 'metadata', {'language': 'English'})
+        await asyncio.sleep(0.3)
+        publish_progress('url|a', 'fact_check', {'authenticity': {}})
+        await asyncio.sleep(0.1)
+        return 'analysis'
+
+    async def job():
+        with follow_progress('url|a'):
+            return await group.do_async('a', shared_work)
+
+    first = manager.submit('url', job)
+    time.sleep(0.1)
+    # Joins after the metadata stage, which it receives on joining
+    second = manager.submit('url', job)
+    assert [finished(manager, job_id)['result'] for job_id in (first, second)] == ['analysis', 'analysis']
+    assert group.stats()['executions'] == 1
+    assert manager.get(first)['partial'] == manager.get(second)['partial'] == {'language': 'English', 'authenticity': {}}
+
+def test_updates_end_with_the_finished_job(manager):
+    release = threading.Event()
+    job_id = manager.submit('url', lambda: release.wait(5) and 'done')
+    snapshots = manager.updates(job_id, keepalive=0.05)
+    assert next(snapshots)['status'] in ('queued', 'running')
+    release.set()
+    statuses = [job['status'] for job in snapshots if job is not None]
+    assert statuses[-1] == 'done'
+
+def test_updates_resume_after_a_version(manager):
+    job = finished(manager, manager.submit('url', lambda: 'done'))
+    # A client that already has the final version gets nothing more
+    assert list(manager.updates(job['id'], keepalive=0.05, after_version=job['version'])) == []
+    # One that missed it gets the final snapshot
+    assert [update['status'] for update in manager.updates(job['id'], keepalive=0.05, after_version=job['version'] - 1)] == ['done']
+
+def test_finished_jobs_expire_after_the_ttl():
+    manager = JobManager(workers=1, ttl=0.05)
+    job_id = manager.submit('url', lambda: 'done')
+    assert manager.wait([job_id], timeout=5) == {job_id}
+    time.sleep(0.1)
+    assert manager.get(job_id) is None
+    manager.shutdown()
+
+def test_event_helpers():
+    assert last_event_version('7') == 7
+    assert last_event_version(None) == -1
+    assert last_event_version('abc') == -1
+    assert format_event(None) == ': keep-alive\n\n'
+    event = format_event({'version': 3, 'status': 'done'})
+    assert event.startswith('id: 3\nevent: done\ndata: ')
@@ -0,0 +1,141 @@
+"""
+Tests for the Gemini scheduler: a depleted bucket admits waiters by priority,
+batch work leaves the reserve to interactive calls, 429s back off and halve
+the rate (AIMD) until successes restore it, and processes sharing a quota
+file draw from the same buckets.
+"""
+
+import threading
+import time
+
+import pytest
+
+import scheduler as scheduler_module
+from scheduler import GeminiScheduler, Priority, RateLimitedError
+
+class RateLimit(Exception):
+    code = 429
+
+@pytest.fixture(autouse=True)
+def short_backoff(monkeypatch):
+    # Backoff pauses are jittered by this factor; keep them short
+    monkeypatch.setattr(scheduler_module.random, 'uniform', lambda low, high: 0.05)
+
+def acquire_in_thread(scheduler, priority, admitted):
+    thread = threading.Thread(target=lambda: (scheduler.acquire(priority), admitted.append(priority)))
+    thread.start()
+    return thread
+
+def test_depleted_bucket_admits_the_highest_priority_first():
+    # 600 requests per minute refill one request every 0.1 s
+    scheduler = GeminiScheduler(600, 1_000_000, batch_reserve=0)
+    scheduler.requests.level = 0
+
+    admitted = []
+    threads = [acquire_in_thread(scheduler, Priority.BATCH, admitted)]
+    time.sleep(0.02)
+    threads.append(acquire_in_thread(scheduler, Priority.STANDARD, admitted))
+    time.sleep(0.02)
+    threads.append(acquire_in_thread(scheduler, Priority.INTERACTIVE, admitted))
+    for thread in threads:
+        thread.join(timeout=5)
+
+    # Queued last, admitted first
+    assert admitted == [Priority.INTERACTIVE, Priority.STANDARD, Priority.BATCH]
+    assert scheduler.stats()['admitted'] == {'INTERACTIVE': 1, 'STANDARD': 1, 'BATCH': 1}
+
+def test_batch_work_leaves_the_reserve_to_interactive_calls():
+    scheduler = GeminiScheduler(60, 1_000_000, batch_reserve=0.5)
+    scheduler.requests.level = 20
+
+    admitted = []
+    batch = acquire_in_thread(scheduler, Priority.BATCH, admitted)
+    time.sleep(0.2)
+    # 20 requests left is below the 30 reserved, so the batch call waits
+    assert admitted == []
+
+    start = time.monotonic()
+    scheduler.acquire(Priority.INTERACTIVE)
+    assert time.monotonic() - start < 0.5
+
+    scheduler.requests.level = 60
+    batch.join(timeout=5)
+    assert admitted == [Priority.BATCH]
+
+def test_rate_limit_backs_off_and_halves_the_rate():
+    scheduler = GeminiScheduler(60, 1_000_000)
+    scheduler.report_rate_limit()
+    assert scheduler.rate_factor == 0.5
+    assert scheduler.backoff == 1.0
+    assert scheduler.backoff_until > time.time()
+
+    # Consecutive 429s double the pause and keep halving the rate down to the floor
+    scheduler.report_rate_limit()
+    assert (scheduler.backoff, scheduler.rate_factor) == (2.0, 0.25)
+    for _ in range(10):
+        scheduler.report_rate_limit()
+    assert scheduler.backoff == 60.0
+    assert scheduler.rate_factor == 0.1
+
+def test_successes_recover_the_rate_additively():
+    scheduler = GeminiScheduler(60, 1_000_000)
+    scheduler.report_rate_limit()
+    scheduler.report_success()
+    assert scheduler.backoff == 0.0
+    assert scheduler.rate_factor == pytest.approx(0.55)
+    for _ in range(20):
+        scheduler.report_success()
+    assert scheduler.rate_factor == 1.0
+
+def test_run_retries_after_a_rate_limit():
+    scheduler = GeminiScheduler(600, 1_000_000)
+    calls = []
+
+    def call():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RateLimit('429 Resource exhausted')
+        return 'reply'
+
+    assert scheduler.run(call) == 'reply'
+    assert len(calls) == 2
+    assert scheduler.stats()['rate_limited'] == 1
+    assert scheduler.rate_factor == pytest.approx(0.55)
+
+def test_run_gives_up_after_the_retries():
+    scheduler = GeminiScheduler(600, 1_000_000)
+
+    def call():
+        raise RateLimit('429 Resource exhausted')
+
+    with pytest.raises(RateLimitedError):
+        scheduler.run(call, retries=1)
+    assert scheduler.rate_limited == 2
+
+def test_other_errors_are_not_retried():
+    scheduler = GeminiScheduler(600, 1_000_000)
+    calls = []
+
+    def call():
+        calls.append(1)
+        raise ValueError('bad request')
+
+    with pytest.raises(ValueError):
+        scheduler.run(call)
+    assert len(calls) == 1
+    assert scheduler.rate_limited == 0
+
+def test_schedulers_sharing_a_quota_file_draw_from_one_bucket(tmp_path):
+    state_path = str(tmp_path / 'quota.json')
+    first = GeminiScheduler(60, 1_000_000, batch_reserve=0, state_path=state_path)
+    second = GeminiScheduler(60, 1_000_000, batch_reserve=0, state_path=state_path)
+
+    for _ in range(50):
+        first.acquire(Priority.INTERACTIVE)
+    second.acquire(Priority.INTERACTIVE)
+    assert second.stats()['requests_available'] < 10
+
+    # A 429 seen by one process also lowers the rate of the other
+    first.report_rate_limit()
+    second.report_success()
+    assert second.rate_factor == pytest.approx(0.55)
@@ -0,0 +1,62 @@
+"""
+Tests for response encoding: JSON round trips with either serializer, the
+Accept-Encoding negotiation honours q-values and wildcards, and only bodies
+above the threshold are compressed, reproducibly.
+"""
+
+import gzip
+import json
+from datetime import datetime
+
+import pytest
+
+import serialization
+from serialization import compress, dumps, negotiate_encoding, response_encoding
+
+PAYLOAD = {'title': 'Mumbai rains: ₹500 crore relief', 'positive_percentage': '40%', 'organization': ['BMC', 'IMD'], 'count': 3}
+
+@pytest.mark.parametrize('use_orjson', [True, False])
+def test_dumps_round_trips(monkeypatch, use_orjson):
+    if use_orjson and not serialization.ORJSON_AVAILABLE:
+        pytest.skip('orjson is not installed')
+    monkeypatch.setattr(serialization, 'USE_ORJSON', use_orjson)
+    body = dumps(PAYLOAD)
+    assert isinstance(body, bytes)
+    assert json.loads(body) == PAYLOAD
+
+def test_dumps_accepts_datetimes_with_orjson():
+    if not serialization.USE_ORJSON:
+        pytest.skip('orjson is not installed')
+    assert json.loads(dumps({'at': datetime(2024, 5, 1, 12, 30)})) == {'at': '2024-05-01T12:30:00'}
+
+@pytest.mark.parametrize('header, expected', [
+    (None, None),
+    ('', None),
+    ('identity', None),
+    ('gzip', 'gzip'),
+    ('deflate, gzip;q=0.8', 'gzip'),
+    ('gzip;q=0', None),
+    ('*', 'br' if serialization.BROTLI_AVAILABLE else 'gzip'),
+    ('*, gzip;q=0', 'br' if serialization.BROTLI_AVAILABLE else None),
+    ('br', 'br' if serialization.BROTLI_AVAILABLE else None),
+])
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header) == expected
+
+def test_small_bodies_are_not_compressed():
+    body = dumps(PAYLOAD)
+    assert compress(body, 'gzip', min_bytes=len(body) + 1) == (body, None)
+    assert response_encoding(len(body), 'gzip', min_bytes=len(body) + 1) is None
+
+def test_large_bodies_are_compressed_reproducibly():
+    body = dumps([PAYLOAD] * 100)
+    compressed, encoding = compress(body, 'gzip', min_bytes=100)
+    assert encoding == 'gzip' == response_encoding(len(body), 'gzip', min_bytes=100)
+    assert len(compressed) < len(body)
+    assert gzip.decompress(compressed) == body
+    # Identical bodies compress to identical bytes, so ETags and caches stay valid
+    assert compress(body, 'gzip', min_bytes=100)[0] == compressed
+
+def test_uncompressible_request_gets_the_body_as_is():
+    body = dumps([PAYLOAD] * 100)
+    assert compress(body, 'identity', min_bytes=100) == (body, None)
@@ -0,0 +1,103 @@
+"""
+Tests for request coalescing: concurrent calls with the same key share one
+execution and its result or error; different keys and later calls run again.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight
+
+def run_concurrently(count, target):
+    # Release every thread at once so their calls overlap
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def call(index):
+        barrier.wait()
+        try:
+            results[index] = target()
+        except Exception as exc:
+            results[index] = exc
+
+    threads = [threading.Thread(target=call, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_concurrent_identical_keys_share_one_call():
+    group = SingleFlight('test')
+    executions = []
+
+    def analyse():
+        executions.append(1)
+        time.sleep(0.2)
+        return {'category': 'Politics'}
+
+    results = run_concurrently(8, lambda: group.do('https://example.com/a', analyse))
+    assert len(executions) == 1
+    assert all(result == {'category': 'Politics'} for result in results)
+    assert group.stats() == {'calls': 8, 'executions': 1, 'shared': 7, 'in_flight': 0}
+
+def test_different_keys_run_separately():
+    group = SingleFlight('test')
+    results = run_concurrently(4, lambda: group.do(threading.current_thread().name, time.sleep, 0.05))
+    assert results == [None] * 4
+    assert group.stats()['executions'] == 4
+
+def test_error_is_shared_and_the_next_call_runs_again():
+    group = SingleFlight('test')
+    executions = []
+
+    def failing():
+        executions.append(1)
+        time.sleep(0.2)
+        raise RuntimeError('scrape failed')
+
+    results = run_concurrently(4, lambda: group.do('key', failing))
+    assert len(executions) == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    # The failed call is forgotten, so a later request retries
+    assert group.do('key', lambda: 'ok') == 'ok'
+    assert group.stats()['executions'] == 2
+
+def test_async_callers_share_one_task():
+    group = SingleFlight('test')
+    executions = []
+
+    async def scrape(url):
+        executions.append(url)
+        await asyncio.sleep(0.1)
+        return {'url': url}
+
+    async def main():
+        return await asyncio.gather(*[group.do_async('key', scrape, 'https://example.com/a') for _ in range(5)])
+
+    results = asyncio.run(main())
+    assert executions == ['https://example.com/a']
+    assert results == [{'url': 'https://example.com/a'}] * 5
+    assert group.stats()['shared'] == 4
+
+def test_cancelled_caller_does_not_cancel_the_shared_task():
+    group = SingleFlight('test')
+
+    async def scrape():
+        await asyncio.sleep(0.1)
+        return 'done'
+
+    async def main():
+        first = asyncio.ensure_future(group.do_async('key', scrape))
+        second = asyncio.ensure_future(group.do_async('key', scrape))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == 'done'
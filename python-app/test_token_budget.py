@@ -0,0 +1,78 @@
+"""
+Tests for the token budget helpers and the map-reduce merge of long
+articles: chunks hold whole sentences within the budget, and the merged
+analysis keeps scraped values, averages percentages by chunk size, votes on
+labels and reports the most severe misinformation status.
+"""
+
+from gemini import MAX_FLAGGED_EXCERPTS, merge_chunk_results
+from token_budget import CHARS_PER_TOKEN, chunk_content, compact_content, estimate_tokens
+
+SENTENCES = [f'Sentence number {index} reports on the state budget.' for index in range(40)]
+ARTICLE = ' '.join(SENTENCES)
+
+def test_estimate_tokens_rounds_up():
+    assert estimate_tokens('') == 0
+    assert estimate_tokens('abc') == 1
+    assert estimate_tokens('a' * (CHARS_PER_TOKEN * 10 + 1)) == 11
+
+def test_chunks_hold_whole_sentences_within_the_budget():
+    chunks = chunk_content(ARTICLE, 60)
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 60 for chunk in chunks)
+    # Consecutive and complete: joining the chunks gives the article back
+    assert ' '.join(chunks) == ARTICLE
+
+def test_oversized_sentence_is_hard_split():
+    sentence = 'word ' * 200
+    chunks = chunk_content(sentence.strip() + '.', 20)
+    assert all(estimate_tokens(chunk) <= 20 for chunk in chunks)
+    assert ''.join(chunks) == sentence.strip() + '.'
+
+def test_compact_content_drops_duplicates_and_boilerplate():
+    text = 'The court ruled on Monday. Also read: ten other stories. The court ruled on Monday. Appeals follow.'
+    assert compact_content(text) == 'The court ruled on Monday. Appeals follow.'
+
+def test_compact_content_trims_on_a_sentence_boundary():
+    compacted = compact_content(ARTICLE, 50)
+    assert estimate_tokens(compacted) <= 50
+    assert compacted.endswith('budget.')
+    assert ARTICLE.startswith(compacted)
+
+def test_merge_keeps_scraped_values_and_fills_nulls():
+    news_data = {'publisher': 'NDTV', 'content': ARTICLE, 'category': None, 'positive_percentage': None, 'organization': None}
+    chunk_results = [
+        {'publisher': 'Other', 'category': 'Politics', 'positive_percentage': '20%', 'organization': ['RBI']},
+        {'publisher': 'Other', 'category': 'Business', 'positive_percentage': '80%', 'organization': ['RBI', 'SEBI']},
+        {'publisher': 'Other', 'category': 'Politics', 'positive_percentage': '50%', 'organization': None},
+    ]
+    merged = merge_chunk_results(news_data, chunk_results, [100, 300, 100])
+
+    assert merged['publisher'] == 'NDTV'
+    assert merged['content'] == ARTICLE
+    # (20 * 100 + 80 * 300 + 50 * 100) / 500
+    assert merged['positive_percentage'] == '62%'
+    # The largest chunk outweighs two smaller ones
+    assert merged['category'] == 'Business'
+    assert merged['organization'] == ['RBI', 'SEBI']
+
+def test_merge_keeps_the_text_of_the_largest_chunk():
+    news_data = {'highlight': None}
+    chunk_results = [
+        {'highlight': 'A long highlight about the opening paragraphs of the article and its main claim.'},
+        {'highlight': 'A long highlight about the closing paragraphs of the article and the reactions.'},
+    ]
+    merged = merge_chunk_results(news_data, chunk_results, [100, 400])
+    assert merged['highlight'] == chunk_results[1]['highlight']
+
+def test_merge_reports_the_most_severe_misinformation_status():
+    news_data = {'authenticity': {'Fact Check': None, 'Misinformation Status': None}}
+    statuses = [
+        {'Misinformation': 'No', 'Flagged Text': 'Not Applicable'},
+        {'Misinformation': 'Partial', 'Flagged Text': 'excerpt 1'},
+    ] + [{'Misinformation': 'Yes', 'Flagged Text': f'excerpt {index}'} for index in range(2, 6)]
+    chunk_results = [{'authenticity': {'Misinformation Status': status}} for status in statuses]
+
+    status = merge_chunk_results(news_data, chunk_results, [1] * len(statuses))['authenticity']['Misinformation Status']
+    assert status['Misinformation'] == 'Yes'
+    assert status['Flagged Text'] == ' '.join(f'excerpt {index}' for index in range(1, 1 + MAX_FLAGGED_EXCERPTS))
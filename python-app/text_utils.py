@@ -0,0 +1,100 @@
+"""
+Text Utilities Module
+This module holds the text helpers shared by the local analysis modules:
+the sentence segmenter (abbreviations, initials and decimals do not end a
+sentence), boilerplate detection for site furniture, sentence keys for
+de-duplication and the light English stemmer used for claim keys and the
+fact check index.
+"""
+
+import re
+from typing import List, Tuple
+
+ABBREVIATIONS = frozenset('''
+mr mrs ms dr prof sr jr st gen col lt capt sgt gov govt sen rep hon rs no nos vs etc inc ltd co corp dept
+jan feb mar apr jun jul aug sep sept oct nov dec approx est fig vol ed eg ie al
+'''.split())
+
+# Terminal punctuation (with closing quotes or brackets) followed by whitespace or directly by a capital letter
+# (the scraper strips whitespace between paragraphs, so "end.Next" must split)
+_boundary_regex = re.compile(r'[.!?]+["\'”’)\]]*(?=\s|[A-Z"\'“]|$)')
+_word_before_regex = re.compile(r'([A-Za-z]+)\.?$')
+
+# Sentences matching any of these are site furniture rather than article content
+BOILERPLATE_PATTERNS = [
+    r'^(also read|read more|read also|watch|click here|subscribe)\b',
+    r'follow us on',
+    r'track latest news live on',
+    r'this story has not been edited by',
+    r'is published from a syndicated feed',
+    r'^\(?disclaimer',
+    r'^(advertisement|promoted|listen to the latest songs)',
+    r'download the .* app',
+]
+_boilerplate_regex = re.compile('|'.join(BOILERPLATE_PATTERNS), re.IGNORECASE)
+
+# Suffixes folded by the light stemmer, longest first
+_SUFFIXES = ('ingly', 'edly', 'ing', 'ies', 'ied', 'ed', 'es', 's')
+
+def segment_sentences(text: str) -> List[Tuple[int, int]]:
+    """
+    Split text into sentence spans
+
+    Args:
+        text: The article text
+
+    Returns:
+        List of (start, end) character offsets of the stripped, non-empty sentences
+    """
+    text = text or ''
+    spans = []
+    start = 0
+    for match in _boundary_regex.finditer(text):
+        end = match.end()
+        following = text[end:end + 2].lstrip()[:1]
+
+        if match.group(0).startswith('.'):
+            word = _word_before_regex.search(text[start:match.start() + 1])
+            word = word.group(1) if word else ''
+            # "Mr. Modi", "Rs. 500", "J. K. Rowling" and "U.S. Army" do not end a sentence
+            if word.lower() in ABBREVIATIONS or (len(word) == 1 and word.isupper()):
+                continue
+        # A lowercase word after the punctuation means the sentence goes on ("e.g. the")
+        if following and following.islower():
+            continue
+
+        spans.append((start, end))
+        start = end
+    spans.append((start, len(text)))
+
+    stripped = []
+    for span_start, span_end in spans:
+        sentence = text[span_start:span_end]
+        if sentence.strip():
+            leading = len(sentence) - len(sentence.lstrip())
+            stripped.append((span_start + leading, span_start + len(sentence.rstrip())))
+    return stripped
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into stripped, non-empty sentences"""
+    return [text[start:end] for start, end in segment_sentences(text)]
+
+def is_boilerplate(sentence: str) -> bool:
+    """Whether a sentence is site furniture (read-more links, follow-us lines, disclaimers)"""
+    return bool(_boilerplate_regex.search(sentence))
+
+def sentence_key(sentence: str) -> str:
+    """Key of a sentence for de-duplication (case, punctuation and whitespace are ignored)"""
+    return re.sub(r'[^a-z0-9]+', ' ', sentence.lower()).strip()
+
+def stem(word: str) -> str:
+    """Strip a common English suffix from a lowercase word"""
+    for suffix in _SUFFIXES:
+        # "-es" is only a suffix after sibilants (boxes, churches); "vaccines" loses just the "s"
+        if suffix == 'es' and not word[:-2].endswith(('s', 'x', 'z', 'ch', 'sh')):
+            continue
+        # Short words are left alone so "is", "was" and "news" keep their meaning
+        if word.endswith(suffix) and len(word) - len(suffix) >= (3 if suffix == 'es' else 4):
+            root = word[:-len(suffix)]
+            return root + 'y' if suffix in ('ies', 'ied') else root
+    return word
@@ -0,0 +1,92 @@
+"""
+Token Budget Module
+This module estimates prompt sizes and compacts long article content
+so that every Gemini request stays within a configurable token budget.
+"""
+
+from typing import List
+
+from text_utils import split_sentences, is_boilerplate, sentence_key
+
+# Rough average for English news copy with the Gemini tokenizer
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens Gemini will count for a piece of text
+
+    Args:
+        text: The text to measure
+
+    Returns:
+        Estimated token count
+    """
+    if not text:
+        return 0
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
+
+def compact_content(text: str, budget: int = None) -> str:
+    """
+    Remove duplicate sentences and boilerplate, then trim to a token budget
+
+    Args:
+        text: The article text
+        budget: Maximum number of tokens to keep (no trimming if None)
+
+    Returns:
+        The compacted text, cut on a sentence boundary
+    """
+    if not text:
+        return text
+
+    seen = set()
+    kept = []
+    used = 0
+    for sentence in split_sentences(text):
+        key = sentence_key(sentence)
+        if not key or key in seen or is_boilerplate(sentence):
+            continue
+        seen.add(key)
+
+        cost = estimate_tokens(sentence) + 1
+        if budget is not None and used + cost > budget:
+            # Always keep at least part of the first sentence
+            if not kept:
+                kept.append(sentence[:budget * CHARS_PER_TOKEN])
+            break
+        kept.append(sentence)
+        used += cost
+
+    return ' '.join(kept)
+
+def chunk_content(text: str, chunk_tokens: int) -> List[str]:
+    """
+    Split text into consecutive chunks of whole sentences within a token budget
+
+    Args:
+        text: The article text
+        chunk_tokens: Maximum number of tokens per chunk
+
+    Returns:
+        List of chunk strings
+    """
+    chunks = []
+    current = []
+    used = 0
+    for sentence in split_sentences(text):
+        cost = estimate_tokens(sentence) + 1
+        if current and used + cost > chunk_tokens:
+            chunks.append(' '.join(current))
+            current, used = [], 0
+        # A single oversized sentence is hard-split so no chunk exceeds the budget
+        while cost > chunk_tokens:
+            limit = chunk_tokens * CHARS_PER_TOKEN
+            chunks.append(sentence[:limit])
+            sentence = sentence[limit:]
+            cost = estimate_tokens(sentence) + 1
+        if sentence:
+            current.append(sentence)
+            used += cost
+    if current:
+        chunks.append(' '.join(current))
+    return chunks